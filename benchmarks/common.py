@@ -0,0 +1,106 @@
+"""
+Shared geometry and helpers for the benchmarks
+
+The benchmarks run on the CPU (slippy.CUDA is set False on import) so results are comparable between machines with and
+without a GPU. Each benchmark clears the influence matrix and FFT plan caches in its setup so that the timings include
+the work done the first time a problem of that size is solved, except where the cached path is being timed on purpose.
+
+asv times older commits with the same benchmarks (eg to record a baseline with asv continuous), so features which were
+added later are detected rather than imported, benchmarks of a feature which is missing raise NotImplementedError in
+their setup and are skipped.
+"""
+import numpy as np
+
+import slippy
+
+slippy.CUDA = False
+
+import slippy.contact as c  # noqa: E402
+import slippy.surface as s  # noqa: E402
+
+try:
+    from slippy.contact.influence_matrix_utils import _elastic_im_geometry  # noqa: E402
+except ImportError:
+    _elastic_im_geometry = None
+
+__all__ = ['GRID_SIZES', 'LUBRICATION_GRID_SIZES', 'PERIODIC', 'LOAD_CONTROLS', 'E', 'V', 'GRID_SPACING',
+           'clear_caches', 'require', 'load_control_options', 'rough_profile', 'rough_surface', 'rough_on_flat',
+           'hertz_ball']
+
+GRID_SIZES = [128, 256, 512, 1024, 2048]
+"""Number of points in each direction for the contact benchmarks"""
+LUBRICATION_GRID_SIZES = [65, 129, 257]
+"""The reynolds solvers are much slower per point, these are the sizes commonly used for EHL problems"""
+PERIODIC = [False, True]
+LOAD_CONTROLS = ['root_scalar', 'polonsky_keer']
+"""The load control methods of the static steps, 'root_scalar' is the default and is used by every version"""
+
+E = 200e9
+V = 0.3
+GRID_SPACING = 1e-6
+
+
+def clear_caches():
+    """Remove all cached influence matrices and FFT plans"""
+    if hasattr(c.elastic_influence_matrix, 'cache'):
+        c.elastic_influence_matrix.cache.clear()
+    if hasattr(c.elastic_influence_matrix, 'spec'):
+        # older versions index the cache by the position of the arguments in spec, both must be cleared
+        c.elastic_influence_matrix.spec.clear()
+    if _elastic_im_geometry is not None:
+        _elastic_im_geometry.cache_clear()
+    if hasattr(c, 'clear_plan_cache'):
+        c.clear_plan_cache()
+
+
+def require(*names: str):
+    """Skip the benchmark if slippy.contact does not have all of the named attributes, for use in setup"""
+    missing = [name for name in names if not hasattr(c, name)]
+    if missing:
+        raise NotImplementedError(f"slippy.contact has no {', '.join(missing)} in this version")
+
+
+def load_control_options(load_control: str) -> dict:
+    """The step keyword arguments for a load control method, the default is not passed so older versions accept it"""
+    if load_control == 'root_scalar':
+        return {}
+    require(load_control)
+    return {'load_control': load_control}
+
+
+def rough_profile(size: int, periodic: bool, roughness: float = 1e-7, correlation_length: int = 8, seed: int = 0):
+    """A randomly rough profile made by gaussian filtering white noise in the frequency domain
+
+    If periodic the profile tiles without a step, otherwise it is cut from a profile twice the size
+    """
+    rng = np.random.RandomState(seed)
+    full_size = size if periodic else 2 * size
+    noise = rng.randn(full_size, full_size)
+    k = np.fft.fftfreq(full_size)
+    kx, ky = np.meshgrid(k, k)
+    gaussian_filter = np.exp(-(np.pi * correlation_length) ** 2 * (kx ** 2 + ky ** 2))
+    profile = np.real(np.fft.ifft2(np.fft.fft2(noise) * gaussian_filter))[:size, :size]
+    profile -= np.mean(profile)
+    return profile * roughness / np.std(profile)
+
+
+def rough_surface(size: int, periodic: bool):
+    """A steel rough surface, paired with a steel flat in the step benchmarks"""
+    surface = s.Surface(profile=rough_profile(size, periodic), grid_spacing=GRID_SPACING)
+    surface.material = c.Elastic('steel', {'E': E, 'v': V})
+    return surface
+
+
+def rough_on_flat(size: int, periodic: bool):
+    """A contact model of a rough surface on a flat and the load which gives roughly 10 % contact"""
+    flat = s.FlatSurface(shift=(0, 0))
+    flat.material = c.Elastic('steel', {'E': E, 'v': V})
+    model = c.ContactModel('benchmark', rough_surface(size, periodic), flat)
+    load = 0.0005 * E * (size * GRID_SPACING) ** 2
+    return model, load
+
+
+def hertz_ball(radius: float, load: float):
+    """The hertz contact radius, maximum pressure and approach of a steel ball on a steel flat"""
+    result = c.solve_hertz_point(r_rel=radius, e1=E, e2=E, v1=V, v2=V, load=load)
+    return result.contact_radius, result.max_pressure, result.total_displacement
@@ -0,0 +1,140 @@
+"""
+Benchmarks for the normal contact solvers and the dry model steps
+"""
+import numpy as np
+
+import slippy.contact as c
+
+from .common import GRID_SIZES, PERIODIC, LOAD_CONTROLS, E, V, GRID_SPACING, clear_caches, require, \
+    load_control_options, rough_profile, rough_on_flat
+
+
+def _total_im(size: int) -> np.ndarray:
+    """The combined zz influence matrix of two steel surfaces, with the span used by the model steps"""
+    shear_mod = E / (2 * (1 + V))
+    return 2 * c.elastic_influence_matrix('zz', (size, size), (GRID_SPACING, GRID_SPACING), shear_mod, V)
+
+
+class InfluenceMatrix:
+    """Finding the elastic influence matrix from scratch"""
+    params = [GRID_SIZES]
+    param_names = ['size']
+    number = 1
+    timeout = 600
+
+    def setup(self, size):
+        clear_caches()
+
+    def time_elastic_influence_matrix(self, size):
+        _total_im(size)
+
+    def peakmem_elastic_influence_matrix(self, size):
+        _total_im(size)
+
+
+class Convolution:
+    """Planning an FFT convolution and using the plan, with and without a domain"""
+    params = [GRID_SIZES, PERIODIC]
+    param_names = ['size', 'periodic']
+    number = 1
+    timeout = 600
+
+    def setup(self, size, periodic):
+        clear_caches()
+        self.im = _total_im(size)
+        self.loads = np.abs(rough_profile(size, periodic))
+        self.domain = self.loads > np.median(self.loads)
+        self.loads_in_domain = self.loads[self.domain]
+        self.convolve = c.plan_convolve(self.loads, self.im, circular=periodic)
+        self.convolve_domain = c.plan_convolve(self.loads, self.im, self.domain, circular=periodic)
+        # the plans above are kept, the cache is cleared so time_plan_convolve plans from scratch
+        clear_caches()
+
+    def time_plan_convolve(self, size, periodic):
+        c.plan_convolve(self.loads, self.im, circular=periodic)
+
+    def time_convolve(self, size, periodic):
+        self.convolve(self.loads)
+
+    def time_convolve_domain(self, size, periodic):
+        self.convolve_domain(self.loads_in_domain)
+
+
+class NormalContactSolvers:
+    """The inner solvers for a rough surface on a flat, from a cold start to convergence"""
+    params = [GRID_SIZES, PERIODIC]
+    param_names = ['size', 'periodic']
+    number = 1
+    timeout = 1200
+
+    def setup(self, size, periodic):
+        clear_caches()
+        im = _total_im(size)
+        profile = rough_profile(size, periodic)
+        self.gap = np.max(profile) - profile
+        # set displacement problem: the nodes that would overlap the flat if the surfaces did not deform
+        interference = np.percentile(self.gap, 30)
+        self.domain = self.gap < interference
+        self.displacement = interference - self.gap[self.domain]
+        self.bccg_convolve = c.plan_convolve(self.gap, im, self.domain, circular=periodic)
+
+    def time_bccg(self, size, periodic):
+        c.bccg(self.bccg_convolve, self.displacement, 1e-5, 5000, np.zeros_like(self.displacement))
+
+
+class PolonskyKeer:
+    """The load controlled inner solver for the rough surface on a flat, with the load used by the step benchmarks"""
+    params = [GRID_SIZES, PERIODIC]
+    param_names = ['size', 'periodic']
+    number = 1
+    timeout = 1200
+
+    def setup(self, size, periodic):
+        require('polonsky_keer')
+        clear_caches()
+        profile = rough_profile(size, periodic)
+        self.gap = np.max(profile) - profile
+        self.total_load = 0.0005 * E * (size * GRID_SPACING) ** 2
+        self.node_area = GRID_SPACING ** 2
+        self.convolve = c.plan_convolve(self.gap, _total_im(size), np.ones_like(self.gap, dtype=bool),
+                                        circular=periodic)
+
+    def time_polonsky_keer(self, size, periodic):
+        c.polonsky_keer(self.convolve, self.gap.flatten(), self.total_load, self.node_area, 1e-5, 5000)
+
+
+class StaticStep:
+    """A full static step for a rough surface on a flat, including finding the influence matrix"""
+    params = [GRID_SIZES, PERIODIC, LOAD_CONTROLS]
+    param_names = ['size', 'periodic', 'load_control']
+    number = 1
+    timeout = 1200
+
+    def setup(self, size, periodic, load_control):
+        options = load_control_options(load_control)
+        clear_caches()
+        self.model, load = rough_on_flat(size, periodic)
+        self.model.add_step(c.StaticStep('contact', normal_load=load, periodic_geometry=periodic,
+                                         periodic_axes=(periodic, periodic), **options))
+
+    def time_solve(self, size, periodic, load_control):
+        self.model.solve(skip_data_check=True)
+
+
+class QuasiStaticStep:
+    """Sliding a rough surface over a flat in 5 time steps, each is a full normal contact solution"""
+    params = [GRID_SIZES, PERIODIC, LOAD_CONTROLS]
+    param_names = ['size', 'periodic', 'load_control']
+    number = 1
+    timeout = 3600
+
+    def setup(self, size, periodic, load_control):
+        options = load_control_options(load_control)
+        clear_caches()
+        self.model, load = rough_on_flat(size, periodic)
+        self.model.add_step(c.QuasiStaticStep('slide', 5, off_set_x=[0.0, 10 * GRID_SPACING], normal_load=load,
+                                              periodic_geometry=periodic, periodic_axes=(periodic, periodic),
+                                              **options))
+
+    def time_solve(self, size, periodic, load_control):
+        self.model.solve(skip_data_check=True)
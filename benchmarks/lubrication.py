@@ -0,0 +1,125 @@
+"""
+Benchmarks for the reynolds solver and the lubrication steps, for a steel ball rolling on a steel flat
+"""
+import numba
+import numpy as np
+
+import slippy
+import slippy.contact as c
+import slippy.surface as s
+
+from .common import LUBRICATION_GRID_SIZES, PERIODIC, E, V, clear_caches, require, hertz_ball
+
+RADIUS = 0.01905
+LOAD = 800
+ROLLING_SPEED = 4
+ETA_0 = 0.096
+ROELANDS_P_0 = 1 / 5.1e-9
+ROELANDS_Z = 0.68
+DENSITY = 872
+
+
+class _BallOnFlat:
+    """The hertz solution, the surfaces and the lubricant for the lubrication benchmarks"""
+    params = [LUBRICATION_GRID_SIZES, PERIODIC]
+    param_names = ['size', 'periodic']
+    number = 1
+
+    def setup(self, size, periodic):
+        clear_caches()
+        self.a, self.p_max, self.deflection = hertz_ball(RADIUS, LOAD)
+        self.ball = s.RoundSurface((RADIUS,) * 3, shape=(size, size), extent=(self.a * 4, self.a * 4), generate=True)
+        self.flat = s.FlatSurface()
+        self.ball.material = c.Elastic('steel', {'E': E, 'v': V})
+        self.flat.material = c.Elastic('steel', {'E': E, 'v': V})
+        self.oil = c.Lubricant('oil')
+        self.oil.add_sub_model('nd_viscosity', c.lubricant_models.nd_roelands(ETA_0, ROELANDS_P_0, self.p_max,
+                                                                              ROELANDS_Z))
+        self.oil.add_sub_model('nd_density', c.lubricant_models.nd_dowson_higginson(self.p_max))
+        self.reynolds = c.UnifiedReynoldsSolver(time_step=0, grid_spacing=self.ball.grid_spacing,
+                                                hertzian_pressure=self.p_max, radius_in_rolling_direction=RADIUS,
+                                                hertzian_half_width=self.a, dimentional_viscosity=ETA_0,
+                                                dimentional_density=DENSITY, periodic=periodic)
+        x, y = self.ball.get_points_from_extent()
+        x, y = x - np.mean(x), y - np.mean(y)
+        self.hertz_pressure = self.p_max * np.sqrt(np.clip(1 - (x ** 2 + y ** 2) / self.a ** 2, 0, None))
+        # the rigid gap with a thin central film, outside the contact this is close to the deformed gap
+        self.gap = (x ** 2 + y ** 2) / (2 * RADIUS) + 1e-7
+
+
+class UnifiedReynoldsSolver(_BallOnFlat):
+    """A single call to the reynolds solver (one sweep of every line) from the hertz pressure distribution"""
+    timeout = 600
+
+    def setup(self, size, periodic):
+        super().setup(size, periodic)
+        self.reynolds.rolling_speed = ROLLING_SPEED
+        state = {'nd_pressure': self.reynolds.dimensionalise_pressure(self.hertz_pressure, True),
+                 'nd_gap': self.reynolds.dimensionalise_gap(self.gap, True)}
+        self.state = self.oil.solve_sub_models(state)
+        self.nd_max_pressure = self.reynolds.dimensionalise_pressure(np.inf, True)
+
+    def time_solve(self, size, periodic):
+        self.reynolds.solve(dict(self.state), self.nd_max_pressure)
+
+
+class ZebraReynoldsSolver(UnifiedReynoldsSolver):
+    """As UnifiedReynoldsSolver with the lines relaxed in zebra order, in parallel"""
+
+    def setup(self, size, periodic):
+        super().setup(size, periodic)
+        if not hasattr(self.reynolds, 'zebra'):
+            raise NotImplementedError('UnifiedReynoldsSolver has no zebra option in this version')
+        self.reynolds.zebra = True
+
+
+class ZebraThreadScaling(UnifiedReynoldsSolver):
+    """The zebra sweep on the largest grid with different numbers of threads, compare with the 1 thread timing"""
+    params = [LUBRICATION_GRID_SIZES[-1:], PERIODIC, [1, 2, 4, 8]]
+    param_names = ['size', 'periodic', 'threads']
+
+    def setup(self, size, periodic, threads):
+        if threads > numba.config.NUMBA_NUM_THREADS:
+            raise NotImplementedError(f'Only {numba.config.NUMBA_NUM_THREADS} threads are available')
+        super().setup(size, periodic)
+        if not hasattr(self.reynolds, 'zebra'):
+            raise NotImplementedError('UnifiedReynoldsSolver has no zebra option in this version')
+        self.reynolds.zebra = True
+        self.cores = slippy.CORES
+        slippy.CORES = threads
+
+    def teardown(self, size, periodic, threads):
+        slippy.CORES = self.cores
+
+    def time_solve(self, size, periodic, threads):
+        self.reynolds.solve(dict(self.state), self.nd_max_pressure)
+
+
+class MultigridReynoldsSolver(UnifiedReynoldsSolver):
+    """A single call to the multigrid reynolds solver (one V cycle) from the hertz pressure distribution"""
+
+    def setup(self, size, periodic):
+        require('MultigridReynoldsSolver')
+        super().setup(size, periodic)
+        self.reynolds = c.MultigridReynoldsSolver(time_step=0, grid_spacing=self.ball.grid_spacing,
+                                                  hertzian_pressure=self.p_max, radius_in_rolling_direction=RADIUS,
+                                                  hertzian_half_width=self.a, dimentional_viscosity=ETA_0,
+                                                  dimentional_density=DENSITY, periodic=periodic)
+        self.reynolds.rolling_speed = ROLLING_SPEED
+
+
+class IterSemiSystem(_BallOnFlat):
+    """A full lubrication step, limited to a set number of pressure iterations so the work done does not depend on
+    convergence"""
+    timeout = 1800
+
+    def setup(self, size, periodic):
+        super().setup(size, periodic)
+        self.model = c.ContactModel('benchmark', self.ball, self.flat, self.oil)
+        self.model.add_step(c.IterSemiSystem('main', self.reynolds, ROLLING_SPEED, 1, no_time=True, normal_load=LOAD,
+                                             initial_guess=[self.deflection, self.hertz_pressure],
+                                             relaxation_factor=0.05, max_it_pressure=20,
+                                             periodic_geometry=periodic, periodic_axes=(periodic, periodic)))
+
+    def time_solve(self, size, periodic):
+        self.model.solve(skip_data_check=True)
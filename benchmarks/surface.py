@@ -0,0 +1,78 @@
+"""
+Benchmarks for random surface generation and roughness parameters
+"""
+import numpy as np
+import scipy.stats
+
+import slippy.surface as s
+
+from .common import GRID_SIZES, PERIODIC, rough_profile
+
+ROUGHNESS_PARAMETERS = {'amplitude': ['Sa', 'Sq', 'Ssk', 'Sku', 'Sv'],
+                        'spatial': ['Str', 'Std', 'Sal'],
+                        'hybrid': ['Sdr'],
+                        'summit': ['Sds', 'Sz', 'Ssc']}
+
+
+class RandomPerezSurface:
+    """Discretising a surface with an exponential ACF and a non gaussian height distribution"""
+    params = [GRID_SIZES]
+    param_names = ['size']
+    number = 1
+    timeout = 1200
+
+    def setup(self, size):
+        np.random.seed(0)
+        beta, sigma = 10, 1
+        q = np.arange(-size // 2, size // 2)
+        qx, qy = np.meshgrid(q, q)
+        psd = np.fft.fftshift(sigma ** 2 * beta / (2 * np.pi * (beta ** 2 + qx ** 2 + qy ** 2) ** 0.5))
+        self.surface = s.RandomPerezSurface(target_psd=psd, height_distribution=scipy.stats.johnsonsu(1, 2),
+                                            grid_spacing=1, max_it=20)
+
+    def time_discretise(self, size):
+        self.surface.discretise(suppress_errors=True)
+
+
+class RandomFilterLinearTransform:
+    """Fitting the filter coefficients to an exponential ACF, this does not depend on the size of the surface"""
+    params = [[(11, 11), (15, 15), (21, 21)], [False, True]]
+    param_names = ['filter_shape', 'symmetric']
+    number = 1
+    timeout = 1200
+
+    def setup(self, filter_shape, symmetric):
+        self.surface = s.RandomFilterSurface(target_acf=s.ACF('exp', 2, 0.1, 0.2), grid_spacing=0.01)
+
+    def time_linear_transform(self, filter_shape, symmetric):
+        self.surface.linear_transform(filter_shape, symmetric)
+
+
+class RandomFilterDiscretise:
+    """Generating realisations from fitted filter coefficients"""
+    params = [GRID_SIZES, PERIODIC]
+    param_names = ['size', 'periodic']
+    number = 1
+    timeout = 600
+
+    def setup(self, size, periodic):
+        np.random.seed(0)
+        self.surface = s.RandomFilterSurface(target_acf=s.ACF('exp', 2, 0.1, 0.2), grid_spacing=0.01)
+        self.surface.linear_transform((15, 15), max_it=10)
+
+    def time_discretise(self, size, periodic):
+        self.surface.discretise([size, size], periodic=periodic)
+
+
+class Roughness:
+    """Finding groups of roughness parameters for a randomly rough profile"""
+    params = [GRID_SIZES, list(ROUGHNESS_PARAMETERS)]
+    param_names = ['size', 'parameters']
+    number = 1
+    timeout = 1200
+
+    def setup(self, size, parameters):
+        self.profile = rough_profile(size, False, roughness=1.0)
+
+    def time_roughness(self, size, parameters):
+        s.roughness(self.profile, ROUGHNESS_PARAMETERS[parameters], grid_spacing=1.0)
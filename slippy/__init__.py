@@ -17,6 +17,9 @@ except ImportError:
 
 CORES = multiprocessing.cpu_count()
 OUTPUT_DIR = os.getcwd()
+# if True influence matrices and their spectra are cached on disk in IM_CACHE_DIR, or OUTPUT_DIR/im_cache if not set
+IM_DISK_CACHE = False
+IM_CACHE_DIR = None
 ERROR_IF_MISSING_MODEL = True
 ERROR_IF_MISSING_SUB_MODEL = True
 ERROR_IN_DATA_CHECK = True
@@ -129,6 +129,8 @@ class _SubModelABC(abc.ABC):
     provides: set
     model: _ContactModelABC = None
     no_time: bool = False
+    derived_attributes: tuple = ()
+    """Instance attributes which are found again when needed, eg cached influence matrices, not saved in checkpoints"""
 
     def __init__(self, name: str, requires: set, provides: set):
         if isinstance(name, str):
@@ -159,3 +161,26 @@ class _SubModelABC(abc.ABC):
             dict of found parameters, current state will be updated with these after running the model
 
         """
+
+    def get_state(self) -> dict:
+        """The internal state of the sub model, saved in checkpoints so that models can be resumed
+
+        Returns
+        -------
+        dict
+            By default all of the instance attributes except the model and those named in derived_attributes, these
+            keep the values set when the sub model was made. Sub models with other attributes which cannot be pickled
+            should override this and set_state
+        """
+        return {key: value for key, value in vars(self).items()
+                if key != 'model' and key not in self.derived_attributes}
+
+    def set_state(self, state: dict):
+        """Restore the internal state of the sub model from a checkpoint
+
+        Parameters
+        ----------
+        state: dict
+            A state found by get_state
+        """
+        vars(self).update(state)
@@ -113,19 +113,26 @@ from ._material_utils import Loads, Displacements
 from .hertz import hertz_full, solve_hertz_line, solve_hertz_point
 from .lubricant import Lubricant
 from .lubrication_steps import IterSemiSystem
-from .materials import Elastic, Rigid, rigid, elastic_influence_matrix
+from .materials import Elastic, Rigid, rigid, elastic_influence_matrix, combined_influence_matrix
 from .models import ContactModel
 from .outputs import OutputRequest, OutputReader, OutputSaver, read_output
 from .static_step import StaticStep
 # from .steps import InitialStep
 from .unified_reynolds_solver import UnifiedReynoldsSolver
+from .multigrid_reynolds_solver import MultigridReynoldsSolver
 from .quasi_static_step import QuasiStaticStep
 from . import sub_models
-from .influence_matrix_utils import guess_loads_from_displacement, bccg, plan_convolve
+from .influence_matrix_utils import guess_loads_from_displacement, bccg, fft_preconditioner, plan_convolve, \
+    plan_multi_convolve, clear_plan_cache, polonsky_keer, plan_batch_convolve
+from .sweep import run_sweep
+from .batch_contact import solve_normal_contact_batch
+from .telemetry import Telemetry
 
 __all__ = ['Loads', 'Displacements', 'hertz_full', 'solve_hertz_line', 'solve_hertz_point', 'Lubricant',
            'lubricant_models', 'IterSemiSystem', 'Elastic', 'Rigid', 'rigid', 'elastic_influence_matrix',
-           'ContactModel', 'OutputRequest', 'OutputReader', 'OutputSaver', 'read_output',
-           'StaticStep', 'UnifiedReynoldsSolver', 'sub_models', 'QuasiStaticStep', 'sub_models',
-           'guess_loads_from_displacement', 'bccg', 'plan_convolve'
+           'combined_influence_matrix', 'ContactModel', 'OutputRequest', 'OutputReader', 'OutputSaver', 'read_output',
+           'StaticStep', 'UnifiedReynoldsSolver', 'MultigridReynoldsSolver', 'sub_models', 'QuasiStaticStep',
+           'guess_loads_from_displacement', 'bccg', 'fft_preconditioner', 'plan_convolve', 'plan_multi_convolve',
+           'clear_plan_cache', 'polonsky_keer', 'run_sweep',
+           'plan_batch_convolve', 'solve_normal_contact_batch', 'Telemetry'
            ]
@@ -0,0 +1,127 @@
+"""
+On disk cache for influence matrices and their spectra
+
+Only used if slippy.IM_DISK_CACHE is True, entries are written to slippy.IM_CACHE_DIR or, if that is not set, to an
+im_cache folder in slippy.OUTPUT_DIR. Entries are stored as .npy files and loaded as read only memory maps, so
+processes solving the same problem share the pages through the OS file cache rather than each building their own copy.
+"""
+import glob
+import hashlib
+import mmap
+import os
+import typing
+
+import numpy as np
+
+import slippy
+
+__all__ = ['cache_dir', 'im_cache_file', 'load_or_compute', 'cached_spectrum', 'clear_im_disk_cache']
+
+
+def cache_dir() -> typing.Optional[str]:
+    """The directory used for the disk cache, or None if the disk cache is not in use"""
+    if not slippy.IM_DISK_CACHE:
+        return None
+    if slippy.IM_CACHE_DIR is not None:
+        return os.path.abspath(slippy.IM_CACHE_DIR)
+    return os.path.abspath(os.path.join(slippy.OUTPUT_DIR, 'im_cache'))
+
+
+def im_cache_file(kind: str, comp: str, *params) -> typing.Optional[str]:
+    """The file name for an influence matrix component
+
+    Parameters
+    ----------
+    kind: str
+        The type of influence matrix eg: 'elastic'
+    comp: str
+        The component, used to make the file name readable
+    params
+        Everything else the influence matrix depends on, typically the span, grid spacing and material properties,
+        these must have reproducible reprs
+
+    Returns
+    -------
+    file_name: str or None
+        The full path of the cache entry, None if the disk cache is not in use
+    """
+    directory = cache_dir()
+    if directory is None:
+        return None
+    digest = hashlib.sha1(repr((kind, comp) + params).encode()).hexdigest()[:24]
+    return os.path.join(directory, f'{kind}_{comp}_{digest}.npy')
+
+
+def load_or_compute(file_name: typing.Optional[str], compute: typing.Callable[[], np.ndarray]):
+    """Load an array from the disk cache or compute and store it
+
+    Parameters
+    ----------
+    file_name: str or None
+        The cache entry, if None the array is computed and nothing is stored
+    compute: Callable
+        Called with no arguments to find the array if the entry doesn't exist
+
+    Returns
+    -------
+    array: np.ndarray
+        The array, a read only memory map if the disk cache is in use
+    """
+    if file_name is None:
+        return compute()
+    try:
+        return np.load(file_name, mmap_mode='r')
+    except (OSError, ValueError):
+        pass
+    array = slippy.asnumpy(compute())
+    os.makedirs(os.path.dirname(file_name), exist_ok=True)
+    # written to a temporary file and moved so other processes never see a partial entry
+    temp_name = f'{file_name}.{os.getpid()}.tmp'
+    with open(temp_name, 'wb') as file:
+        np.save(file, array)
+    os.replace(temp_name, file_name)
+    return np.load(file_name, mmap_mode='r')
+
+
+def _source_file(im) -> typing.Optional[str]:
+    """The cache entry an influence matrix was loaded from, None if it wasn't loaded from the disk cache"""
+    directory = cache_dir()
+    if directory is None or not isinstance(im, np.memmap) or not isinstance(im.base, mmap.mmap):
+        # views and copies of cached arrays are not memory maps of the whole file
+        return None
+    file_name = os.path.abspath(im.filename)
+    if os.path.dirname(file_name) != directory:
+        return None
+    return file_name
+
+
+def cached_spectrum(im, tag: str, compute: typing.Callable[[], np.ndarray]):
+    """Find the spectrum of an influence matrix, using the disk cache if the influence matrix was loaded from it
+
+    Parameters
+    ----------
+    im: array
+        The influence matrix
+    tag: str
+        Identifies the transform, including the padded shape and any normalisation
+    compute: Callable
+        Called with no arguments to find the spectrum if it is not cached
+
+    Returns
+    -------
+    spectrum: array
+        The spectrum, as returned by compute or a read only memory map
+    """
+    source = _source_file(im)
+    if source is None:
+        return compute()
+    return load_or_compute(source[:-len('.npy')] + f'_{tag}.npy', compute)
+
+
+def clear_im_disk_cache():
+    """Delete all of the entries in the disk cache"""
+    directory = cache_dir()
+    if directory is None:
+        return
+    for file_name in glob.glob(os.path.join(directory, '*.npy')):
+        os.remove(file_name)
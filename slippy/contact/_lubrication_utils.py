@@ -1,4 +1,5 @@
 import numpy as np
+from numba import njit
 from scipy.linalg.lapack import dgtsv
 
 __all__ = ['tdma', 'cyclic_tdma']
@@ -55,6 +56,7 @@ def cyclic_tdma(lower_diagonal, main_diagonal, upper_diagonal, right_hand_side):
     -----
     Nothing is mutated by this function
     """
+    main_diagonal = np.array(main_diagonal, dtype=float)
     # modify b
     gamma = -main_diagonal[0] if main_diagonal[0] else 1.0
     main_diagonal[0] = main_diagonal[0] - gamma
@@ -72,3 +74,72 @@ def cyclic_tdma(lower_diagonal, main_diagonal, upper_diagonal, right_hand_side):
     factor = (x[0] + x[-1] * lower_diagonal[0] / gamma) / (1 + z[0] + z[-1] * lower_diagonal[0] / gamma)
 
     return x - z * factor
+
+
+@njit(error_model='numpy')
+def _tdma_inplace(lower_diagonal, main_diagonal, upper_diagonal, right_hand_side):
+    """Compiled tri-diagonal solve, the same algorithm as LAPACK's dgtsv (gaussian elimination with partial pivoting)
+
+    For use inside other compiled functions, all of the arrays are overwritten, the solution is left in
+    right_hand_side. Arrays are as for tdma: lower and upper diagonals are length n-1, the others are length n.
+    """
+    n = main_diagonal.size
+    for i in range(n - 1):
+        if abs(main_diagonal[i]) >= abs(lower_diagonal[i]):
+            # no row interchange
+            fact = lower_diagonal[i] / main_diagonal[i]
+            main_diagonal[i + 1] -= fact * upper_diagonal[i]
+            right_hand_side[i + 1] -= fact * right_hand_side[i]
+            lower_diagonal[i] = 0.0
+        else:
+            # interchange rows i and i+1, the lower diagonal is reused for the second upper diagonal
+            fact = main_diagonal[i] / lower_diagonal[i]
+            main_diagonal[i] = lower_diagonal[i]
+            temp = main_diagonal[i + 1]
+            main_diagonal[i + 1] = upper_diagonal[i] - fact * temp
+            if i < n - 2:
+                lower_diagonal[i] = upper_diagonal[i + 1]
+                upper_diagonal[i + 1] = -fact * lower_diagonal[i]
+            upper_diagonal[i] = temp
+            temp = right_hand_side[i]
+            right_hand_side[i] = right_hand_side[i + 1]
+            right_hand_side[i + 1] = temp - fact * right_hand_side[i + 1]
+    # back substitution
+    right_hand_side[n - 1] /= main_diagonal[n - 1]
+    if n > 1:
+        right_hand_side[n - 2] = (right_hand_side[n - 2] - upper_diagonal[n - 2] * right_hand_side[n - 1]) / \
+            main_diagonal[n - 2]
+    for i in range(n - 3, -1, -1):
+        right_hand_side[i] = (right_hand_side[i] - upper_diagonal[i] * right_hand_side[i + 1] -
+                              lower_diagonal[i] * right_hand_side[i + 2]) / main_diagonal[i]
+
+
+@njit(error_model='numpy')
+def _cyclic_tdma_inplace(lower_diagonal, main_diagonal, upper_diagonal, right_hand_side, work_lower, work_main,
+                         work_upper, work_z):
+    """Compiled cyclic tri-diagonal solve by the sherman morrison formula
+
+    For use inside other compiled functions, all of the arrays are overwritten, the solution is left in
+    right_hand_side. Arrays are as for cyclic_tdma (all length n), the work arrays must be length n-1, n, n-1 and n.
+    """
+    n = main_diagonal.size
+    gamma = -main_diagonal[0] if main_diagonal[0] else 1.0
+    top_right = lower_diagonal[0]
+    bottom_left = upper_diagonal[n - 1]
+    main_diagonal[0] -= gamma
+    main_diagonal[n - 1] -= top_right * bottom_left / gamma
+    # find Ax=rhs
+    work_lower[:] = lower_diagonal[1:]
+    work_main[:] = main_diagonal
+    work_upper[:] = upper_diagonal[:n - 1]
+    _tdma_inplace(work_lower, work_main, work_upper, right_hand_side)
+    # find Az=u
+    work_z[:] = 0.0
+    work_z[0] = gamma
+    work_z[n - 1] = bottom_left
+    _tdma_inplace(lower_diagonal[1:], main_diagonal, upper_diagonal[:n - 1], work_z)
+    # find the factor from the second part of SM formula
+    factor = ((right_hand_side[0] + right_hand_side[n - 1] * top_right / gamma) /
+              (1 + work_z[0] + work_z[n - 1] * top_right / gamma))
+    for i in range(n):
+        right_hand_side[i] -= factor * work_z[i]
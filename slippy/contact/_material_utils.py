@@ -1,5 +1,5 @@
 import numpy as np
-from collections import namedtuple
+from collections import namedtuple, OrderedDict
 import inspect
 from functools import wraps
 
@@ -11,6 +11,32 @@ Loads = namedtuple('Loads', 'x y z', defaults=(None,)*3)
 Displacements = namedtuple('Displacements', 'x y z', defaults=(None,)*3)
 
 
+def _freeze(value):
+    """Convert a value to a hashable equivalent, used to build cache keys"""
+    if isinstance(value, np.ndarray):
+        return value.shape, value.dtype.str, value.tobytes()
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+
+COMPONENT_CACHE_BYTES = 2 ** 30
+"""The approximate memory held by the results cached by each memoized function before the least recently used are
+dropped"""
+
+
+def _nbytes(result) -> int:
+    """The memory held by a cached result, arrays and sequences or dicts of arrays are counted, other results are
+    counted as 0"""
+    if isinstance(result, dict):
+        return sum(_nbytes(v) for v in result.values())
+    if isinstance(result, (list, tuple)):
+        return sum(_nbytes(v) for v in result)
+    return int(getattr(result, 'nbytes', 0))
+
+
 def memoize_components(static_method=True):
     """ A decorator factory for memoizing the components of an influence matrix or other method with components
 
@@ -26,59 +52,54 @@ def memoize_components(static_method=True):
     Have it's first argument be the component
     components must be hashable
 
-    The cache is a dict with the same keys as previously passed components, when any of the other input arguments change
-    the cache is deleted
+    The cache is an ordered dict keyed by the component and the other input arguments, lists and arrays in the other
+    arguments are converted to tuples to build the key. Repeated calls with the same arguments return the same object.
+    When the cached results take more than COMPONENT_CACHE_BYTES the least recently used are dropped, the newest result
+    is always kept.
 
-    The wrapped callable will have the additional attributes:
+    The wrapped callable will have the additional attribute:
 
-    cache : dict
+    cache : OrderedDict
         All of the cached values, use cache.clear() to remove manually
-    spec : list
-        The other arguments passed to the callable (if any of these change the cache is cleared)
     """
     if not isinstance(static_method, bool):
         raise ValueError('memoize_components is a decorator factory, it cannot be applied as a decorator directly.'
                          ' static_method argument must be a bool')
 
     def outer(fn):
-        # non local variables spec is a list to ensure it's mutable
-        spec = []
-        cache = []
+        cache = OrderedDict()
         sig = inspect.signature(fn)
 
+        def lookup(key, *args, **kwargs):
+            try:
+                result = cache.pop(key)
+            except KeyError:
+                result = fn(*args, **kwargs)
+            except TypeError:
+                # un-hashable arguments, can't be cached
+                return fn(*args, **kwargs)
+            cache[key] = result
+            total = sum(_nbytes(value) for value in cache.values())
+            while total > COMPONENT_CACHE_BYTES and len(cache) > 1:
+                total -= _nbytes(cache.popitem(last=False)[1])
+            return result
+
         if static_method:
             @wraps(fn)
             def inner(component, *args, **kwargs):
-                nonlocal cache, spec, sig
-                new_spec = sig.bind(None, *args, **kwargs)
-                new_spec.apply_defaults()
-                try:
-                    index = spec.index(new_spec)
-                except ValueError:
-                    spec.append(new_spec)
-                    cache.append(dict())
-                    index = len(cache)-1
-                if component not in cache[index]:
-                    cache[index][component] = fn(component, *args, **kwargs)
-                return cache[index][component]
+                spec = sig.bind(None, *args, **kwargs)
+                spec.apply_defaults()
+                key = (component, _freeze(spec.args[1:]), _freeze(spec.kwargs))
+                return lookup(key, component, *args, **kwargs)
         else:
             @wraps(fn)
             def inner(self, component, *args, **kwargs):
-                nonlocal cache, spec, sig
-                new_spec = sig.bind(None, None, *args, **kwargs)
-                new_spec.apply_defaults()
-                try:
-                    index = spec.index(new_spec)
-                except ValueError:
-                    spec.append(new_spec)
-                    cache.append(dict())
-                    index = len(cache)-1
-                if component not in cache[index]:
-                    cache[index][component] = fn(component, *args, **kwargs)
-                return cache[index][component]
+                spec = sig.bind(None, None, *args, **kwargs)
+                spec.apply_defaults()
+                key = (self, component, _freeze(spec.args[2:]), _freeze(spec.kwargs))
+                return lookup(key, self, component, *args, **kwargs)
 
         inner.cache = cache
-        inner.spec = spec
 
         return inner
 
@@ -4,7 +4,6 @@ Helper functions for steps
 import os
 import typing
 import warnings
-import bisect
 from collections import namedtuple
 from numbers import Number
 from scipy.interpolate import interp1d
@@ -19,12 +18,13 @@ else:
     cp = None
 
 from slippy.abcs import _ContactModelABC  # noqa: E402
+from . import telemetry  # noqa: E402
 from ._material_utils import Loads, Displacements  # noqa: E402
-from .influence_matrix_utils import bccg, plan_convolve, guess_loads_from_displacement  # noqa: E402
-from .materials import _IMMaterial  # noqa: E402
+from .influence_matrix_utils import bccg, plan_convolve, guess_loads_from_displacement, polonsky_keer  # noqa: E402
+from .materials import _IMMaterial, combined_influence_matrix  # noqa: E402
 
 __all__ = ['solve_normal_interference', 'get_next_file_num', 'OffSetOptions', 'solve_normal_loading',
-           'HeightOptimisationFunction', 'make_interpolation_func']
+           'HeightOptimisationFunction', 'make_interpolation_func', 'bracket_interference']
 
 OffSetOptions = namedtuple('off_set_options', ['off_set', 'abs_off_set', 'periodic', 'interpolation_mode'])
 
@@ -64,6 +64,130 @@ def make_interpolation_func(values, kind, name: str):
     return interp1d(time, position, kind, bounds_error=True)
 
 
+class _HeightCache:
+    """A fixed capacity cache of contact solutions at different heights (interferences), kept sorted by height
+
+    Parameters
+    ----------
+    shape: tuple
+        The shape of the load fields
+    capacity: int, optional (16)
+        The maximum number of entries, when full the least recently used entry which is not pinned is removed
+    store_loads: bool, optional (True)
+        If False only the heights and total loads are stored
+    dtype: numpy dtype, optional (np.float64)
+        The type used to store the load fields, float32 halves the memory used, the loads are only used as initial
+        guesses so the loss of precision does not change the solution
+    rtol: float, optional (1e-12)
+        The relative tolerance used to match heights
+    xp: module, optional (numpy)
+        The array module used to store the load fields, numpy or cupy
+
+    Notes
+    -----
+    Heights and total loads are held in sorted numpy arrays, the load fields are held in a single array allocated when
+    the first load field is stored, so the memory used is fixed by the capacity.
+    """
+
+    def __init__(self, shape: tuple, capacity: int = 16, store_loads: bool = True, dtype=np.float64,
+                 rtol: float = 1e-12, xp=np):
+        if capacity < 4:
+            raise ValueError("Height cache capacity must be at least 4")
+        self.shape = tuple(shape)
+        self.capacity = capacity
+        self.store_loads = store_loads
+        self.dtype = dtype
+        self.rtol = rtol
+        self._xp = xp
+        self.heights = np.zeros(0)
+        self.total_loads = np.zeros(0)
+        self._slots = np.zeros(0, dtype=int)
+        self._pinned = np.zeros(0, dtype=bool)
+        self._last_used = np.zeros(0, dtype=int)
+        self._clock = 0
+        self._store = None
+
+    def __len__(self):
+        return self.heights.size
+
+    def find(self, height: float) -> typing.Optional[int]:
+        """The index of a cached height within the tolerance, None if the height is not cached"""
+        index = int(np.searchsorted(self.heights, height))
+        for i in (index - 1, index):
+            if 0 <= i < len(self):
+                cached = self.heights[i]
+                if abs(cached - height) <= self.rtol * max(abs(height), abs(cached)):
+                    self.touch(i)
+                    return i
+        return None
+
+    def touch(self, *indexes: int):
+        """Mark entries as used, recently used entries are the last to be removed"""
+        self._clock += 1
+        self._last_used[list(indexes)] = self._clock
+
+    @property
+    def pinned(self) -> np.ndarray:
+        """True for the entries which are never removed"""
+        return self._pinned
+
+    def loads(self, index: int):
+        """The load field at an index, None if load fields are not stored"""
+        slot = self._slots[index]
+        if slot < 0:
+            return None
+        return self._store[slot]
+
+    def add(self, height: float, total_load: float, loads=None, pinned: bool = False):
+        """Add an entry, if the height is already cached nothing is changed
+
+        Parameters
+        ----------
+        height: float
+            The height (interference)
+        total_load: float
+            The total load at this height
+        loads: array, optional (None)
+            The full load field at this height
+        pinned: bool, optional (False)
+            If True the entry is never removed, used for the bounding values
+        """
+        if self.find(height) is not None:
+            return
+        if len(self) >= self.capacity:
+            self._evict()
+        slot = -1
+        if self.store_loads and loads is not None:
+            if self._store is None:
+                self._store = self._xp.empty((self.capacity,) + self.shape, dtype=self.dtype)
+            slot = int(np.setdiff1d(np.arange(self.capacity), self._slots)[0])
+            self._store[slot] = loads
+        index = int(np.searchsorted(self.heights, height))
+        self._clock += 1
+        self.heights = np.insert(self.heights, index, height)
+        self.total_loads = np.insert(self.total_loads, index, total_load)
+        self._slots = np.insert(self._slots, index, slot)
+        self._pinned = np.insert(self._pinned, index, pinned)
+        self._last_used = np.insert(self._last_used, index, self._clock)
+
+    def _evict(self):
+        candidates = np.flatnonzero(~self._pinned)
+        if not candidates.size:
+            raise ValueError("Height cache is full of pinned entries")
+        self._remove(candidates[np.argmin(self._last_used[candidates])])
+
+    def _remove(self, index):
+        self.heights = np.delete(self.heights, index)
+        self.total_loads = np.delete(self.total_loads, index)
+        self._slots = np.delete(self._slots, index)
+        self._pinned = np.delete(self._pinned, index)
+        self._last_used = np.delete(self._last_used, index)
+
+    def clear(self):
+        """Remove all entries which are not pinned"""
+        self._remove(np.flatnonzero(~self._pinned))
+
+
 class HeightOptimisationFunction:
     """ A class to make a memorised function to be used in a height optimisation loop
     Ths doesn't do the optimising it just gives a a callable class that can be used in one of scipy's methods
@@ -94,9 +218,28 @@ class HeightOptimisationFunction:
     cache_loads: bool, optional (True)
         If False the full loads result will not be cached (otherwise this will be used to generate an initial guess of
         the loads for each iteration)
+    cache_size: int, optional (16)
+        The maximum number of results held in the cache, when full the least recently used result is removed
+    cache_dtype: numpy dtype, optional (np.float64)
+        The type used to store the cached load fields, np.float32 halves the memory used by the cache
+    grid_spacing: float, optional (None)
+        The grid spacing of the just touching gap, defaults to the grid spacing of the first surface, set this if the
+        gap has been resampled onto a coarser grid (only supported for influence matrix based materials)
+    periodic_axes: tuple, optional ((False, False))
+        For each True value the corresponding axis will be solved by circular convolution
+    preconditioner: {None, 'fft'}, optional (None)
+        The preconditioner passed to bccg, see bccg for details
+
+    Attributes
+    ----------
+    inner_iterations: int
+        The total number of bccg iterations used by this function, useful to compare preconditioners
     """
     _contact_nodes = None
+    _initial_guess = None
+    _max_pressure = np.inf
     _last_loads = None
+    _last_evaluation = None
     _results: typing.Optional[dict] = None
     set_contact_nodes = False
 
@@ -104,14 +247,15 @@ class HeightOptimisationFunction:
                  adhesion_model: float, initial_contact_nodes: np.ndarray,
                  max_it_inner: int, tol_inner: float, material_options: typing.Union[typing.Sequence[dict], dict],
                  max_set_load: float, tolerance: float, use_cache: bool = True, cache_loads=True,
-                 periodic_axes: typing.Tuple[bool] = (False, False)):
+                 periodic_axes: typing.Tuple[bool] = (False, False), preconditioner: str = None,
+                 cache_size: int = 16, cache_dtype=np.float64, grid_spacing: float = None):
         if slippy.CUDA:
             xp = cp
             cache_loads = False
         else:
             xp = np
 
-        self._grid_spacing = model.surface_1.grid_spacing
+        self._grid_spacing = model.surface_1.grid_spacing if grid_spacing is None else float(grid_spacing)
 
         self._just_touching_gap = xp.asarray(just_touching_gap)
 
@@ -125,19 +269,19 @@ class HeightOptimisationFunction:
         self._original_set_load = max_set_load
         self._set_load = float(max_set_load)
         self._periodic_axes = periodic_axes
-        self.cache_heights = [0.0]
-        self.cache_total_load = [0.0]
-        self.cache_surface_loads = [xp.zeros(just_touching_gap.shape)]
+        self._preconditioner = preconditioner
+        self.inner_iterations = 0
         self.tolerance = tolerance
         self.it = 0
         self.use_cache = use_cache
         self.use_loads_cache = cache_loads
+        self._cache_size = cache_size
+        self._cache_dtype = cache_dtype
         surf_1 = model.surface_1
         surf_2 = model.surface_2
 
         self.im_mats = False
         self.conv_func = None
-        self.cache_max = False
         self.last_call_failed = False
 
         if isinstance(surf_1.material, _IMMaterial) and isinstance(surf_2.material, _IMMaterial):
@@ -145,22 +289,99 @@ class HeightOptimisationFunction:
             span = just_touching_gap.shape
             max_pressure = min([surf_1.material.max_load, surf_2.material.max_load])
             self._max_pressure = max_pressure
-            im1 = surf_1.material.influence_matrix(span=span, grid_spacing=[surf_1.grid_spacing] * 2,
-                                                   components=['zz'])['zz']
-            im2 = surf_2.material.influence_matrix(span=span, grid_spacing=[surf_1.grid_spacing] * 2,
-                                                   components=['zz'])['zz']
-            total_im = im1 + im2
-            self.total_im = xp.asarray(total_im)
+            # the host array is kept, plan_convolve moves it to the gpu and finds its spectrum in the disk cache
+            self.total_im = combined_influence_matrix(surf_1.material, surf_2.material, span, [self._grid_spacing] * 2)
 
             self.conv_func = plan_convolve(just_touching_gap, self.total_im, self.contact_nodes, circular=periodic_axes)
 
-            if use_cache and max_pressure != np.inf:
-                max_loads = max_pressure * xp.ones(just_touching_gap.shape)
-                self.cache_total_load.append(max_pressure * just_touching_gap.size * surf_1.grid_spacing ** 2)
-                max_elastic_disp = self.conv_func(max_loads)
-                self.cache_heights.append(xp.max(max_elastic_disp + xp.asarray(just_touching_gap)))
-                if cache_loads:
-                    self.cache_surface_loads.append(max_loads)
+        self._reset_cache()
+
+    def _reset_cache(self):
+        """Set the cache to the bounding values: no load at the just touching height and the maximum load"""
+        if slippy.CUDA:
+            xp = cp
+        else:
+            xp = np
+        shape = self._just_touching_gap.shape
+        self._cache = _HeightCache(shape, self._cache_size, self.use_loads_cache, self._cache_dtype, xp=xp)
+        self._cache.add(0.0, 0.0, xp.zeros(shape), pinned=True)
+        if self.im_mats and self.use_cache and self._max_pressure != np.inf:
+            max_loads = self._max_pressure * xp.ones(shape)
+            max_total_load = self._max_pressure * self._just_touching_gap.size * self._grid_spacing ** 2
+            conv_func = plan_convolve(self._just_touching_gap, self.total_im, None, circular=self._periodic_axes)
+            max_elastic_disp = conv_func(max_loads)
+            self._cache.add(float(xp.max(max_elastic_disp + self._just_touching_gap)), max_total_load, max_loads,
+                            pinned=True)
+
+    @property
+    def cache_heights(self) -> np.ndarray:
+        """The cached heights in ascending order"""
+        return self._cache.heights
+
+    @property
+    def cache_total_load(self) -> np.ndarray:
+        """The total loads at each of the cached heights"""
+        return self._cache.total_loads
+
+    @property
+    def cache_surface_loads(self) -> list:
+        """The load fields at each of the cached heights, None where load fields are not cached"""
+        return [self._cache.loads(i) for i in range(len(self._cache))]
+
+    def update_gap(self, just_touching_gap, initial_contact_nodes=None):
+        """Change the just touching gap, keeping the influence matrices and convolution plans
+
+        Parameters
+        ----------
+        just_touching_gap: np.ndarray
+            The new just touching gap, must be the same shape as the original
+        initial_contact_nodes: np.ndarray, optional (None)
+            If set the solution will be constrained to these nodes
+
+        Notes
+        -----
+        This is much cheaper than making a new function when the gap changes slightly, for example between the time
+        steps of a sliding contact. The cache is reset as cached results are only valid for one gap.
+        """
+        if slippy.CUDA:
+            xp = cp
+        else:
+            xp = np
+        if not self.im_mats or tuple(just_touching_gap.shape) != tuple(self._just_touching_gap.shape):
+            raise ValueError("The gap can only be updated for influence matrix based materials and the same shape gap")
+        self._just_touching_gap = xp.asarray(just_touching_gap)
+        self.initial_contact_nodes = initial_contact_nodes
+        self.contact_nodes = initial_contact_nodes
+        self._results = None
+        self._initial_guess = None
+        self.it = 0
+        self._reset_cache()
+
+    def set_initial_guess(self, loads, interference: float):
+        """Set a known solution close to the one sought, eg the solution from the previous time step
+
+        Parameters
+        ----------
+        loads: array
+            The full loads array
+        interference: float
+            The interference the loads were found at
+
+        Notes
+        -----
+        The loads are used as the initial guess for the inner solver when the interference is closer to the set
+        interference than any cached result, this is reset when the gap is updated.
+        """
+        if slippy.CUDA:
+            xp = cp
+        else:
+            xp = np
+        self._initial_guess = (float(interference), xp.asarray(loads))
+
+    @property
+    def shape(self) -> tuple:
+        """The shape of the just touching gap"""
+        return tuple(self._just_touching_gap.shape)
 
     @property
     def contact_nodes(self):
@@ -197,10 +418,10 @@ class HeightOptimisationFunction:
             surf_2 = self._model.surface_2
             span = self._just_touching_gap.shape
             # noinspection PyUnresolvedReferences
-            im1 = surf_1.material.influence_matrix(span=span, grid_spacing=[surf_1.grid_spacing] * 2,
+            im1 = surf_1.material.influence_matrix(span=span, grid_spacing=[self._grid_spacing] * 2,
                                                    components=['zz'])['zz']
             # noinspection PyUnresolvedReferences
-            im2 = surf_2.material.influence_matrix(span=span, grid_spacing=[surf_1.grid_spacing] * 2,
+            im2 = surf_2.material.influence_matrix(span=span, grid_spacing=[self._grid_spacing] * 2,
                                                    components=['zz'])['zz']
             full_loads = xp.zeros(self._just_touching_gap.shape)
 
@@ -209,13 +430,13 @@ class HeightOptimisationFunction:
                 full_disp = xp.asnumpy(self.conv_func(self._results['loads_in_domain'], ignore_domain=True))
             else:
                 full_loads[self._results['domain']] = self._results['loads_in_domain']
-                full_disp = self.conv_func(self._results['loads_in_domain'], ignore_domain=True)
+                full_disp = self.conv_func(self._results['loads_in_domain'], ignore_domain=True).copy()
 
             conv_func_1 = plan_convolve(full_loads, im1, None, circular=self._periodic_axes)
             conv_func_2 = plan_convolve(full_loads, im2, None, circular=self._periodic_axes)
 
-            disp_1 = conv_func_1(full_loads)
-            disp_2 = conv_func_2(full_loads)
+            disp_1 = conv_func_1(full_loads).copy()
+            disp_2 = conv_func_2(full_loads).copy()
 
             if slippy.CUDA:
                 disp_1, disp_2 = xp.asnumpy(disp_1), xp.asnumpy(disp_2)
@@ -236,14 +457,8 @@ class HeightOptimisationFunction:
             return self._results
 
     def clear_cache(self):
-        if self.cache_max:
-            self.cache_heights = [self.cache_heights[0], self.cache_heights[-1]]
-            self.cache_total_load = [self.cache_total_load[0], self.cache_total_load[-1]]
-            self.cache_surface_loads = [self.cache_surface_loads[0], self.cache_surface_loads[-1]]
-        else:
-            self.cache_heights = []
-            self.cache_total_load = []
-            self.cache_surface_loads = []
+        """Remove all cached results except the bounding values"""
+        self._cache.clear()
 
     def change_load(self, new_load, contact_nodes):
         # if you change the load... need to change the set load,
@@ -261,7 +476,7 @@ class HeightOptimisationFunction:
         # want to find the closest HEIGHT above and below the set load, if none above or below return None for that one
         if len(self.cache_heights) < 2:
             return lower, upper
-        index = bisect.bisect_left(self.cache_total_load, self._set_load)
+        index = int(np.searchsorted(self.cache_total_load, self._set_load))
         try:
             upper_bound = self.cache_heights[index]
         except IndexError:
@@ -279,18 +494,151 @@ class HeightOptimisationFunction:
 
         return float(lower_bound), float(upper_bound)
 
+    def get_loads_from_cache(self, height):
+        """Find an initial guess for the loads at a height from the cached load fields
+
+        Parameters
+        ----------
+        height: float
+            The interference
+
+        Returns
+        -------
+        loads: array or None
+            The full loads array, linearly interpolated between the cached loads at the nearest heights above and below
+            the set height, if the height is outside the cached range the nearest loads are used. If an initial guess
+            has been set which is closer to the height than any cached result it is used instead. None if no loads
+            are cached
+
+        Notes
+        -----
+        The pinned entry at the maximum load is never used, every node in it is at the maximum pressure so bccg would
+        start with no free nodes. For the same reason the guess is clipped to just below the maximum pressure.
+        """
+        if slippy.CUDA:
+            xp = cp
+        else:
+            xp = np
+        usable = self._warm_start_indexes()
+        heights = self._cache.heights[usable]
+        if self._initial_guess is not None:
+            guess_height, guess_loads = self._initial_guess
+            if np.all(np.abs(height - guess_height) <= np.abs(height - heights)):
+                return self._clip_guess(guess_loads)
+        if not self.use_loads_cache or not len(heights):
+            return None
+        index = int(np.searchsorted(heights, height))
+        if index == 0 or index == len(heights):
+            nearest = usable[0 if index == 0 else -1]
+            self._cache.touch(nearest)
+            return self._clip_guess(xp.asarray(self._cache.loads(nearest), dtype=float))
+        below, above = usable[index - 1], usable[index]
+        self._cache.touch(below, above)
+        weight = (height - heights[index - 1]) / (heights[index] - heights[index - 1])
+        return self._clip_guess((1 - weight) * self._cache.loads(below).astype(float) +
+                                weight * self._cache.loads(above))
+
+    def _warm_start_indexes(self) -> np.ndarray:
+        """Indexes of the cached entries which can be used as initial guesses, all but the saturated bounding entry"""
+        saturated = np.logical_and(self._cache.pinned, self._cache.total_loads > 0)
+        return np.flatnonzero(~saturated)
+
+    def _clip_guess(self, loads):
+        """Clip an initial guess to just below the maximum pressure so that bccg starts with free nodes"""
+        if self._max_pressure == np.inf:
+            return loads
+        if slippy.CUDA:
+            xp = cp
+        else:
+            xp = np
+        return xp.minimum(loads, self._max_pressure * (1 - 1e-6))
+
+    def solve_set_load(self, current_state) -> float:
+        """Solve for the set load directly, rather than finding the root of this function
+
+        Parameters
+        ----------
+        current_state: dict
+            The current state of the model, not used but kept for consistency with calling this function
+
+        Returns
+        -------
+        interference: float
+            The interference which gives the set load, the full results can then be found from the results property
+
+        Notes
+        -----
+        The total load is enforced in every iteration of the inner solver, see polonsky_keer for details. The initial
+        guess is the initial guess if one has been set, otherwise the cached load field with the total load closest to
+        the set load. Only influence matrix based materials without adhesion are supported.
+        """
+        if slippy.CUDA:
+            xp = cp
+        else:
+            xp = np
+        if not self.im_mats:
+            raise ValueError("Solving directly for the set load is only supported for influence matrix based materials")
+        if self._adhesion_model:
+            raise ValueError("Solving directly for the set load is not supported with adhesion")
+        if not self.set_contact_nodes:
+            # any node could come into contact
+            self.contact_nodes = xp.ones(self._just_touching_gap.shape, dtype=bool)
+        contact_nodes = self.contact_nodes
+        initial_guess = None
+        if self._initial_guess is not None:
+            initial_guess = self._initial_guess[1][contact_nodes]
+        elif self.use_loads_cache and len(self._warm_start_indexes()) > 1:
+            usable = self._warm_start_indexes()
+            index = usable[int(np.argmin(np.abs(self._cache.total_loads[usable] - self._set_load)))]
+            self._cache.touch(index)
+            initial_guess = self._clip_guess(xp.asarray(self._cache.loads(index)[contact_nodes], dtype=float))
+        pk_info = dict()
+        loads_in_domain, height, failed = polonsky_keer(self.conv_func, self._just_touching_gap[contact_nodes],
+                                                        self._set_load, self._grid_spacing ** 2, self._tol_inner,
+                                                        self._max_it_inner, initial_guess, self._max_pressure,
+                                                        info=pk_info)
+        self.it += 1
+        self.inner_iterations += pk_info['iterations']
+        self._results = {'loads_in_domain': loads_in_domain, 'domain': contact_nodes, 'interference': height}
+        total_load = float(xp.sum(loads_in_domain) * self._grid_spacing ** 2)
+        failed = failed or not np.isfinite(total_load)
+        if self.use_loads_cache:
+            full_loads = xp.zeros(contact_nodes.shape)
+            full_loads[contact_nodes] = loads_in_domain
+        else:
+            full_loads = None
+        self.add_to_cache(height, total_load, full_loads, failed)
+        self.last_call_failed = failed
+        self._last_evaluation = (height, total_load)
+        return height
+
+    def summary(self) -> str:
+        """A one line description of the last evaluation, for the log
+
+        The solvers make no messages while solving, this is called once the set load or interference has been found.
+        The telemetry records each evaluation if more detail is needed, see slippy.contact.Telemetry
+        """
+        if self._last_evaluation is None:
+            return 'No evaluations made'
+        height, total_load = self._last_evaluation
+        return (f"{'Failed' if self.last_call_failed else 'Solved'}: interference: {height}\t"
+                f"Total load: {total_load}\tTarget load: {self._set_load}\tEvaluations: {self.it}\t"
+                f"Inner iterations: {self.inner_iterations}")
+
     def __call__(self, height, current_state):
         if slippy.CUDA:
             xp = cp
         else:
             xp = np
-        # If the height guess is in the cache that can be out load guess
-        pressure_initial_guess = None  # overwritten in one case where it should be (cached)
         height = float(height)
-        if height in self.cache_heights:
-            total_load = self.cache_total_load[self.cache_heights.index(height)]
-            print(f"Returning bound value from cache: height: {height:.4}, total_load {total_load:.4}")
+        cached = self._cache.find(height)
+        if cached is not None:
+            total_load = float(self._cache.total_loads[cached])
+            telemetry.record('height_evaluation', 2, interference=height, total_load=total_load,
+                             target_load=self._set_load, iterations=0, cached=True, failed=False)
             return total_load - self._set_load
+        # the cached loads at the nearest heights are a much better starting point for bccg than zeros
+        pressure_initial_guess = self.get_loads_from_cache(height)
         self.it += 1
         # if im mats we can save some time here mostly by not moving data to and from the gpu
         if self.im_mats:
@@ -299,23 +647,31 @@ class HeightOptimisationFunction:
                 self.contact_nodes = z > 0  # this will remake the conv function as a side effect
             contact_nodes = self.contact_nodes
             if not xp.any(contact_nodes):
-                print('no contact nodes')
                 total_load = 0
                 full_loads = xp.zeros(contact_nodes.shape, dtype=xp.float32)
                 failed = False
+                iterations = 0
             else:
-                if pressure_initial_guess is None:
-                    pressure_initial_guess = xp.zeros_like(z)
-                else:
-                    pressure_initial_guess = pressure_initial_guess.z
                 z_in = z[contact_nodes]
-                pressure_guess_in = pressure_initial_guess[contact_nodes]
-                loads_in_domain, failed = bccg(self.conv_func, z_in, self._tol_inner,
-                                               self._max_it_inner, pressure_guess_in,
-                                               self._adhesion_model, self._max_pressure)
+                iterations = 0
+                # if the warm started solve fails it is repeated from zeros before the call is counted as failed
+                guesses = [xp.zeros_like(z_in)]
+                if pressure_initial_guess is not None and xp.any(pressure_initial_guess[contact_nodes]):
+                    guesses.insert(0, pressure_initial_guess[contact_nodes])
+                for pressure_guess_in in guesses:
+                    bccg_info = dict()
+                    loads_in_domain, failed = bccg(self.conv_func, z_in, self._tol_inner,
+                                                   self._max_it_inner, pressure_guess_in,
+                                                   self._adhesion_model, self._max_pressure,
+                                                   preconditioner=self._preconditioner, info=bccg_info)
+                    iterations += bccg_info['iterations']
+                    total_load = float(xp.sum(loads_in_domain) * self._grid_spacing ** 2)
+                    failed = failed or not np.isfinite(total_load)
+                    if not failed:
+                        break
+                self.inner_iterations += iterations
                 self._results = {'loads_in_domain': loads_in_domain, 'domain': self.contact_nodes,
                                  'interference': height}
-                total_load = float(xp.sum(loads_in_domain) * self._grid_spacing ** 2)
                 if self.use_loads_cache:
                     full_loads = xp.zeros(contact_nodes.shape)
                     full_loads[contact_nodes] = loads_in_domain
@@ -323,16 +679,15 @@ class HeightOptimisationFunction:
                     full_loads = None
 
             self.add_to_cache(height, total_load, full_loads, failed)
-            if failed:
-                # noinspection PyUnboundLocalVariable
-                print(f'Failed: total load: {total_load}, height {height}, max_load {xp.max(loads_in_domain)}')
-                self.last_call_failed = True
-            else:
-                print(f'Solved: interference: {height}\tTotal load: {total_load}\tTarget load: {self._set_load}')
-                self.last_call_failed = False
+            self.last_call_failed = bool(failed)
+            self._last_evaluation = (height, total_load)
+            telemetry.record('height_evaluation', 2, interference=height, total_load=total_load,
+                             target_load=self._set_load, iterations=iterations, cached=False, failed=bool(failed))
             return total_load - self._set_load
 
         # else use the basic form
+        if pressure_initial_guess is not None:
+            pressure_initial_guess = Loads(z=pressure_initial_guess)
 
         loads, total_disp, disp_1, disp_2, contact_nodes, failed = \
             solve_normal_interference(height, gap=self._just_touching_gap,
@@ -353,30 +708,70 @@ class HeightOptimisationFunction:
         self._results['interference'] = height
 
         total_load = np.sum(loads.z.flatten()) * self._grid_spacing ** 2
+        failed = failed or not np.isfinite(total_load)
 
         self._results['total_normal_load'] = total_load
 
-        if failed:
-            self.last_call_failed = True
-            print(f'Failed: total load: {total_load}, height {height}, max_load {np.max(loads.z.flatten())}')
-        else:
-            self.last_call_failed = False
-            print(f'Interference is: {height}\tTotal load is: {total_load}\tTarget load is: {self._set_load}')
+        self.last_call_failed = bool(failed)
+        self._last_evaluation = (height, total_load)
 
         self.add_to_cache(height, total_load, loads.z, failed)
+        telemetry.record('height_evaluation', 2, interference=height, total_load=float(total_load),
+                         target_load=self._set_load, cached=False, failed=bool(failed))
 
         return total_load - self._set_load
 
     def add_to_cache(self, height, total_load, loads, failed):
-        if self.use_cache and height not in self.cache_heights and not failed:
-            print(f"Inserting height: {height}, total_load: {total_load} into cache, len = {1+len(self.cache_heights)}")
-            index = bisect.bisect_left(self.cache_heights, height)
-            self.cache_heights.insert(index, height)
-            self.cache_total_load.insert(index, total_load)
-            # print(f'Cache: adding value: total load: {total_load},
-            # height {height}, cache len:{len(self.cache_heights)}')
-            if self.use_loads_cache:
-                self.cache_surface_loads.insert(index, loads)
+        failed = failed or not np.isfinite(total_load)
+        if self.use_cache and not failed and self._cache.find(height) is None:
+            self._cache.add(height, total_load, loads if self.use_loads_cache else None)
+
+
+def bracket_interference(h_opt_func: HeightOptimisationFunction, interference: float, upper: float, max_it: int,
+                         current_state: dict) -> typing.Tuple[float, float]:
+    """Find a tight bracket on the interference which gives the set load by stepping out from a good estimate
+
+    Parameters
+    ----------
+    h_opt_func: HeightOptimisationFunction
+        The function which will be passed to the root finder
+    interference: float
+        The estimate of the interference, eg: from the previous time step or from a coarser grid
+    upper: float
+        The upper bound used if the estimate is not between 0 and upper
+    max_it: int
+        The maximum number of steps taken from the estimate
+    current_state: dict
+        The current state of the model, passed to h_opt_func
+
+    Returns
+    -------
+    lower, upper: float
+        The bracket, (0, upper) if the estimate is outside this range
+    """
+    lower = 0.0
+    if not lower < interference < upper:
+        return lower, upper
+    increasing = h_opt_func(interference, current_state) < 0
+    if increasing:
+        lower = interference
+    else:
+        upper = interference
+    step = 0.01 * interference
+    for _ in range(max_it):
+        trial = interference + step if increasing else interference - step
+        if not lower < trial < upper:
+            break
+        if h_opt_func(trial, current_state) < 0:
+            lower = trial
+            if not increasing:
+                break
+        else:
+            upper = trial
+            if increasing:
+                break
+        step *= 2
+    return lower, upper
 
 
 def solve_normal_loading(loads: Loads, model: _ContactModelABC, current_state: dict,
@@ -529,11 +924,7 @@ def solve_normal_interference(interference: float, gap: np.ndarray, model: _Cont
         else:
             span = tuple(gs * 2 for gs in gap.shape)
 
-        im1 = surf_1.material.influence_matrix(span=span, grid_spacing=[surf_1.grid_spacing] * 2, components=['zz'])[
-            'zz']
-        im2 = surf_2.material.influence_matrix(span=span, grid_spacing=[surf_1.grid_spacing] * 2, components=['zz'])[
-            'zz']
-        total_im = im1 + im2
+        total_im = combined_influence_matrix(surf_1.material, surf_2.material, span, [surf_1.grid_spacing] * 2)
 
         convolution_func = plan_convolve(gap, total_im, contact_nodes)
 
@@ -555,10 +946,14 @@ def solve_normal_interference(interference: float, gap: np.ndarray, model: _Cont
         total_disp = convolution_func(loads_in_domain, ignore_domain=True)
         if slippy.CUDA:
             total_disp = cp.asnumpy(total_disp)
+        else:
+            total_disp = total_disp.copy()
 
         total_disp = Displacements(z=total_disp)
+        im1 = surf_1.material.influence_matrix(span=span, grid_spacing=[surf_1.grid_spacing] * 2, components=['zz'])[
+            'zz']
         disp_1 = Displacements(z=fftconvolve(loads_full, im1, 'same'))
-        disp_2 = Displacements(z=fftconvolve(loads_full, im2, 'same'))
+        disp_2 = Displacements(z=total_disp.z - disp_1.z)
 
         contact_nodes = np.logical_and(loads_full > adhesive_pressure, loads_full != 0)
 
@@ -0,0 +1,317 @@
+"""
+Solving many independent normal contact problems which share an influence matrix at the same time
+"""
+import typing
+import warnings
+
+import numpy as np
+
+from . import telemetry
+from .influence_matrix_utils import plan_batch_convolve
+
+__all__ = ['solve_normal_contact_batch']
+
+_SMALL = 1e-14
+
+
+def _batch_sum(array):
+    return np.sum(array, axis=(1, 2))
+
+
+def _per_problem(values):
+    """Reshape one value per problem so it broadcasts against a stack of arrays"""
+    return values[:, None, None]
+
+
+def _batch_bccg(f: typing.Callable, b: np.ndarray, domain: np.ndarray, tol: float, max_it: int,
+                max_pressure: float = np.inf):
+    """The bound constrained conjugate gradient method applied to a stack of problems at once
+
+    Each problem is updated by exactly the same steps as bccg with k_inn=1 and no preconditioner, the scalars (step
+    lengths, residual norms etc.) are found for each problem separately. Problems are removed from the stack as they
+    converge so the remaining problems are not slowed down.
+
+    Parameters
+    ----------
+    f: Callable
+        A batched convolution, made by plan_batch_convolve
+    b: np.ndarray
+        The displacements, shape (batch size, n, m), must be zero outside the domain
+    domain: np.ndarray
+        Boolean array of the nodes in each problem, same shape as b
+    tol: float
+        The tolerance on the relative update of the loads
+    max_it: int
+        The maximum number of iterations
+    max_pressure: float, optional (inf)
+        The maximum allowable pressure at each node
+
+    Returns
+    -------
+    x: np.ndarray
+        The loads, zero outside the domain
+    failed: np.ndarray
+        True for each problem which failed to converge
+    iterations: np.ndarray
+        The number of iterations used by each problem
+    """
+    batch_size = b.shape[0]
+    x_out = np.zeros_like(b)
+    failed_out = np.zeros(batch_size, dtype=bool)
+    iterations_out = np.zeros(batch_size, dtype=int)
+
+    active = np.arange(batch_size)
+    outside = ~domain
+    x = np.zeros_like(b)
+    g = -b.copy()
+    bnd_0 = np.logical_and(x <= 0, g >= 0)
+    bnd_0[outside] = False
+    bnd_max = np.zeros_like(bnd_0)
+    n_free = _batch_sum(domain) - _batch_sum(bnd_0)
+    rho = np.zeros(batch_size)
+    r_prev = p = np.zeros_like(b)
+
+    it = 0
+    while active.size:
+        it += 1
+        fixed = bnd_0 | bnd_max | outside
+        r = np.where(fixed, 0.0, -g)
+        rho_prev = rho
+        rho = _batch_sum(r * r)
+        if it > 1:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                beta = np.nan_to_num((rho - _batch_sum(r * r_prev)) / rho_prev)
+            p = r + _per_problem(np.maximum(beta, 0)) * p
+        else:
+            p = r
+        p[fixed] = 0
+        r_prev = r
+        q = f(p)
+        q[outside] = 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            alpha = np.nan_to_num(_batch_sum(r * p) / _batch_sum(p * q))
+        x_prev = x
+        x = x + _per_problem(alpha) * p
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            upd = np.linalg.norm((x - x_prev).reshape(active.size, -1), axis=1) / \
+                np.linalg.norm(x.reshape(active.size, -1), axis=1)
+
+        # project onto the feasible domain
+        prj_0 = x < -_SMALL
+        x[prj_0] = 0
+        bnd_0 |= prj_0
+        prj_max = x >= max_pressure * (1 + _SMALL)
+        x[prj_max] = max_pressure
+        bnd_max |= prj_max
+        changed = np.any(prj_0 | prj_max, axis=(1, 2))
+
+        g = g + _per_problem(alpha) * q
+        if np.any(changed):
+            g[changed] = f(x[changed]) - b[changed]
+            g[outside] = 0
+
+        released = (bnd_0 & (g < -_SMALL)) | (bnd_max & (g > _SMALL))
+        bnd_0 &= ~released
+        bnd_max &= ~released
+        changed |= np.any(released, axis=(1, 2))
+        n_free = _batch_sum(domain) - _batch_sum(bnd_0) - _batch_sum(bnd_max)
+
+        failed = n_free == 0
+        if it > max_it:
+            failed[:] = True
+        done = failed | (~changed & (upd < tol))
+        if np.any(done):
+            x_out[active[done]] = x[done]
+            failed_out[active[done]] = failed[done]
+            iterations_out[active[done]] = it
+            keep = ~done
+            active = active[keep]
+            x, g, b, domain, outside = x[keep], g[keep], b[keep], domain[keep], outside[keep]
+            bnd_0, bnd_max, p, r_prev, rho = bnd_0[keep], bnd_max[keep], p[keep], r_prev[keep], rho[keep]
+
+    if np.any(failed_out):
+        warnings.warn(f"Bound constrained conjugate gradient iterations failed to converge for "
+                      f"{np.sum(failed_out)} problems")
+    return x_out, failed_out, iterations_out
+
+
+def _batch_polonsky_keer(f: typing.Callable, h: np.ndarray, target: np.ndarray, tol: float, max_it: int,
+                         max_pressure: float = np.inf):
+    """The method of Polonsky and Keer applied to a stack of problems at once, see polonsky_keer
+
+    Parameters
+    ----------
+    f: Callable
+        A batched convolution, made by plan_batch_convolve
+    h: np.ndarray
+        The just touching gaps, shape (batch size, n, m)
+    target: np.ndarray
+        The set sum of the pressures for each problem
+    tol: float
+        The tolerance on the relative change in the pressures
+    max_it: int
+        The maximum number of iterations
+    max_pressure: float, optional (inf)
+        The maximum allowable pressure at each node
+
+    Returns
+    -------
+    p: np.ndarray
+        The pressures
+    failed: np.ndarray
+        True for each problem which failed to converge
+    iterations: np.ndarray
+        The number of iterations used by each problem
+    """
+    batch_size = h.shape[0]
+    n = h[0].size
+    p_out = np.zeros_like(h)
+    failed_out = np.ones(batch_size, dtype=bool)
+    iterations_out = np.zeros(batch_size, dtype=int)
+
+    active = np.arange(batch_size)
+    p = np.ones_like(h) * _per_problem(target / n)
+    t = np.zeros_like(h)
+    g_norm_prev = np.ones(batch_size)
+    conjugate = np.zeros(batch_size)
+
+    it = 0
+    while active.size and it < max_it:
+        it += 1
+        in_contact = p > 0
+        free = in_contact & (p < max_pressure)
+        n_contact = _batch_sum(in_contact)
+        g = f(p) + h
+        g -= _per_problem(_batch_sum(np.where(in_contact, g, 0)) / n_contact)
+        g_norm = _batch_sum(np.where(free, g, 0) ** 2)
+        t = np.where(free, g + _per_problem(conjugate * g_norm / g_norm_prev) * t, 0.0)
+        g_norm_prev = g_norm
+        r = f(t)
+        r -= _per_problem(_batch_sum(np.where(in_contact, r, 0)) / n_contact)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            tau = np.nan_to_num(_batch_sum(np.where(free, g * t, 0)) / _batch_sum(np.where(free, r * t, 0)))
+        p_prev = p
+        p = np.maximum(np.where(free, p - _per_problem(tau) * t, p), 0)
+        overlap = (p == 0) & (g < 0)
+        p = np.where(overlap, -_per_problem(tau) * g, p)
+        conjugate = np.where(np.any(overlap, axis=(1, 2)), 0.0, 1.0)
+        p = np.minimum(p, max_pressure)
+        at_max = p >= max_pressure
+        remaining = target - _batch_sum(np.where(at_max, p, 0))
+        p = np.where(at_max, p, p * _per_problem(remaining / _batch_sum(np.where(at_max, 0, p))))
+
+        done = _batch_sum(np.abs(p - p_prev)) / target < tol
+        if np.any(done):
+            p_out[active[done]] = p[done]
+            failed_out[active[done]] = False
+            iterations_out[active[done]] = it
+            keep = ~done
+            active = active[keep]
+            p, t, h, target = p[keep], t[keep], h[keep], target[keep]
+            g_norm_prev, conjugate = g_norm_prev[keep], conjugate[keep]
+
+    if active.size:
+        p_out[active] = p
+        iterations_out[active] = it
+        warnings.warn(f"Polonsky and Keer iterations failed to converge for {active.size} problems")
+    return p_out, failed_out, iterations_out
+
+
+def solve_normal_contact_batch(just_touching_gaps, im, grid_spacing: float, loads=None, interferences=None,
+                               tol: float = 1e-6, max_it: int = None, max_pressure: float = np.inf,
+                               periodic_axes: typing.Sequence[bool] = (False, False)) -> dict:
+    """Solve many independent normal contact problems which share an influence matrix at the same time
+
+    Parameters
+    ----------
+    just_touching_gaps: array
+        The just touching gap for each problem, shape (number of problems, n, m), eg found by get_gap_from_model for
+        each surface realisation
+    im: array
+        The influence matrix shared by all the problems, for two elastic surfaces this is the sum of their 'zz'
+        influence matrices
+    grid_spacing: float
+        The grid spacing of the gaps
+    loads: float or Sequence[float], optional (None)
+        The set total load, either a single value used for every problem or one value for each problem
+    interferences: float or Sequence[float], optional (None)
+        The set interference, either a single value used for every problem or one value for each problem, exactly one
+        of loads and interferences must be set
+    tol: float, optional (1e-6)
+        The tolerance used to declare convergence of the iterations
+    max_it: int, optional (None)
+        The maximum number of iterations, defaults to the number of nodes in each problem
+    max_pressure: float, optional (inf)
+        The maximum allowable pressure at each node
+    periodic_axes: tuple, optional ((False, False))
+        For each True value the corresponding axis will be solved by circular convolution
+
+    Returns
+    -------
+    results: dict
+        With keys:
+
+        - 'loads': array of the pressures for each problem, same shape as just_touching_gaps
+        - 'total_displacement': array of the total surface displacement for each problem
+        - 'contact_nodes': boolean array of the nodes in contact for each problem
+        - 'total_normal_load': array of the total load on each problem
+        - 'interference': array of the interference for each problem
+        - 'converged': boolean array, False for each problem which failed to converge
+        - 'iterations': array of the number of iterations used by each problem
+
+    Notes
+    -----
+    All of the problems are advanced together, each iteration convolves the whole stack with one call to scipy.fft and
+    the influence matrix spectrum is found once and shared, so the cost per problem falls as the number of problems
+    grows, particularly for small grids where a single solution is dominated by python overhead. Problems which have
+    converged are removed from the stack.
+
+    Load controlled problems are solved by the method of Polonsky and Keer (see polonsky_keer), interference
+    controlled problems by the bound constrained conjugate gradient method (see bccg). This always runs on the CPU.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> import slippy.contact as c
+    >>> steel = c.Elastic('steel', {'E': 200e9, 'v': 0.3})
+    >>> im = 2 * steel.influence_matrix((128, 128), (1e-6, 1e-6), ['zz'])['zz']
+    >>> gaps = np.random.rand(32, 128, 128) * 1e-7
+    >>> results = c.solve_normal_contact_batch(gaps, im, 1e-6, loads=1e-3)
+    """
+    gaps = np.asarray(just_touching_gaps, dtype=float)
+    if gaps.ndim != 3:
+        raise ValueError("just_touching_gaps must be a stack of 2D arrays")
+    if (loads is None) == (interferences is None):
+        raise ValueError("Exactly one of loads and interferences must be set")
+    batch_size = gaps.shape[0]
+    if max_it is None:
+        max_it = gaps[0].size
+    f = plan_batch_convolve(gaps[0], im, periodic_axes)
+    node_area = grid_spacing ** 2
+
+    if loads is not None:
+        target = np.broadcast_to(np.asarray(loads, dtype=float), (batch_size,)) / node_area
+        pressures, failed, iterations = _batch_polonsky_keer(f, gaps, target.copy(), tol, max_it, max_pressure)
+    else:
+        interference = np.broadcast_to(np.asarray(interferences, dtype=float), (batch_size,))
+        b = _per_problem(interference) - gaps
+        domain = b > 0
+        b[~domain] = 0
+        pressures, failed, iterations = _batch_bccg(f, b, domain, tol, max_it, max_pressure)
+
+    total_displacement = f(pressures)
+    contact_nodes = pressures > 0
+    if loads is not None:
+        # the interference is the mean deformed gap over the nodes in contact which are not at the maximum pressure
+        free = contact_nodes & (pressures < max_pressure)
+        free = np.where(_per_problem(np.any(free, axis=(1, 2))), free, contact_nodes)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            interference = _batch_sum(np.where(free, total_displacement + gaps, 0)) / _batch_sum(free)
+
+    if telemetry.LEVEL:
+        telemetry.record('batch_contact', 2, batch_size=len(gaps), iterations=int(np.max(iterations)),
+                         failed=int(np.sum(failed)))
+    return {'loads': pressures, 'total_displacement': total_displacement, 'contact_nodes': contact_nodes,
+            'total_normal_load': _batch_sum(pressures) * node_area, 'interference': np.array(interference),
+            'converged': ~failed, 'iterations': iterations}
@@ -10,12 +10,14 @@ import numpy as np
 import slippy
 
 from slippy.abcs import _NonDimensionalReynoldSolverABC
+from . import telemetry
 from ._material_utils import Loads, Displacements
 from ._model_utils import get_gap_from_model
 from ._step_utils import make_interpolation_func, solve_normal_loading
 from .influence_matrix_utils import plan_convolve
+from .multigrid_reynolds_solver import _coarse_shape, _full_weighting, _interpolate
 from .steps import _ModelStep
-from .materials import _IMMaterial
+from .materials import _IMMaterial, combined_influence_matrix
 
 __all__ = ['IterSemiSystem']
 
@@ -103,6 +105,9 @@ class IterSemiSystem(_ModelStep):
         used.
     no_update_warning: bool, optional (True)
         Change to False to suppress warning given when no movement or loading changes are specified
+    incremental_deformation: bool, optional (False)
+        If True, while the pressure is far from converged the displacement is updated each iteration by the
+        deformation due to the change in pressure, found on a grid with every other node, see notes
 
     Notes
     -----
@@ -110,6 +115,16 @@ class IterSemiSystem(_ModelStep):
     loading is checked, if the total pressure is too low the surfaces are brought closer together. This is continued
     until the total load has converged to the set value. This outer loop is referred to as the interference loop.
 
+    For elastic surfaces the displacement is found each iteration by a planned FFT convolution of the pressure with the
+    combined influence matrix of the surfaces, planned once for the step along with the convolution used to split the
+    converged displacement between the surfaces. If incremental_deformation is True the change in pressure is
+    restricted to a grid with every other node (by full weighting), convolved with the influence matrix for that grid
+    and interpolated back, about a third of the work. The full convolution is still used on every
+    full_deformation_every'th iteration and once the change in pressure is within tolerance, the step only converges
+    when the pressure solved from that gap is also within tolerance, so the converged solution meets the same test as
+    it would without the incremental update. The grid must have 2^n+1 nodes in each direction, or an even number if
+    periodic, otherwise the full convolution is always used.
+
     Examples
     --------
     In this example we will model smooth surface EHL with a non newtonian fluid:
@@ -190,6 +205,8 @@ class IterSemiSystem(_ModelStep):
     _load_errors = list()
 
     _reynolds: typing.Optional[_NonDimensionalReynoldSolverABC] = None
+    full_deformation_every: int = 10
+    "With incremental deformation, the number of iterations between full convolutions of the pressure"
     initial_guess: typing.Optional[typing.Union[typing.Callable, list, str]]
 
     def __init__(self, step_name: str, reynolds_solver: _NonDimensionalReynoldSolverABC,
@@ -209,7 +226,8 @@ class IterSemiSystem(_ModelStep):
                  rtol_interference: float = 1e-4,
                  relaxation_factor: float = 0.1,
                  initial_guess: typing.Union[typing.Callable, str, typing.Sequence] = 'previous',
-                 no_update_warning: bool = True):
+                 no_update_warning: bool = True,
+                 incremental_deformation: bool = False):
 
         self._adjust_height_every_step = True
         self._initial_guess = initial_guess
@@ -225,6 +243,7 @@ class IterSemiSystem(_ModelStep):
         self._rtol_pressure = rtol_pressure
         self._rtol_interference = rtol_interference
         self._nd_max_pressure = None
+        self._incremental_deformation = incremental_deformation
 
         self.reynolds = reynolds_solver
 
@@ -381,6 +400,7 @@ class IterSemiSystem(_ModelStep):
                 np.array([0, 0])
 
         previous_gap_shape = None  # shape of just touching gap array
+        incremental_func = None
 
         for i in range(self.number_of_steps):
             self.update_movement(relative_time[i], original)
@@ -403,13 +423,17 @@ class IterSemiSystem(_ModelStep):
                 self._nd_max_pressure = max_pressure
                 im1 = surf_1_material.influence_matrix(span=span, grid_spacing=[gs] * 2,
                                                        components=['zz'])['zz']
-                im2 = surf_2_material.influence_matrix(span=span, grid_spacing=[gs] * 2,
-                                                       components=['zz'])['zz']
-                total_im = im1 + im2
+                total_im = combined_influence_matrix(surf_1_material, surf_2_material, span, [gs] * 2)
                 loads_func = plan_convolve(just_touching_gap, total_im, circular=self._periodic_axes)
+                surface_1_loads_func = plan_convolve(just_touching_gap, im1, circular=self._periodic_axes)
+                if self._incremental_deformation:
+                    incremental_func = _plan_coarse_deformation(surf_1_material, surf_2_material, just_touching_gap,
+                                                                gs, self._periodic_axes)
                 previous_gap_shape = just_touching_gap.shape
 
             elif not im_mats:
+                incremental_func = None
+
                 def loads_func(loads):
                     return solve_normal_loading(loads=Loads(z=loads, x=None, y=None), model=self.model,
                                                 deflections='z', current_state=time_step_current_state)[0].z
@@ -454,13 +478,14 @@ class IterSemiSystem(_ModelStep):
 
             if not (results_last_it['nd_pressure'] == 0).all():
                 # noinspection PyUnboundLocalVariable
-                results_last_it['total_displacement_z'] = loads_func(previous_state['pressure'])
+                results_last_it['total_displacement_z'] = loads_func(previous_state['pressure']).copy()
 
             else:
                 results_last_it['total_displacement_z'] = np.zeros_like(just_touching_gap)
             results_last_it = self.model.lubricant_model.solve_sub_models(results_last_it)
             # main loops
             it_num = 0
+            full_deformation = True
             # Find the gap and non denationalise it
             gap = just_touching_gap + results_last_it['total_displacement_z'] - results_last_it['interference']
             results_last_it['nd_interference'] = self.reynolds.dimensionalise_gap(results_last_it['interference'], True)
@@ -486,7 +511,9 @@ class IterSemiSystem(_ModelStep):
                     pressure_relative_error = np.sum(np.abs(change_in_pressures)) / total_nd_pressure
                 else:
                     pressure_relative_error = 1
-                pressure_converged = pressure_relative_error < self._rtol_pressure
+                pressure_close = pressure_relative_error < self._rtol_pressure
+                # the pressure only converges if it was solved from a gap found with the full convolution
+                pressure_converged = pressure_close and full_deformation
 
                 # apply the relaxation factor to the pressure result
                 if self._nd_max_pressure is not None:
@@ -499,7 +526,14 @@ class IterSemiSystem(_ModelStep):
 
                 # solve contact geometry
                 results_this_it['pressure'] = self.reynolds.dimensionalise_pressure(results_this_it['nd_pressure'])
-                results_this_it['total_displacement_z'] = loads_func(results_this_it['pressure'])
+                if incremental_func is not None and it_num % self.full_deformation_every and not pressure_close:
+                    change_in_pressure = results_this_it['pressure'] - results_last_it['pressure']
+                    results_this_it['total_displacement_z'] = (results_last_it['total_displacement_z'] +
+                                                               incremental_func(change_in_pressure))
+                    full_deformation = False
+                else:
+                    results_this_it['total_displacement_z'] = loads_func(results_this_it['pressure']).copy()
+                    full_deformation = True
 
                 # find gap
                 gap = just_touching_gap + results_this_it['total_displacement_z'] - results_last_it['interference']
@@ -520,6 +554,11 @@ class IterSemiSystem(_ModelStep):
 
                 results_this_it['nd_gap'] = self.reynolds.dimensionalise_gap(results_this_it['gap'], True)
                 results_this_it['interference'] = results_last_it['interference']
+                if telemetry.LEVEL >= 2:
+                    telemetry.record('lubrication_iteration', 2, iteration=it_num, total_load=float(total_load),
+                                     load_error=float(load_relative_error),
+                                     pressure_error=float(pressure_relative_error),
+                                     interference=float(results_this_it['interference']))
 
                 # escape the loop if it converged
                 if pressure_converged and load_converged:
@@ -581,10 +620,12 @@ class IterSemiSystem(_ModelStep):
             current_state = {**time_step_current_state, **results_this_it}
             pressure = current_state['pressure']
             if im_mats:
-                current_state['surface_1_displacement'] = \
-                    Displacements(z=plan_convolve(pressure, im1, circular=self._periodic_axes)(pressure))
-                current_state['surface_2_displacement'] = \
-                    Displacements(z=plan_convolve(pressure, im2, circular=self._periodic_axes)(pressure))
+                if not full_deformation:
+                    current_state['total_displacement_z'] = loads_func(pressure).copy()
+                surface_1_z = surface_1_loads_func(pressure).copy()
+                current_state['surface_1_displacement'] = Displacements(z=surface_1_z)
+                current_state['surface_2_displacement'] = Displacements(z=current_state['total_displacement_z'] -
+                                                                        surface_1_z)
                 current_state['total_displacement'] = Displacements(z=current_state['total_displacement_z'])
 
             else:
@@ -675,6 +716,29 @@ class IterSemiSystem(_ModelStep):
         return new_interference
 
 
+def _plan_coarse_deformation(material_1: _IMMaterial, material_2: _IMMaterial, gap: np.ndarray, grid_spacing: float,
+                             periodic_axes: typing.Sequence[bool]) -> typing.Optional[typing.Callable]:
+    """Plan the approximate change in total displacement for a change in pressure, found on a grid with every other node
+
+    Returns None if the grid cannot be coarsened, see MultigridReynoldsSolver
+    """
+    if bool(periodic_axes[0]) != bool(periodic_axes[1]):
+        return None
+    periodic = bool(periodic_axes[0])
+    coarse_shape = _coarse_shape(gap.shape, periodic)
+    if coarse_shape is None:
+        return None
+    coarse_gs = [2 * grid_spacing] * 2
+    coarse_im = combined_influence_matrix(material_1, material_2, coarse_shape, coarse_gs)
+    convolve = plan_convolve(np.zeros(coarse_shape), coarse_im, circular=periodic_axes)
+
+    def inner(change_in_pressure):
+        coarse_displacement = convolve(_full_weighting(change_in_pressure, periodic))
+        return _interpolate(coarse_displacement, change_in_pressure.shape, periodic)
+
+    return inner
+
+
 def _data_check_error_or_warn(msg: str):
     if slippy.ERROR_IN_DATA_CHECK:
         raise ValueError(msg)
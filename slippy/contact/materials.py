@@ -1,5 +1,8 @@
 import abc
+from collections import OrderedDict
 from collections.abc import Sequence
+import functools
+import os
 import typing
 from itertools import product
 import numpy as np
@@ -8,8 +11,9 @@ from slippy.abcs import _MaterialABC
 from .influence_matrix_utils import _solve_im_loading, _solve_im_displacement, elastic_influence_matrix, \
     guess_loads_from_displacement
 from ._material_utils import _get_properties, Loads, Displacements, memoize_components
+from ._im_cache import _source_file, im_cache_file, load_or_compute
 
-__all__ = ["Elastic", "_IMMaterial", "Rigid", 'rigid', 'elastic_influence_matrix']
+__all__ = ["Elastic", "_IMMaterial", "Rigid", 'rigid', 'elastic_influence_matrix', 'combined_influence_matrix']
 
 
 # The base class for materials contains all the iteration functionality for contacts
@@ -254,7 +258,8 @@ class _IMMaterial(_MaterialABC):
         if simple or len(def_directions) == 1:
             comp_names = [dd * 2 for dd in def_directions]  # ['xx','yy' etc.] if the are set directions
         else:
-            comp_names = list(product(displacements, valid_directions))
+            # the loads are only found in the directions the displacements are set, so the system is square
+            comp_names = list(product(def_directions, def_directions))
             comp_names = [a + b for a, b in comp_names]
 
         # get components of the influence matrix
@@ -412,7 +417,8 @@ class Rigid(_IMMaterial):
 
     def influence_matrix(self, span: typing.Sequence[int], grid_spacing: typing.Sequence[float],
                          components: typing.Sequence[str]):
-        return {comp: np.zeros(span) for comp in components}
+        zeros = _rigid_influence_matrix(tuple(int(s) for s in span))
+        return {comp: zeros for comp in components}
 
     def displacement_from_surface_loads(self, loads, *args, **kwargs):
         return Displacements(*[np.zeros_like(l) for l in loads])  # noqa: E741
@@ -424,6 +430,15 @@ class Rigid(_IMMaterial):
 rigid = Rigid('rigid')
 
 
+@functools.lru_cache(maxsize=8)
+def _rigid_influence_matrix(span: tuple) -> np.ndarray:
+    """A read only array of zeros, the same array is returned for each span so combined influence matrices with a rigid
+    surface are reused"""
+    zeros = np.zeros(span)
+    zeros.flags.writeable = False
+    return zeros
+
+
 # noinspection PyPep8Naming
 class Elastic(_IMMaterial):
     """ A Class for defining elastic materials
@@ -729,3 +744,58 @@ class Elastic(_IMMaterial):
 
     def __repr__(self):
         return "Elastic(name = '" + self.name + f"', properties = {{ 'E':{self.E}, 'v':{self.v} }}"
+
+
+# combined influence matrices keyed by the identity of the components, the components are kept in the value so that
+# their ids cannot be reused while the sum is cached, least recently used first
+_combined_ims = OrderedDict()
+COMBINED_IM_CACHE_SIZE = 16
+
+
+def combined_influence_matrix(material_1: _IMMaterial, material_2: _IMMaterial, span: typing.Sequence[int],
+                              grid_spacing: typing.Sequence[float], component: str = 'zz') -> np.ndarray:
+    """The sum of an influence matrix component for two materials, used to solve contacts between them
+
+    Parameters
+    ----------
+    material_1, material_2: _IMMaterial
+        The materials of the surfaces
+    span: Sequence[int]
+        The span of the influence matrix
+    grid_spacing: Sequence[float]
+        The grid spacing in each direction
+    component: str, optional ('zz')
+        The influence matrix component
+
+    Returns
+    -------
+    im: np.ndarray
+        The combined influence matrix component, this should not be modified in place
+
+    Notes
+    -----
+    Repeated calls for the same material pair return the same array, so convolutions planned with it by plan_convolve
+    are found in the plan cache rather than planned again. If slippy.IM_DISK_CACHE is set and both components were
+    loaded from the disk cache the sum is also stored in the disk cache, keyed on both components, so the spectra
+    found when it is used to plan a convolution are cached on disk and shared between processes.
+
+    Up to COMBINED_IM_CACHE_SIZE sums are kept.
+    """
+    im_1 = material_1.influence_matrix(span=span, grid_spacing=grid_spacing, components=[component])[component]
+    im_2 = material_2.influence_matrix(span=span, grid_spacing=grid_spacing, components=[component])[component]
+    key = (id(im_1), id(im_2))
+    try:
+        cached_1, cached_2, total = _combined_ims.pop(key)
+        if cached_1 is not im_1 or cached_2 is not im_2:
+            raise KeyError
+    except KeyError:
+        sources = _source_file(im_1), _source_file(im_2)
+        if None in sources:
+            file_name = None
+        else:
+            file_name = im_cache_file('combined', component, *(os.path.basename(s) for s in sources))
+        total = load_or_compute(file_name, lambda: im_1 + im_2)
+    _combined_ims[key] = (im_1, im_2, total)
+    while len(_combined_ims) > COMBINED_IM_CACHE_SIZE:
+        _combined_ims.popitem(last=False)
+    return total
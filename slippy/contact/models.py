@@ -2,12 +2,14 @@
 model object, just a container for step object that do the real work
 """
 import os
+import pickle
 import typing
 import slippy
 import warnings
 from collections import OrderedDict
 from contextlib import redirect_stdout, ExitStack
 from datetime import datetime
+from . import telemetry
 from .outputs import OutputSaver, OutputRequest
 
 from slippy.abcs import _SurfaceABC, _LubricantModelABC, _ContactModelABC
@@ -16,6 +18,23 @@ from slippy.contact.steps import _ModelStep, InitialStep
 __all__ = ['ContactModel']
 
 
+def _surface_state(surface: _SurfaceABC) -> typing.Optional[dict]:
+    """The parts of a surface which can be changed by sub models, None for surfaces without a profile"""
+    if surface is None or not surface.is_discrete:
+        return None
+    return {'profile': surface._profile, 'unworn_profile': surface.unworn_profile,
+            'wear_volumes': surface.wear_volumes}
+
+
+def _restore_surface(surface: _SurfaceABC, state: typing.Optional[dict]):
+    if state is None:
+        return
+    surface._profile = state['profile']
+    surface.unworn_profile = state['unworn_profile']
+    surface.wear_volumes = state['wear_volumes']
+    surface._inter_func = None
+
+
 class ContactModel(_ContactModelABC):
     """ A container for multi step contact mechanics and lubrication problems
 
@@ -52,7 +71,7 @@ class ContactModel(_ContactModelABC):
         Performs analysis checks for each of the steps and the model as a whole, prints the results to the log file
     solve
         Solves all of the model steps in sequence, writing history and field outputs to the output file. Writes progress
-        to the log file
+        to the log file, optionally writes checkpoints which the solution can be resumed from
 
     """
 
@@ -62,6 +81,10 @@ class ContactModel(_ContactModelABC):
     adhesion = None
     _current_state_debug: dict = None
     _all_step_outputs = []
+    _checkpoint_every: typing.Optional[int] = None
+    _increments_solved: int = 0
+    _output_writer: OutputSaver = None
+    _step_start_state: dict = None
 
     def __init__(self, name: str, surface_1: _SurfaceABC, surface_2: _SurfaceABC = None,
                  lubricant: _LubricantModelABC = None, output_dir: str = None):
@@ -84,6 +107,10 @@ class ContactModel(_ContactModelABC):
     def log_file_name(self):
         return os.path.join(slippy.OUTPUT_DIR, self.name + '.log')
 
+    @property
+    def checkpoint_file_name(self):
+        return os.path.join(slippy.OUTPUT_DIR, self.name + '.chk')
+
     def add_step(self, step_instance: _ModelStep = None, position: typing.Union[int, str] = None):
         """ Adds a solution step to the current model
 
@@ -183,7 +210,8 @@ class ContactModel(_ContactModelABC):
         if self.surface_2.material is None:
             warn_or_error("Material for second surface is not set, for a rigid surface use the Rigid material")
 
-    def solve(self, verbose: bool = False, skip_data_check: bool = False):
+    def solve(self, verbose: bool = False, skip_data_check: bool = False, checkpoint_every: int = None,
+              resume: bool = False):
         """
         Solve all steps and sub-models in the model as well as writing all outputs
 
@@ -193,6 +221,12 @@ class ContactModel(_ContactModelABC):
             If True, logs are written to the console instead of the log file
         skip_data_check: bool, optional (False)
             If True the data check will be skipped, this is not recommended but may be necessary for some steps
+        checkpoint_every: int, optional (None)
+            If set a checkpoint is written to the checkpoint file (model_name.chk in the output directory) after this
+            many solved increments and at the end of every step
+        resume: bool, optional (False)
+            If True and the checkpoint file exists, the solution carries on from the last checkpoint, otherwise the
+            model is solved from the start
 
         Returns
         -------
@@ -203,16 +237,35 @@ class ContactModel(_ContactModelABC):
         -----
         Most steps produce detailed logging information that can be found in the log file.
 
+        A checkpoint holds the model state, the profiles of the surfaces (including any wear), the internal state of
+        the sub models and output requests and the progress through the steps. When resuming, the output files are
+        rolled back to the checkpoint, the log file is added to. The model must be made in the same way as the model
+        which wrote the checkpoint. The quasi static step can be resumed part way through, other steps are resumed from
+        the start of the step which was running.
+
+        Examples
+        --------
+        A script which can be rerun after being killed, without losing progress:
+
+        >>> my_model.solve(checkpoint_every=100, resume=True)
         """
-        if os.path.exists(self.log_file_name):
+        checkpoint = None
+        if resume and os.path.exists(self.checkpoint_file_name):
+            with open(self.checkpoint_file_name, 'rb') as file:
+                checkpoint = pickle.load(file)
+        elif os.path.exists(self.log_file_name):
             os.remove(self.log_file_name)
 
+        self._checkpoint_every = checkpoint_every
+        self._increments_solved = 0
         current_state = None
 
         with ExitStack() as stack:
-            output_writer = stack.enter_context(OutputSaver(self.name))
+            output_writer = stack.enter_context(OutputSaver(self.name, None if checkpoint is None
+                                                            else checkpoint['outputs']))
+            self._output_writer = output_writer
             if not verbose:
-                log_file = stack.enter_context(open(self.log_file_name, 'x'))
+                log_file = stack.enter_context(open(self.log_file_name, 'x' if checkpoint is None else 'a'))
                 stack.enter_context(redirect_stdout(log_file))
 
             if not skip_data_check:
@@ -220,17 +273,87 @@ class ContactModel(_ContactModelABC):
 
             print(f"Solving model {self.name}, CUDA = {slippy.CUDA}")
 
+            if checkpoint is not None:
+                print(f"Resuming from checkpoint in step {checkpoint['step']} at time {checkpoint['state']['time']}")
+                self._restore_checkpoint(checkpoint)
+
             for this_step in self.steps:
+                step = self.steps[this_step]
+                if checkpoint is not None:
+                    # skip the steps solved before the checkpoint
+                    if this_step != checkpoint['step']:
+                        continue
+                    if checkpoint['step_state'] is None:
+                        current_state = checkpoint['state']
+                        checkpoint = None
+                        continue
+                    current_state = checkpoint['step_start_state']
+                    step._resume_state = checkpoint['step_state']
+                    checkpoint = None
+                else:
+                    for output in step.outputs:
+                        output.new_step(current_state['time'])
                 print(f"Solving step {this_step}")
-                for output in self.steps[this_step].outputs:
-                    output.new_step(current_state['time'])
-                current_state = self.steps[this_step].solve(current_state, output_writer)
+                self._step_start_state = current_state
+                with telemetry.context(step=this_step), telemetry.timed('step'):
+                    current_state = step.solve(current_state, output_writer)
+                if self._checkpoint_every:
+                    self._write_checkpoint(step, current_state, None)
 
             now = datetime.now().strftime('%H:%M:%S %d-%m-%Y')
             print(f"Analysis completed successfully at: {now}")
+            self._output_writer = None
 
         return current_state
 
+    def increment_solved(self, step: _ModelStep, current_state: dict):
+        """Called by the steps after each solved increment, writes a checkpoint if one is due
+
+        Parameters
+        ----------
+        step: _ModelStep
+            The step being solved
+        current_state: dict
+            The state of the model after the increment
+        """
+        if not self._checkpoint_every or self._output_writer is None:
+            return
+        self._increments_solved += 1
+        if self._increments_solved % self._checkpoint_every:
+            return
+        step_state = step._checkpoint_state(current_state)
+        if step_state is not None:
+            self._write_checkpoint(step, current_state, step_state)
+
+    def _write_checkpoint(self, step: _ModelStep, current_state: dict, step_state: typing.Optional[dict]):
+        """Write the checkpoint file, step_state is None if the step has been completed"""
+        checkpoint = {'step': step.name, 'step_state': step_state, 'state': current_state,
+                      'step_start_state': self._step_start_state,
+                      'surfaces': [_surface_state(self.surface_1), _surface_state(self.surface_2)],
+                      'sub_models': {name: [sub_model.get_state() for sub_model in this_step.sub_models]
+                                     for name, this_step in self.steps.items()},
+                      'output_requests': {name: [vars(output) for output in this_step.outputs]
+                                          for name, this_step in self.steps.items()},
+                      'outputs': self._output_writer.checkpoint()}
+        # written to a temporary file first so a checkpoint is never left half written
+        temp_file_name = self.checkpoint_file_name + '.tmp'
+        with open(temp_file_name, 'wb') as file:
+            pickle.dump(checkpoint, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_file_name, self.checkpoint_file_name)
+        print(f"Checkpoint written at time {current_state['time']}")
+
+    def _restore_checkpoint(self, checkpoint: dict):
+        """Put the surfaces, sub models and output requests back into their state at the checkpoint"""
+        if set(checkpoint['sub_models']) != set(self.steps) or checkpoint['step'] not in self.steps:
+            raise ValueError("The checkpoint was written by a model with different steps")
+        _restore_surface(self.surface_1, checkpoint['surfaces'][0])
+        _restore_surface(self.surface_2, checkpoint['surfaces'][1])
+        for name, this_step in self.steps.items():
+            for sub_model, state in zip(this_step.sub_models, checkpoint['sub_models'][name]):
+                sub_model.set_state(state)
+            for output, state in zip(this_step.outputs, checkpoint['output_requests'][name]):
+                vars(output).update(state)
+
     def __repr__(self):
         return (f'ContactModel(surface1 = {repr(self.surface_1)}, '
                 f'surface2 = {repr(self.surface_2)}, '
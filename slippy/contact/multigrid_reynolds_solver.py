@@ -0,0 +1,218 @@
+"""
+A full approximation scheme multigrid solver for the unified reynolds equation, a drop in replacement for
+UnifiedReynoldsSolver
+"""
+import contextlib
+import typing
+
+import numpy as np
+
+from . import telemetry
+from .unified_reynolds_solver import (UnifiedReynoldsSolver, _sweep, _zebra_sweep, _residual, _row_range,
+                                      _work_vectors, _zebra_work, _sweep_threads)
+
+__all__ = ['MultigridReynoldsSolver']
+
+
+def _coarse_shape(shape: tuple, periodic: bool) -> typing.Optional[tuple]:
+    """The shape of the next coarser grid (every other node), None if the grid cannot be coarsened
+
+    Non periodic grids must have an odd number of nodes so that the edges are kept, periodic grids an even number
+    """
+    if periodic:
+        return None if any(n % 2 for n in shape) else tuple(n // 2 for n in shape)
+    return None if not all(n % 2 for n in shape) else tuple((n + 1) // 2 for n in shape)
+
+
+def _full_weighting(fine: np.ndarray, periodic: bool) -> np.ndarray:
+    """Restrict a residual to the coarse grid by full weighting, edges of non periodic grids are taken as 0"""
+    padded = np.pad(fine, 1, mode='wrap' if periodic else 'constant')
+    # only the neighbours of the coarse nodes are summed
+    centre = padded[1:-1:2, 1:-1:2]
+    edges = padded[:-2:2, 1:-1:2] + padded[2::2, 1:-1:2] + padded[1:-1:2, :-2:2] + padded[1:-1:2, 2::2]
+    corners = padded[:-2:2, :-2:2] + padded[:-2:2, 2::2] + padded[2::2, :-2:2] + padded[2::2, 2::2]
+    return (4 * centre + 2 * edges + corners) / 16
+
+
+def _interpolate(coarse: np.ndarray, fine_shape: tuple, periodic: bool) -> np.ndarray:
+    """Bilinear interpolation of a correction onto the fine grid"""
+    fine = np.zeros(fine_shape)
+    fine[::2, ::2] = coarse
+    if periodic:
+        fine[1::2, ::2] = 0.5 * (coarse + np.roll(coarse, -1, axis=0))
+        fine[:, 1::2] = 0.5 * (fine[:, ::2] + np.roll(fine[:, ::2], -1, axis=1))
+    else:
+        fine[1::2, ::2] = 0.5 * (coarse[:-1] + coarse[1:])
+        fine[:, 1::2] = 0.5 * (fine[:, :-1:2] + fine[:, 2::2])
+    return fine
+
+
+class _Level:
+    """The frozen line equations and the current pressure on one grid"""
+
+    def __init__(self, epsilon, recip_dx_squared_rho, source, pressure, ak: tuple, recip_dx: float,
+                 recip_dt: float, step: int, periodic: bool, zebra: bool = False):
+        self.epsilon = epsilon
+        self.recip_dx_squared_rho = recip_dx_squared_rho
+        self.source = source
+        self.pressure = pressure
+        self.ak = ak
+        self.recip_dx = recip_dx
+        self.recip_dt = recip_dt
+        self.step = step
+        self.periodic = periodic
+        self.zebra = zebra
+        self.rows = _row_range(pressure.shape[1], step, periodic)
+        self.work = _work_vectors(pressure.shape[0])
+        self.zebra_work = _zebra_work(pressure.shape) if zebra else None
+
+    def coarsen(self) -> '_Level':
+        """A level with every other node, the coefficients are injected, the source and pressure are set by the cycle"""
+        # the deflection of a node due to its pressure scales with the size of the node
+        return _Level(self.epsilon[::2, ::2].copy(), self.recip_dx_squared_rho[::2, ::2] / 4, None,
+                      np.zeros_like(self.pressure[::2, ::2]), tuple(2 * a for a in self.ak), self.recip_dx / 2,
+                      self.recip_dt, self.step, self.periodic, self.zebra)
+
+    def smooth(self, sweeps: int, max_pressure: float):
+        for _ in range(sweeps):
+            if self.zebra:
+                _zebra_sweep(self.epsilon, self.pressure, self.recip_dx_squared_rho, self.source, *self.ak,
+                             self.recip_dx, self.recip_dt, max_pressure, self.periodic, *self.zebra_work)
+            else:
+                _sweep(self.epsilon, self.pressure, self.recip_dx_squared_rho, self.source, *self.ak, self.recip_dx,
+                       self.recip_dt, *self.rows, self.step, max_pressure, self.periodic, *self.work)
+
+    def residual(self, max_pressure: float, bounded: bool = True, source=None):
+        out = np.zeros_like(self.pressure)
+        _residual(self.epsilon, self.pressure, self.recip_dx_squared_rho,
+                  self.source if source is None else source, *self.ak, self.recip_dx, self.recip_dt, *self.rows,
+                  self.step, max_pressure, self.periodic, bounded, out, *self.work[:4])
+        return out
+
+
+class MultigridReynoldsSolver(UnifiedReynoldsSolver):
+    """A full approximation scheme (FAS) multigrid solver for the unified reynolds equation
+
+    Parameters
+    ----------
+    time_step, grid_spacing, hertzian_pressure, radius_in_rolling_direction, hertzian_half_width,
+    dimentional_viscosity, dimentional_density, sweep_direction, periodic, zebra
+        As for UnifiedReynoldsSolver, zebra ordering is used for the sweeps on every grid
+    levels: int, optional (None)
+        The maximum number of grids, including the finest, if None grids are added until the next would have fewer than
+        min_size nodes in either direction
+    min_size: int, optional (9)
+        The minimum number of nodes in each direction on the coarsest grid
+    cycles: int, optional (1)
+        The number of V cycles run each time the solver is called
+    pre_sweeps, post_sweeps: int, optional (2, 1)
+        The number of line relaxation sweeps before restricting to, and after correcting from, the next coarser grid
+    coarse_sweeps: int, optional (10)
+        The number of sweeps on the coarsest grid
+
+    See Also
+    --------
+    UnifiedReynoldsSolver
+    IterSemiSystem
+
+    Notes
+    -----
+    This solves the same line equations as UnifiedReynoldsSolver and can be used in its place in any lubrication step.
+    UnifiedReynoldsSolver makes one line relaxation sweep each time it is called. With the gap, viscosity and density
+    of the call held fixed this solver instead runs V cycles of the full approximation scheme, using the same sweeps as
+    its smoother, so each call gives a much better converged pressure for the current gap. As the local elastic
+    response is included in the line equations the step can usually take a larger relaxation factor, and so needs far
+    fewer iterations, especially on fine grids.
+
+    Coarser grids take every other node of the grid above, so non periodic grids should have 2^n+1 nodes in each
+    direction (eg 65, 129, 257, 513), periodic grids should have a power of 2. Coarsening stops when this is not
+    the case. The coefficients of the equations are injected onto the coarse grids, residuals are restricted by full
+    weighting and corrections are found by bilinear interpolation.
+
+    Examples
+    --------
+    As for UnifiedReynoldsSolver, with a larger relaxation factor in the step:
+
+    >>> import slippy.contact as c
+    >>> reynolds = c.MultigridReynoldsSolver(time_step=0, grid_spacing=ball.grid_spacing,
+    >>>                                      hertzian_pressure=hertz_pressure, radius_in_rolling_direction=radius,
+    >>>                                      hertzian_half_width=hertz_a, dimentional_viscosity=eta_0,
+    >>>                                      dimentional_density=872)
+    >>> step = c.IterSemiSystem('main', reynolds, rolling_speed, 1, no_time=True, normal_load=load,
+    >>>                         relaxation_factor=0.5)
+    """
+
+    def __init__(self, time_step: float,
+                 grid_spacing: float,
+                 hertzian_pressure: float,
+                 radius_in_rolling_direction: float,
+                 hertzian_half_width: float,
+                 dimentional_viscosity: float,
+                 dimentional_density: float,
+                 sweep_direction: str = 'backward',
+                 periodic: bool = False,
+                 zebra: bool = False,
+                 levels: typing.Optional[int] = None,
+                 min_size: int = 9,
+                 cycles: int = 1,
+                 pre_sweeps: int = 2,
+                 post_sweeps: int = 1,
+                 coarse_sweeps: int = 10):
+        super().__init__(time_step, grid_spacing, hertzian_pressure, radius_in_rolling_direction, hertzian_half_width,
+                         dimentional_viscosity, dimentional_density, sweep_direction, periodic, zebra)
+        self.levels = levels
+        self.min_size = min_size
+        self.cycles = cycles
+        self.pre_sweeps = pre_sweeps
+        self.post_sweeps = post_sweeps
+        self.coarse_sweeps = coarse_sweeps
+
+    def solve(self, previous_state: dict, max_pressure: float) -> dict:
+        current_state, pressure, epsilon, recip_dx_squared_rho, source = self._line_equations(previous_state)
+        max_pressure = float(max_pressure)
+
+        levels = [_Level(epsilon, recip_dx_squared_rho, source, pressure, (self.ak00, self.ak10, self.ak20),
+                         1 / self.nd_grid_spacing, self._recip_dt, self._step, self.periodic, self.zebra)]
+        max_levels = self.levels or np.inf
+        while len(levels) < max_levels:
+            coarse_shape = _coarse_shape(levels[-1].pressure.shape, self.periodic)
+            if coarse_shape is None or min(coarse_shape) < self.min_size:
+                break
+            levels.append(levels[-1].coarsen())
+
+        with _sweep_threads() if self.zebra else contextlib.nullcontext():
+            for cycle in range(self.cycles):
+                self._cycle(levels, 0, max_pressure)
+                if telemetry.LEVEL >= 3:
+                    telemetry.record('multigrid_cycle', 3, cycle=cycle, levels=len(levels),
+                                     residual=float(np.linalg.norm(levels[0].residual(max_pressure))))
+
+        current_state['nd_pressure'] = levels[0].pressure
+        return current_state
+
+    def _cycle(self, levels: list, index: int, max_pressure: float):
+        """One FAS V cycle from levels[index] down"""
+        level = levels[index]
+        if index == len(levels) - 1:
+            level.smooth(self.coarse_sweeps, max_pressure)
+            return
+        level.smooth(self.pre_sweeps, max_pressure)
+        coarse = levels[index + 1]
+        coarse.pressure = level.pressure[::2, ::2].copy()
+        injected = coarse.pressure.copy()
+        # coarse source = restricted fine residual + coarse operator applied to the injected pressure
+        coarse.source = (_full_weighting(level.residual(max_pressure), self.periodic) -
+                         coarse.residual(max_pressure, bounded=False, source=np.zeros_like(injected)))
+        self._cycle(levels, index + 1, max_pressure)
+        correction = _interpolate(coarse.pressure - injected, level.pressure.shape, self.periodic)
+        # corrections are not applied in the cavitated region, the smoother moves the free boundary
+        correction[level.pressure <= 0] = 0
+        np.clip(level.pressure + correction, 0, max_pressure, out=level.pressure)
+        level.smooth(self.post_sweeps, max_pressure)
+
+    def __repr__(self):
+        return (f'MultigridReynoldsSolver(time_step={self.time_step}, grid_spacing={self.grid_spacing}, '
+                f'hertzian_pressure={self.hertzian_pressure}, radius_in_rolling_direction={self.radius}, '
+                f'hertzian_half_width={self.hertzian_half_width}, dimentional_viscosity={self.dimentional_viscosity}, '
+                f'dimentional_density={self.dimentional_density}, periodic={self.periodic}, zebra={self.zebra}, '
+                f'levels={self.levels}, cycles={self.cycles})')
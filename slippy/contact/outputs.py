@@ -20,6 +20,9 @@ class OutputSaver:
     ----------
     model_name: str
         The name of the model, to be used for the file names of the outputs
+    resume_from: dict, optional (None)
+        The result of the checkpoint method from a previous run, the output files are rolled back to the checkpoint and
+        new outputs are added after the existing ones, otherwise any existing output files are replaced
 
     Notes
     -----
@@ -31,13 +34,18 @@ class OutputSaver:
     --------
     OutputReader - A class for reading output files back in
     """
-    def __init__(self, model_name: str):
+    def __init__(self, model_name: str, resume_from: dict = None):
         self.model_name = model_name
+        self.resume_from = resume_from
         self.in_context = False
         self.database_file = None
         self.array_file = None
         self.array_number = 0
 
+    @property
+    def array_file_name(self):
+        return os.path.join(slippy.OUTPUT_DIR, self.model_name + '.sar')
+
     def write(self, output: dict):
         """Write outputs to file,
 
@@ -68,12 +76,50 @@ class OutputSaver:
             clean_dict[key] = value
         self.data_file.insert(clean_dict)
 
+    def checkpoint(self) -> dict:
+        """Make sure all the outputs written so far are on disk
+
+        Returns
+        -------
+        dict
+            The information needed to roll the output files back to this point, see resume_from
+
+        Notes
+        -----
+        The zip repository is only valid once its central directory has been written, so it is closed and reopened,
+        outputs added after this point overwrite the central directory, a copy of it is kept so the repository can be
+        repaired if the process is killed.
+        """
+        if not self.in_context:
+            raise ValueError("Output saver is not in context cannot checkpoint")
+        self.array_file.close()
+        self.array_file = zipfile.ZipFile(self.array_file_name, 'a')
+        directory_start = self.array_file.start_dir
+        with open(self.array_file_name, 'rb') as file:
+            file.seek(directory_start)
+            directory = file.read()
+        return {'records': len(self.data_file), 'array_number': self.array_number,
+                'directory_start': directory_start, 'directory': directory}
+
     def __enter__(self):
         db_filename = os.path.join(slippy.OUTPUT_DIR, self.model_name + '.sdb')
-        if os.path.exists(db_filename):
-            os.remove(db_filename)
-        self.data_file = tinydb.TinyDB(db_filename, 'w')
-        self.array_file = zipfile.ZipFile(os.path.join(slippy.OUTPUT_DIR, self.model_name + '.sar'), 'w')
+        if self.resume_from is None:
+            if os.path.exists(db_filename):
+                os.remove(db_filename)
+            self.data_file = tinydb.TinyDB(db_filename, 'w')
+            self.array_file = zipfile.ZipFile(self.array_file_name, 'w')
+        else:
+            # remove anything written after the checkpoint
+            with open(self.array_file_name, 'r+b') as file:
+                file.truncate(self.resume_from['directory_start'])
+                file.seek(self.resume_from['directory_start'])
+                file.write(self.resume_from['directory'])
+            self.array_file = zipfile.ZipFile(self.array_file_name, 'a')
+            self.array_number = self.resume_from['array_number']
+            self.data_file = tinydb.TinyDB(db_filename, 'w')
+            extra = [doc.doc_id for doc in self.data_file.all() if doc.doc_id > self.resume_from['records']]
+            if extra:
+                self.data_file.remove(doc_ids=extra)
         self.in_context = True
         return self
 
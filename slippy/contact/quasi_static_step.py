@@ -5,13 +5,26 @@ import warnings
 
 from scipy.optimize import root_scalar
 
+from . import telemetry
 from .steps import _ModelStep
 from ._model_utils import get_gap_from_model
-from ._step_utils import HeightOptimisationFunction, make_interpolation_func
+from ._step_utils import HeightOptimisationFunction, make_interpolation_func, bracket_interference
 
 __all__ = ['QuasiStaticStep']
 
 
+def _shift(array: np.ndarray, shift: typing.Sequence[int], periodic: bool) -> np.ndarray:
+    """Move an array by a whole number of nodes, nodes moved in from outside the array are zero unless periodic"""
+    shifted = np.roll(array, shift, axis=(0, 1))
+    if not periodic:
+        for axis, n in enumerate(shift):
+            if n:
+                index = [slice(None), slice(None)]
+                index[axis] = slice(0, n) if n > 0 else slice(n, None)
+                shifted[tuple(index)] = 0
+    return shifted
+
+
 class QuasiStaticStep(_ModelStep):
     """
     A model step for quasi static relative movement
@@ -92,6 +105,14 @@ class QuasiStaticStep(_ModelStep):
         based materials
     rtol_displacement: float, optional (1e-4)
         The norm of the residual used to declare convergence of the bccg iterations
+    preconditioner: {None, 'fft'}, optional (None)
+        The preconditioner used for the bccg iterations, 'fft' uses the inverse of the influence matrix spectrum which
+        typically reduces the iterations needed for rough surface contacts, see slippy.contact.fft_preconditioner
+    load_control: {'root_scalar', 'polonsky_keer'}, optional ('root_scalar')
+        The method used for load controlled problems, 'root_scalar' finds the interference which gives the set load by
+        a bracketing root finder, each evaluation is a full solution of the contact problem. 'polonsky_keer' enforces
+        the set load in every iteration of a single solution, which is typically much faster, but doesn't support
+        adhesion, see slippy.contact.polonsky_keer
     no_update_warning: bool, optional (True)
         Change to False to suppress warning given when no movement or loading changes are specified
     upper: float, optional (4.0)
@@ -141,6 +162,7 @@ class QuasiStaticStep(_ModelStep):
     _adhesion_model = None
     _initial_contact_nodes = None
     _upper = None
+    _increment = 0
 
     def __init__(self, step_name: str, number_of_steps: int, no_time: bool = False,
                  time_period: float = 1.0,
@@ -158,7 +180,8 @@ class QuasiStaticStep(_ModelStep):
                  periodic_geometry: bool = False, periodic_axes: tuple = (False, False),
                  max_it_interference: int = 100, rtol_interference=1e-3,
                  max_it_displacement: int = None, rtol_displacement=1e-5, no_update_warning: bool = True,
-                 upper: float = 4.0):
+                 upper: float = 4.0, preconditioner: str = None,
+                 load_control: str = 'root_scalar'):
 
         # movement interpolation mode sort out movement interpolation mode make array of values
         if impact_properties is not None:
@@ -177,8 +200,14 @@ class QuasiStaticStep(_ModelStep):
         self._rtol_interference = rtol_interference
         self._max_it_displacement = max_it_displacement
         self._rtol_displacement = rtol_displacement
+        self._preconditioner = preconditioner
+        if load_control not in {'root_scalar', 'polonsky_keer'}:
+            raise ValueError(f"Unrecognised load control method: {load_control}, should be 'root_scalar' or "
+                             f"'polonsky_keer'")
+        self._load_control = load_control
         self.number_of_steps = number_of_steps
         self._height_optimisation_func = None
+        self._previous_increment = None
         self._adhesion = adhesion
         self._unloading = unloading
         self._upper_factor = upper
@@ -271,8 +300,16 @@ class QuasiStaticStep(_ModelStep):
         self._adhesion_model = self.model.adhesion if self._adhesion else None
 
         current_state = dict()
-
-        for i in range(self.number_of_steps):
+        self._previous_increment = None
+        start = 0
+        if self._resume_state is not None:
+            start = self._resume_state['increment'] + 1
+            current_time = self._resume_state['time']
+            self._previous_increment = self._resume_state['previous_increment']
+            self._resume_state = None
+
+        for i in range(start, self.number_of_steps):
+            self._increment = i
             self.update_movement(relative_time[i], original)
             # find overlapping nodes
             if 'off_set' in self.update or just_touching_gap is None or not self._no_time:
@@ -299,8 +336,12 @@ class QuasiStaticStep(_ModelStep):
                   '\n#####################################################')
             print('Set load:', self.normal_load)
 
-            results = update_func(current_state)
+            with telemetry.timed('time_step', increment=i):
+                results = update_func(current_state)
             current_state.update(results)
+            self._previous_increment = {'loads': current_state['loads'].z, 'interference': current_state['interference'],
+                                        'off_set': np.asarray(self.off_set, dtype=float),
+                                        'just_touching_gap': just_touching_gap}
             current_state['gap'] = (just_touching_gap - current_state['interference'] +
                                     current_state['total_displacement'].z)
             current_time += self.time_step
@@ -311,6 +352,10 @@ class QuasiStaticStep(_ModelStep):
 
         return current_state
 
+    def _checkpoint_state(self, current_state: dict) -> dict:
+        return {'increment': self._increment, 'time': current_state['time'],
+                'previous_increment': self._previous_increment}
+
     @property
     def upper(self):
         if self._upper is None:
@@ -324,9 +369,18 @@ class QuasiStaticStep(_ModelStep):
             else:
                 self.__setattr__(name, self.__getattribute__(f'_{name}_upd')(relative_time))
 
-    def _solve_load_controlled(self, current_state) -> dict:
-        # if there is time dependence or we don't already have one, make a new height optimiser
-        if not self._no_time or self._height_optimisation_func is None:
+    def _get_height_optimisation_func(self, max_set_load: float):
+        """Make or update the height optimisation function for this increment, seeded with the previous increment
+
+        Returns
+        -------
+        h_opt_func: HeightOptimisationFunction
+        previous_interference: float or None
+            The interference found in the previous increment, None if there isn't one
+        """
+        h_opt_func = self._height_optimisation_func
+        if h_opt_func is None or (not self._no_time and (not h_opt_func.im_mats or
+                                                         h_opt_func.shape != self._just_touching_gap.shape)):
             h_opt_func = HeightOptimisationFunction(just_touching_gap=self._just_touching_gap,
                                                     model=self.model,
                                                     adhesion_model=self._adhesion_model,
@@ -334,12 +388,48 @@ class QuasiStaticStep(_ModelStep):
                                                     max_it_inner=self._max_it_displacement,
                                                     tol_inner=self._rtol_displacement,
                                                     material_options=dict(),
-                                                    max_set_load=self.normal_load,
+                                                    max_set_load=max_set_load,
                                                     tolerance=self._rtol_interference,
-                                                    periodic_axes=self._periodic_axes)
+                                                    periodic_axes=self._periodic_axes,
+                                                    preconditioner=self._preconditioner)
             self._height_optimisation_func = h_opt_func
-        else:
-            h_opt_func = self._height_optimisation_func
+        elif not self._no_time:
+            # the influence matrices and convolution plans are kept, only the gap has changed
+            h_opt_func.update_gap(self._just_touching_gap, self._initial_contact_nodes)
+
+        previous = self._carry_forward()
+        if previous is None:
+            return h_opt_func, None
+        loads, interference = previous
+        h_opt_func.set_initial_guess(loads, interference)
+        return h_opt_func, interference
+
+    def _carry_forward(self):
+        """The loads and interference from the previous increment moved with the surfaces, None if there isn't one"""
+        previous = self._previous_increment
+        if previous is None or previous['loads'].shape != self._just_touching_gap.shape:
+            return None
+        loads = previous['loads']
+        shift = (0, 0)
+        movement = np.round((np.asarray(self.off_set, dtype=float) - previous['off_set']) /
+                            self.model.surface_1.grid_spacing).astype(int)
+        if np.any(movement):
+            # the loads move with whichever surface carries the features in contact, the shift which best matches
+            # the previous gap over the contact is used
+            contact = loads > 0
+
+            def mismatch(trial_shift):
+                moved_contact = _shift(contact, trial_shift, self._periodic_profile)
+                if not np.any(moved_contact):
+                    return np.inf
+                moved_gap = _shift(previous['just_touching_gap'], trial_shift, self._periodic_profile)
+                return np.mean(np.abs(self._just_touching_gap - moved_gap)[moved_contact])
+
+            shift = min([(0, 0), tuple(movement), tuple(-movement)], key=mismatch)
+        return _shift(loads, shift, self._periodic_profile), previous['interference']
+
+    def _solve_load_controlled(self, current_state) -> dict:
+        h_opt_func, previous_interference = self._get_height_optimisation_func(self.normal_load)
 
         if self._unloading and 'contact_nodes' in current_state:
             contact_nodes = current_state['contact_nodes']
@@ -349,11 +439,22 @@ class QuasiStaticStep(_ModelStep):
 
         h_opt_func.change_load(self.normal_load, contact_nodes)
 
+        if self._load_control == 'polonsky_keer':
+            h_opt_func.solve_set_load(current_state)
+            results = h_opt_func.results
+            load_conv = (np.abs(results['total_normal_load'] - self.normal_load) / self.normal_load) < 0.05
+            results['converged'] = bool(load_conv) and not h_opt_func.last_call_failed
+            print(h_opt_func.summary())
+            return results
+
         # need to set bounds and pick a sensible starting point
         upper = self.upper
         print(f'upper bound set at: {upper}')
         if self._no_time:
             brackets = h_opt_func.get_bounds_from_cache(0, upper)
+        elif previous_interference is not None:
+            brackets = bracket_interference(h_opt_func, previous_interference, upper, self._max_it_interference,
+                                            current_state)
         else:
             brackets = (0, upper)
         print(f'Bounds adjusted using cache to: {brackets}')
@@ -368,23 +469,11 @@ class QuasiStaticStep(_ModelStep):
         results['interference'] = opt_result.root
         load_conv = (np.abs(results['total_normal_load']-self.normal_load) / self.normal_load) < 0.05
         results['converged'] = bool(load_conv) and not h_opt_func.last_call_failed
+        print(h_opt_func.summary())
         return results
 
     def _solve_displacement_controlled(self, current_state):
-        if not self._no_time or self._height_optimisation_func is None:
-            h_opt_func = HeightOptimisationFunction(just_touching_gap=self._just_touching_gap,
-                                                    model=self.model,
-                                                    adhesion_model=self._adhesion_model,
-                                                    initial_contact_nodes=self._initial_contact_nodes,
-                                                    max_it_inner=self._max_it_displacement,
-                                                    tol_inner=self._rtol_displacement,
-                                                    material_options=dict(),
-                                                    max_set_load=1,
-                                                    tolerance=self._rtol_interference,
-                                                    periodic_axes=self._periodic_axes)
-            self._height_optimisation_func = h_opt_func
-        else:
-            h_opt_func = self._height_optimisation_func
+        h_opt_func, _ = self._get_height_optimisation_func(1)
 
         if self._unloading and 'contact_nodes' in current_state:
             contact_nodes = current_state['contact_nodes']
@@ -397,6 +486,7 @@ class QuasiStaticStep(_ModelStep):
         results = h_opt_func.results
         results['interference'] = self.interference
         results['converged'] = not h_opt_func.last_call_failed
+        print(h_opt_func.summary())
         return results
 
     def __repr__(self):
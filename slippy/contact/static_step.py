@@ -19,8 +19,12 @@ All should return a current state dict
 import numpy as np
 import scipy.optimize as optimize
 
+import slippy
+from ._material_utils import Displacements, Loads
 from ._model_utils import get_gap_from_model
-from ._step_utils import HeightOptimisationFunction
+from ._step_utils import HeightOptimisationFunction, bracket_interference
+from .influence_matrix_utils import plan_convolve
+from .materials import combined_influence_matrix
 from .steps import _ModelStep
 
 __all__ = ['StaticStep']
@@ -70,6 +74,31 @@ class StaticStep(_ModelStep):
         based materials
     rtol_displacement: float, optional (1e-4)
         The norm of the residual used to declare convergence of the bccg iterations
+    preconditioner: {None, 'fft'}, optional (None)
+        The preconditioner used for the bccg iterations, 'fft' uses the inverse of the influence matrix spectrum which
+        typically reduces the iterations needed for rough surface contacts, see slippy.contact.fft_preconditioner
+    load_control: {'root_scalar', 'polonsky_keer'}, optional ('root_scalar')
+        The method used for load controlled problems, 'root_scalar' finds the interference which gives the set load by
+        a bracketing root finder, each evaluation is a full solution of the contact problem. 'polonsky_keer' enforces
+        the set load in every iteration of a single solution, which is typically much faster, but doesn't support
+        adhesion, see slippy.contact.polonsky_keer
+    zoom: int, optional (None)
+        If set the problem is first solved on a grid coarsened by this factor, the full resolution problem is then
+        solved only over a padded bounding box of the coarse contact, starting from the coarse pressures. Only
+        supported for influence matrix based materials, see notes
+    zoom_padding: float, optional (0.5)
+        The padding added to each side of the bounding box of the coarse contact, as a fraction of the size of the box,
+        at least two coarse nodes are always added. The influence matrices span the zoomed region, so with less than
+        0.5 the interaction between distant nodes in the contact is ignored
+
+    Notes
+    -----
+    When zoom is set the contact is only solved in the zoomed region, the results are put back onto the full grid so
+    the current state has the same shapes as without zoom: the loads and contact nodes are zero outside the region and
+    the displacements and gap are found from the loads over the full grid. The 'zoom_region' item gives the start and
+    stop indexes of the region in the full grid: (start_y, stop_y, start_x, stop_x). For most concentrated contacts
+    this is many times faster than solving on the full grid, but it is not suitable if the contact spreads over most of
+    the surfaces, in which case the full grid is solved from the coarse initial guess.
 
     Examples
     --------
@@ -103,7 +132,9 @@ class StaticStep(_ModelStep):
                  unloading: bool = False, profile_interpolation_mode: str = 'nearest',
                  periodic_geometry: bool = False, periodic_axes: tuple = (False, False),
                  max_it_interference: int = 100, rtol_interference=1e-3,
-                 max_it_displacement: int = None, rtol_displacement=1e-4):
+                 max_it_displacement: int = None, rtol_displacement=1e-4, preconditioner: str = None,
+                 load_control: str = 'root_scalar', zoom: int = None,
+                 zoom_padding: float = 0.5):
 
         self._off_set = (off_set_x, off_set_y)
         self._relative_loading = bool(relative_loading)
@@ -114,6 +145,15 @@ class StaticStep(_ModelStep):
         self._rtol_interference = rtol_interference
         self._max_it_displacement = max_it_displacement
         self._rtol_displacement = rtol_displacement
+        self._preconditioner = preconditioner
+        if load_control not in {'root_scalar', 'polonsky_keer'}:
+            raise ValueError(f"Unrecognised load control method: {load_control}, should be 'root_scalar' or "
+                             f"'polonsky_keer'")
+        self._load_control = load_control
+        if zoom is not None and (int(zoom) != zoom or zoom < 2):
+            raise ValueError(f"Zoom should be an integer greater than 1, received: {zoom}")
+        self._zoom = None if zoom is None else int(zoom)
+        self._zoom_padding = zoom_padding
         self._height_optimisation_func = None
         self._adhesion = adhesion
         self._unloading = unloading
@@ -136,6 +176,8 @@ class StaticStep(_ModelStep):
         provides = {'off_set', 'loads', 'surface_1_displacement', 'surface_2_displacement', 'total_displacement',
                     'interference', 'just_touching_gap', 'surface_1_points', 'contact_nodes', 'total_normal_load',
                     'surface_2_points', 'time', 'time_step', 'new_step', 'converged', 'gap'}
+        if self._zoom is not None:
+            provides.add('zoom_region')
 
         super().__init__(step_name, time_period, provides)
 
@@ -176,53 +218,155 @@ class StaticStep(_ModelStep):
                          'surface_2_points': surface_2_points, 'time': previous_state['time'] + self.max_time,
                          'time_step': self.max_time, 'new_step': True, 'off_set': self._off_set}
 
+        if self.load_controlled:
+            load = self.normal_load
+            if self._relative_loading:
+                load += previous_state['total_normal_load']
+            interference = None
+        else:
+            load = None
+            interference = self.interference
+            if self._relative_loading:
+                interference += previous_state['interference']
+
+        if self._zoom is None:
+            opt_func, converged = self._solve_gap(just_touching_gap, initial_contact_nodes, None, load, interference,
+                                                  current_state)
+        else:
+            k = self._zoom
+            full_shape = just_touching_gap.shape
+            coarse_nodes = None if initial_contact_nodes is None else initial_contact_nodes[::k, ::k]
+            # the coarse gap samples the surfaces at every kth point of the full grid
+            coarse_func, _ = self._solve_gap(just_touching_gap[::k, ::k], coarse_nodes,
+                                             k * self.model.surface_1.grid_spacing, load, interference, dict())
+            coarse_results = coarse_func.results
+            region = self._zoom_region(coarse_results['contact_nodes'], full_shape)
+            print(f'Zoomed to region: {region}')
+            window = (slice(*region[:2]), slice(*region[2:]))
+            coarse_loads = np.repeat(np.repeat(coarse_results['loads'].z, k, axis=0), k, axis=1)
+            guess = (coarse_loads[:full_shape[0], :full_shape[1]][window], coarse_results['interference'])
+
+            if initial_contact_nodes is not None:
+                initial_contact_nodes = initial_contact_nodes[window]
+            current_state['zoom_region'] = region
+            opt_func, converged = self._solve_gap(just_touching_gap[window], initial_contact_nodes, None, load,
+                                                  interference, current_state, guess)
+
+        if self._zoom is None:
+            current_state.update(opt_func.results)
+        else:
+            current_state.update(self._embed_zoomed_results(opt_func.results, window, full_shape))
+        current_state['converged'] = converged
+        current_state['gap'] = (just_touching_gap - current_state['interference'] +
+                                current_state['total_displacement'].z)
+        self.solve_sub_models(current_state)
+        self.save_outputs(current_state, output_file)
+
+        return current_state
+
+    def _solve_gap(self, just_touching_gap, initial_contact_nodes, grid_spacing, load, interference,
+                   current_state, initial_guess=None):
+        """Solve the contact problem for a just touching gap
+
+        Parameters
+        ----------
+        just_touching_gap: np.ndarray
+            The just touching gap
+        initial_contact_nodes: np.ndarray
+            If set the contact is restricted to these nodes
+        grid_spacing: float
+            The grid spacing of the gap, None for the grid spacing of the first surface
+        load, interference: float
+            The set total load or the set interference, the other should be None
+        current_state: dict
+            The current state of the model
+        initial_guess: tuple, optional (None)
+            The loads and interference of an approximate solution
+
+        Returns
+        -------
+        opt_func: HeightOptimisationFunction
+            The solved height optimisation function, the results are in opt_func.results
+        converged: bool
+            True if the solution converged
+        """
         adhesion_model = self.model.adhesion if self._adhesion else None
         # for some reason the type checker messes up here, types are actually correct
         # noinspection PyTypeChecker
-        max_load = self.normal_load if self.load_controlled else 1.0
         opt_func = HeightOptimisationFunction(just_touching_gap=just_touching_gap, model=self.model,
                                               adhesion_model=adhesion_model,
                                               initial_contact_nodes=initial_contact_nodes,
                                               max_it_inner=self._max_it_displacement, tol_inner=self._rtol_displacement,
-                                              max_set_load=max_load,
+                                              max_set_load=load if self.load_controlled else 1.0,
                                               tolerance=self._rtol_interference, material_options=None,
-                                              periodic_axes=self._periodic_axes, )
-
-        if self._unloading and 'contact_nodes' in current_state:
-            contact_nodes = current_state['contact_nodes']
-        else:
-            contact_nodes = None
+                                              periodic_axes=self._periodic_axes,
+                                              preconditioner=self._preconditioner,
+                                              grid_spacing=grid_spacing)
+        if self._zoom is not None and not opt_func.im_mats:
+            raise ValueError("Zoom can only be used with influence matrix based materials")
+        if initial_guess is not None:
+            opt_func.set_initial_guess(*initial_guess)
 
         if self.load_controlled:
-            if self._relative_loading:
-                load = previous_state['total_normal_load'] + self.normal_load
-            else:
-                load = self.normal_load
             upper = 3 * max(just_touching_gap.flatten())
             print(f'upper bound set at: {upper}')
             print(f'Interference tolerance set to {self._rtol_displacement} Relative')
-            opt_func.change_load(load, contact_nodes)
-            _ = optimize.root_scalar(opt_func, bracket=(0, upper), rtol=self._rtol_interference,
-                                     maxiter=self._max_it_interference, args=(current_state,))
-            converged = (np.abs(opt_func.results['total_normal_load']-self.normal_load) /
-                         self.normal_load < 0.05 and not opt_func.last_call_failed)
-        else:
-            if self._relative_loading:
-                interference = previous_state['interference'] + self.interference
+            opt_func.change_load(load, None)
+            if self._load_control == 'polonsky_keer':
+                opt_func.solve_set_load(current_state)
             else:
-                interference = self.interference
-            opt_func.change_load(1, contact_nodes)
+                bracket = (0, upper)
+                if initial_guess is not None:
+                    bracket = bracket_interference(opt_func, initial_guess[1], upper, self._max_it_interference,
+                                                   current_state)
+                _ = optimize.root_scalar(opt_func, bracket=bracket, rtol=self._rtol_interference,
+                                         maxiter=self._max_it_interference, args=(current_state,))
+            converged = (np.abs(opt_func.results['total_normal_load'] - load) /
+                         load < 0.05 and not opt_func.last_call_failed)
+        else:
+            opt_func.change_load(1, None)
             _ = opt_func(interference, current_state)
             converged = not opt_func.last_call_failed
+        print(opt_func.summary())
+        return opt_func, converged
 
-        current_state.update(opt_func.results)
-        current_state['converged'] = converged
-        current_state['gap'] = (just_touching_gap - current_state['interference'] +
-                                opt_func.results['total_displacement'].z)
-        self.solve_sub_models(current_state)
-        self.save_outputs(current_state, output_file)
+    def _embed_zoomed_results(self, results: dict, window: tuple, full_shape: tuple) -> dict:
+        """Put the results solved in the zoomed region back onto the full grid
 
-        return current_state
+        The loads and contact nodes are zero outside the region, the displacements are found from the loads by a
+        convolution over the full grid
+        """
+        loads = np.zeros(full_shape)
+        loads[window] = slippy.asnumpy(results['loads'].z)
+        contact_nodes = np.zeros(full_shape, dtype=bool)
+        contact_nodes[window] = slippy.asnumpy(results['contact_nodes'])
+        surf_1, surf_2 = self.model.surface_1, self.model.surface_2
+        grid_spacing = [surf_1.grid_spacing] * 2
+        im_1 = surf_1.material.influence_matrix(span=full_shape, grid_spacing=grid_spacing, components=['zz'])['zz']
+        total_im = combined_influence_matrix(surf_1.material, surf_2.material, full_shape, grid_spacing)
+        total_disp = slippy.asnumpy(plan_convolve(loads, total_im, circular=self._periodic_axes)(loads))
+        disp_1 = slippy.asnumpy(plan_convolve(loads, im_1, circular=self._periodic_axes)(loads))
+        return {**results, 'loads': Loads(z=loads), 'contact_nodes': contact_nodes,
+                'total_displacement': Displacements(z=total_disp.copy()),
+                'surface_1_displacement': Displacements(z=disp_1.copy()),
+                'surface_2_displacement': Displacements(z=total_disp - disp_1)}
+
+    def _zoom_region(self, coarse_contact_nodes, full_shape) -> tuple:
+        """The padded bounding box of the coarse contact in the full grid: (start_y, stop_y, start_x, stop_x)
+
+        Periodic axes and axes with no contact are not cropped
+        """
+        k = self._zoom
+        region = []
+        for axis in range(2):
+            in_contact = np.flatnonzero(np.any(coarse_contact_nodes, axis=1 - axis))
+            if self._periodic_axes[axis] or not in_contact.size:
+                region.extend([0, full_shape[axis]])
+                continue
+            first, last = int(in_contact[0]), int(in_contact[-1])
+            pad = max(2, int(np.ceil(self._zoom_padding * (last - first + 1))))
+            region.extend([max(0, (first - pad) * k), min(full_shape[axis], (last + pad + 1) * k)])
+        return tuple(region)
 
     def __repr__(self):
         string = (f'StaticStep({self.name}, time_period={self.max_time},'
@@ -232,5 +376,7 @@ class StaticStep(_ModelStep):
                   f'unloading={self._unloading}, profile_interpolation_mode={self.profile_interpolation_mode},'
                   f'periodic_geometry={self._periodic_profile}, periodic_axes{self._periodic_axes},'
                   f'max_it_interference={self._max_it_interference}, rtol_interference:{self._rtol_interference},'
-                  f'max_it_displacement={self._max_it_displacement}, rtol_displacement={self._rtol_displacement})')
+                  f'max_it_displacement={self._max_it_displacement}, rtol_displacement={self._rtol_displacement},'
+                  f'preconditioner={self._preconditioner}, load_control={self._load_control},'
+                  f'zoom={self._zoom}, zoom_padding={self._zoom_padding})')
         return string
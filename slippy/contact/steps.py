@@ -30,6 +30,8 @@ class _ModelStep(_StepABC):
     _options = None
     """A named tuple options object should be different for each step type, specifies all of the analysis options"""
     _model: _ContactModelABC = None
+    _resume_state: typing.Optional[dict] = None
+    """Set by the model when resuming from a checkpoint written part way through this step"""
     _subclass_registry = []
     max_time: float
     sub_models: typing.List[_SubModelABC]
@@ -198,7 +200,7 @@ class _ModelStep(_StepABC):
         raise NotImplementedError()
 
     def save_outputs(self, current_state: dict, output_file):
-        """Writes all outputs for the step into the output file
+        """Writes all outputs for the step into the output file, should be called once for each solved increment
 
         Parameters
         ----------
@@ -209,8 +211,20 @@ class _ModelStep(_StepABC):
         -------
 
         """
-        if not self.outputs:
-            return
+        if self.outputs:
+            self._write_outputs(current_state, output_file)
+        if self.model is not None:
+            self.model.increment_solved(self, current_state)
+
+    def _checkpoint_state(self, current_state: dict) -> typing.Optional[dict]:
+        """The information needed to carry on solving this step after the increment which gave current_state
+
+        Steps which can be resumed part way through should override this and continue from _resume_state when it is
+        set, by default None is returned and checkpoints are only written at the end of the step.
+        """
+        return None
+
+    def _write_outputs(self, current_state: dict, output_file):
         params_to_save = {'time'}
         for output in self.outputs:
             if output.is_active(current_state['time'], self.max_time):
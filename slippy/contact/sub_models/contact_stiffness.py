@@ -5,7 +5,7 @@ if slippy.CUDA:
     import cupy as cp
 from slippy.abcs import _SubModelABC  # noqa: E402
 from slippy.contact.influence_matrix_utils import plan_convolve, bccg  # noqa: E402
-from slippy.contact.materials import _IMMaterial  # noqa: E402
+from slippy.contact.materials import _IMMaterial, combined_influence_matrix  # noqa: E402
 
 
 class ResultContactStiffness(_SubModelABC):
@@ -121,11 +121,7 @@ class ResultContactStiffness(_SubModelABC):
 
         comp = self.component
 
-        im1 = surf_1.material.influence_matrix(span=span, grid_spacing=[surf_1.grid_spacing] * 2,
-                                               components=[comp])[comp]
-        im2 = surf_2.material.influence_matrix(span=span, grid_spacing=[surf_1.grid_spacing] * 2,
-                                               components=[comp])[comp]
-        total_im = im1 + im2
+        total_im = combined_influence_matrix(surf_1.material, surf_2.material, span, [surf_1.grid_spacing] * 2, comp)
 
         displacement = np.ones(contact_nodes.shape)
 
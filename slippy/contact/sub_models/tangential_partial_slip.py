@@ -4,7 +4,7 @@ import numpy as np
 import slippy
 from slippy.contact._material_utils import Loads, Displacements
 from slippy.abcs import _SubModelABC
-from slippy.contact.materials import _IMMaterial
+from slippy.contact.materials import _IMMaterial, combined_influence_matrix
 from slippy.contact.influence_matrix_utils import bccg, plan_convolve
 
 
@@ -31,6 +31,7 @@ class TangentialPartialSlip(_SubModelABC):
     max_it: int, optional (None)
         The maximum number of iterations for the bccg iterations, defaults to the same as the number of contact nodes
     """
+    derived_attributes = ('_last_span', '_pre_solve_checks', '_im_1', '_im_2', '_im_total')
 
     def __init__(self, name: str, direction: str,
                  load: typing.Union[float, typing.Sequence] = None,
@@ -95,7 +96,8 @@ class TangentialPartialSlip(_SubModelABC):
                                                                   [self.component])[self.component]
             self._im_1 = im_1
             self._im_2 = im_2
-            self._im_total = im_1 + im_2
+            self._im_total = combined_influence_matrix(self.model.surface_1.material, self.model.surface_2.material,
+                                                       span, [self.model.surface_1.grid_spacing] * 2, self.component)
             self._pre_solve_checks = True
         else:
             raise ValueError("This sub model only supports influence matrix based materials")
@@ -133,7 +135,7 @@ class TangentialPartialSlip(_SubModelABC):
             full_loads[domain] = loads_in_domain
             stick_nodes = np.logical_and(domain, full_loads < (0.99 * current_state['maximum_tangential_force']))
             current_state['stick_nodes'] = stick_nodes
-            tangential_deformation = slippy.asnumpy(conv_func_full(loads_in_domain, True))
+            tangential_deformation = slippy.asnumpy(conv_func_full(loads_in_domain, True)).copy()
             loads = current_state['loads']._asdict() if 'loads' in current_state else dict()
             loads[self.component[0]] = full_loads
             current_state['loads'] = Loads(**loads)
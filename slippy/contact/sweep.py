@@ -0,0 +1,159 @@
+"""
+Running many variants of a contact model in parallel
+"""
+import csv
+import multiprocessing
+import os
+import time
+import traceback
+import typing
+from concurrent.futures import ProcessPoolExecutor
+from numbers import Number
+
+import numpy as np
+
+import slippy
+from .influence_matrix_utils import clear_plan_cache, elastic_influence_matrix
+from .materials import _combined_ims
+
+__all__ = ['run_sweep']
+
+
+def _default_summary(state: dict) -> dict:
+    """The scalar values in the final state of a model"""
+    return {key: value.item() if isinstance(value, np.generic) else value for key, value in state.items()
+            if isinstance(value, (Number, np.bool_, bool)) and not isinstance(value, complex)}
+
+
+def _init_worker(cores: int, im_cache_dir: typing.Optional[str]):
+    """Set the number of threads used by each worker and point the workers at a shared influence matrix cache
+
+    The cache holds the influence matrices of each material, the combined influence matrix of each pair of materials
+    and the spectra of the combined matrices, so a worker only computes what no other worker has already written
+    """
+    slippy.CORES = cores
+    if im_cache_dir is not None:
+        slippy.IM_DISK_CACHE = True
+        slippy.IM_CACHE_DIR = im_cache_dir
+        # forked workers inherit the in memory caches, those arrays are not memory maps of the shared cache
+        elastic_influence_matrix.cache.clear()
+        _combined_ims.clear()
+        clear_plan_cache()
+
+
+def _run_one(make_model: typing.Callable, index: int, parameters: dict, run_dir: str,
+             summary: typing.Callable) -> dict:
+    """Build, solve and summarise a single model variant, errors are recorded rather than raised"""
+    row = {'run': index, **parameters, 'output_dir': run_dir}
+    start = time.perf_counter()
+    try:
+        model = make_model(**parameters)
+        os.makedirs(run_dir, exist_ok=True)
+        # the output files are named after the model, a directory for each run keeps them separate
+        slippy.OUTPUT_DIR = run_dir
+        state = model.solve(skip_data_check=True)
+        row.update(summary(state))
+        row['error'] = ''
+    except Exception as error:
+        row['error'] = ''.join(traceback.format_exception_only(type(error), error)).strip()
+    row['solve_time'] = time.perf_counter() - start
+    return row
+
+
+def run_sweep(make_model: typing.Callable, parameters: typing.Sequence[dict], output_dir: str = None,
+              max_workers: int = None, cores_per_worker: int = None, share_influence_matrices: bool = True,
+              summary: typing.Callable[[dict], dict] = None) -> typing.List[dict]:
+    """Solve many variants of a contact model in parallel processes
+
+    Parameters
+    ----------
+    make_model: Callable
+        Called with the keyword arguments in each element of parameters, should return a ContactModel ready to solve.
+        This must be importable by the worker processes, eg a function defined at the top level of a module, not a
+        lambda or a function defined in an interactive session
+    parameters: Sequence[dict]
+        The keyword arguments for each variant, eg: [{'load': 10}, {'load': 20}], itertools.product can be used to
+        make grids of parameters
+    output_dir: str, optional (None)
+        The directory the outputs are written to, defaults to slippy.OUTPUT_DIR. The outputs of each variant are
+        written to a run_#### sub directory, a summary of all the runs is written to sweep_summary.csv
+    max_workers: int, optional (None)
+        The number of worker processes, defaults to the number of variants or the number of cpus if that is fewer.
+        If 1 the variants are solved in this process one after another
+    cores_per_worker: int, optional (None)
+        The number of threads used by each worker for FFTs (sets slippy.CORES in the workers), defaults to the
+        number of cpus divided by the number of workers, so the machine is not oversubscribed
+    share_influence_matrices: bool, optional (True)
+        If True the workers use the on disk influence matrix cache (output_dir/im_cache), so each influence matrix, the
+        combined matrix of each pair of materials and its spectrum are found once and shared between the workers by
+        memory mapping, see slippy.IM_DISK_CACHE
+    summary: Callable, optional (None)
+        Called with the final state of each model, should return a dict of values to add to the summary, by default
+        all scalar values in the final state are used (eg: total_normal_load, interference, converged)
+
+    Returns
+    -------
+    summary: list[dict]
+        One row for each variant in the same order as parameters, each row has the run number, the parameters, the
+        output directory, the values from the summary function, the time taken to build and solve the model
+        ('solve_time') and the error message if the run failed ('error', empty if the run succeeded)
+
+    Notes
+    -----
+    Failed runs do not stop the sweep, check the error column of the summary.
+
+    Examples
+    --------
+    In a module (eg sweep_script.py):
+
+    >>> import slippy.contact as c
+    >>> import slippy.surface as s
+    >>>
+    >>> def make_model(load, youngs_modulus):
+    >>>     flat = s.FlatSurface()
+    >>>     ball = s.RoundSurface((1, 1, 1), extent=(0.006, 0.006), shape=(255, 255), generate=True)
+    >>>     flat.material = c.Elastic('flat', {'E': youngs_modulus, 'v': 0.3})
+    >>>     ball.material = c.Elastic('steel', {'E': 200e9, 'v': 0.3})
+    >>>     model = c.ContactModel('ball_on_flat', ball, flat)
+    >>>     model.add_step(c.StaticStep('contact', normal_load=load))
+    >>>     return model
+    >>>
+    >>> if __name__ == '__main__':
+    >>>     parameters = [{'load': load, 'youngs_modulus': e} for load in (10, 100) for e in (70e9, 200e9)]
+    >>>     results = c.run_sweep(make_model, parameters, output_dir='sweep', max_workers=4)
+    """
+    parameters = [dict(p) for p in parameters]
+    output_dir = os.path.abspath(output_dir if output_dir is not None else slippy.OUTPUT_DIR)
+    os.makedirs(output_dir, exist_ok=True)
+    summary = summary or _default_summary
+    cpus = multiprocessing.cpu_count()
+    if max_workers is None:
+        max_workers = min(len(parameters), cpus)
+    max_workers = max(1, max_workers)
+    if cores_per_worker is None:
+        cores_per_worker = max(1, cpus // max_workers)
+    im_cache_dir = os.path.join(output_dir, 'im_cache') if share_influence_matrices else None
+    run_dirs = [os.path.join(output_dir, f'run_{i:04d}') for i in range(len(parameters))]
+
+    if max_workers == 1:
+        settings = (slippy.CORES, slippy.IM_DISK_CACHE, slippy.IM_CACHE_DIR, slippy.OUTPUT_DIR)
+        try:
+            _init_worker(cores_per_worker, im_cache_dir)
+            rows = [_run_one(make_model, i, p, d, summary) for i, (p, d) in enumerate(zip(parameters, run_dirs))]
+        finally:
+            slippy.CORES, slippy.IM_DISK_CACHE, slippy.IM_CACHE_DIR, slippy.OUTPUT_DIR = settings
+    else:
+        with ProcessPoolExecutor(max_workers, initializer=_init_worker,
+                                 initargs=(cores_per_worker, im_cache_dir)) as executor:
+            futures = [executor.submit(_run_one, make_model, i, p, d, summary)
+                       for i, (p, d) in enumerate(zip(parameters, run_dirs))]
+            rows = [future.result() for future in futures]
+
+    field_names = []
+    for row in rows:
+        field_names.extend(key for key in row if key not in field_names)
+    with open(os.path.join(output_dir, 'sweep_summary.csv'), 'w', newline='') as file:
+        writer = csv.DictWriter(file, field_names)
+        writer.writeheader()
+        writer.writerows(rows)
+    return rows
@@ -0,0 +1,155 @@
+"""
+Structured records of solver progress, counters and timings
+"""
+import contextlib
+import json
+import time
+import typing
+from collections import defaultdict
+
+import numpy as np
+
+__all__ = ['Telemetry']
+
+LEVEL = 0
+"""The level of the active Telemetry object, 0 if none is active, checked before making any records"""
+_active: typing.Optional['Telemetry'] = None
+
+
+class Telemetry:
+    """Collects structured records of solver progress
+
+    Parameters
+    ----------
+    file_name: str, optional (None)
+        If set each record is written to this file as a line of json (JSONL), the file is added to if it exists
+    level: int, optional (1)
+        The detail recorded:
+
+        * 1: the wall clock time taken by each model step and each time step of the quasi static step
+        * 2: each solution of the normal contact problem (eg each interference tried while finding the load) and each
+          iteration of the lubrication steps
+        * 3: each iteration of the inner solvers (bccg and polonsky_keer), this has a noticeable cost
+
+    keep_records: bool, optional (True)
+        If False records are only written to the file, useful for long runs at high levels
+
+    Attributes
+    ----------
+    records: list[dict]
+        The records made so far, each has an 'event' name and the time in seconds since the telemetry started ('t'),
+        records made while a model step is solved also have the name of the step ('step'), other items depend on the
+        event
+    counters: dict
+        Running totals, eg: 'convolutions' (each is one forward and one inverse FFT), 'bccg_iterations',
+        'polonsky_keer_iterations', these are found at all levels
+    timings: dict
+        The total wall clock time in seconds spent in each timed section: 'step' and 'time_step' (each time step of the
+        quasi static step)
+
+    Notes
+    -----
+    Telemetry is active inside a with block, records are only made while it is active. The solvers check the level
+    before making each record, so when no telemetry is active nothing is formatted or stored. Telemetry objects can be
+    nested, the inner one is used until it exits.
+
+    Numpy scalars in records are converted to python numbers, records should not contain arrays.
+
+    Examples
+    --------
+    >>> import slippy.contact as c
+    >>> with c.Telemetry('telemetry.jsonl', level=2) as telemetry:
+    >>>     my_model.solve()
+    >>> telemetry.counters['convolutions']
+    >>> [r['iterations'] for r in telemetry.records if r['event'] == 'bccg']
+    """
+
+    def __init__(self, file_name: str = None, level: int = 1, keep_records: bool = True):
+        if level < 1:
+            raise ValueError(f"Telemetry level should be 1 or more, received: {level}")
+        self.file_name = file_name
+        self.level = int(level)
+        self.keep_records = keep_records
+        self.records = []
+        self.counters = defaultdict(int)
+        self.timings = defaultdict(float)
+        self.context = dict()
+        self._file = None
+        self._start = None
+        self._previous = None
+
+    def record(self, event: str, **fields):
+        """Add a record, use the module level record function from solvers"""
+        fields = {key: value.item() if isinstance(value, np.generic) else value for key, value in fields.items()}
+        entry = {'event': event, 't': time.perf_counter() - self._start, **self.context, **fields}
+        if self.keep_records:
+            self.records.append(entry)
+        if self._file is not None:
+            self._file.write(json.dumps(entry) + '\n')
+
+    def __enter__(self):
+        global _active, LEVEL
+        if self.file_name is not None:
+            self._file = open(self.file_name, 'a')
+        self._start = time.perf_counter()
+        self._previous = _active
+        _active, LEVEL = self, self.level
+        return self
+
+    def __exit__(self, err_type, value, traceback):
+        global _active, LEVEL
+        _active = self._previous
+        LEVEL = 0 if _active is None else _active.level
+        self._previous = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __repr__(self):
+        return f'Telemetry(file_name={self.file_name}, level={self.level}, keep_records={self.keep_records})'
+
+
+def record(event: str, level: int = 1, **fields):
+    """Record an event if telemetry is active at this level or higher
+
+    In hot loops check LEVEL before calling this, so the fields are not found when no telemetry is active
+    """
+    if LEVEL >= level:
+        _active.record(event, **fields)
+
+
+def count(name: str, n: int = 1):
+    """Add n to a counter if telemetry is active"""
+    if LEVEL:
+        _active.counters[name] += n
+
+
+@contextlib.contextmanager
+def timed(name: str, level: int = 1, **fields):
+    """Time a section of code, adding to the timing total and recording the time taken if active at this level"""
+    if LEVEL < level:
+        yield
+        return
+    telemetry = _active
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        telemetry.timings[name] += elapsed
+        telemetry.record(name, wall_time=elapsed, **fields)
+
+
+@contextlib.contextmanager
+def context(**fields):
+    """Add items to every record made inside this block, eg the name of the step being solved"""
+    telemetry = _active
+    if telemetry is None:
+        yield
+        return
+    previous = telemetry.context
+    telemetry.context = {**previous, **fields}
+    try:
+        yield
+    finally:
+        telemetry.context = previous
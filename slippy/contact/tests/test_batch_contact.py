@@ -0,0 +1,54 @@
+import numpy as np
+import numpy.testing as npt
+
+import slippy.contact as c
+
+
+def make_gaps(batch_size, n):
+    np.random.seed(0)
+    gaps = np.cumsum(np.cumsum(np.random.randn(batch_size, n, n), axis=1), axis=2) * 1e-9
+    return gaps.max(axis=(1, 2), keepdims=True) - gaps
+
+
+def test_plan_batch_convolve():
+    np.random.seed(0)
+    loads = np.random.rand(3, 32, 32)
+    for im, circular in [(np.random.rand(64, 64), False), (np.random.rand(17, 70), False),
+                         (np.random.rand(32, 32), True)]:
+        batch_convolve = c.plan_batch_convolve(loads[0], im, circular)
+        result = batch_convolve(loads)
+        convolve = c.plan_convolve(loads[0], im, None, circular)
+        for i in range(3):
+            npt.assert_allclose(result[i], convolve(loads[i]), rtol=1e-10, atol=1e-10 * np.max(result))
+
+
+def test_batch_interference_controlled():
+    n, grid_spacing = 32, 1e-6
+    gaps = make_gaps(4, n)
+    im = c.elastic_influence_matrix('zz', (2 * n, 2 * n), (grid_spacing, grid_spacing), 200e9 / 2.6, 0.3)
+    interferences = np.percentile(gaps.reshape(4, -1), 20, axis=1)
+    results = c.solve_normal_contact_batch(gaps, im, grid_spacing, interferences=interferences, tol=1e-10)
+    assert np.all(results['converged'])
+    for i in range(4):
+        z = interferences[i] - gaps[i]
+        domain = z > 0
+        loads, failed = c.bccg(c.plan_convolve(gaps[i], im, domain), z[domain], 1e-10, 1000, np.zeros(np.sum(domain)))
+        full_loads = np.zeros((n, n))
+        full_loads[domain] = loads
+        npt.assert_allclose(results['loads'][i], full_loads, atol=1e-8 * np.max(full_loads))
+
+
+def test_batch_load_controlled():
+    n, grid_spacing = 32, 1e-6
+    gaps = make_gaps(4, n)
+    im = c.elastic_influence_matrix('zz', (2 * n, 2 * n), (grid_spacing, grid_spacing), 200e9 / 2.6, 0.3)
+    set_loads = np.array([1e-3, 2e-3, 3e-3, 4e-3])
+    results = c.solve_normal_contact_batch(gaps, im, grid_spacing, loads=set_loads, tol=1e-10)
+    assert np.all(results['converged'])
+    npt.assert_allclose(results['total_normal_load'], set_loads)
+    domain = np.ones((n, n), dtype=bool)
+    for i in range(4):
+        loads, interference, failed = c.polonsky_keer(c.plan_convolve(gaps[i], im, domain), gaps[i][domain],
+                                                      set_loads[i], grid_spacing ** 2, 1e-10, 1000)
+        npt.assert_allclose(results['loads'][i], loads.reshape(n, n), atol=1e-8 * np.max(loads))
+        npt.assert_approx_equal(results['interference'][i], interference, 6)
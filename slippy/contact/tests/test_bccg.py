@@ -0,0 +1,72 @@
+import numpy as np
+import numpy.testing as npt
+
+import slippy
+import slippy.contact as c
+
+
+def test_fft_preconditioner():
+    # rough contact against a rigid flat, the preconditioned solution should match and need fewer iterations
+    np.random.seed(0)
+    n = 64
+    heights = np.cumsum(np.cumsum(np.random.randn(n, n), axis=0), axis=1) * 1e-8
+    heights -= heights.max()
+    gap = heights - np.percentile(heights, 30)
+    domain = gap > 0
+    im = c.elastic_influence_matrix('zz', (2 * n, 2 * n), (1e-6, 1e-6), 200e9 / 2.6, 0.3)
+    with slippy.OverRideCuda():
+        conv_func = c.plan_convolve(gap, im, domain)
+        results = dict()
+        for preconditioner in [None, 'fft']:
+            info = dict()
+            x, failed = c.bccg(conv_func, gap[domain], 1e-10, 1000, np.zeros(np.sum(domain)),
+                               preconditioner=preconditioner, info=info)
+            assert not failed
+            results[preconditioner] = x, info['iterations']
+    npt.assert_allclose(results['fft'][0], results[None][0], atol=1e-6 * np.max(results[None][0]))
+    assert results['fft'][1] < results[None][1]
+
+
+def test_polonsky_keer():
+    # the load controlled solution should match bccg at the interference found
+    n, grid_spacing = 128, 1e-5
+    im = c.elastic_influence_matrix('zz', (2 * n, 2 * n), (grid_spacing, grid_spacing), 200e9 / 2.6, 0.3)
+    x, y = np.meshgrid(*[(np.arange(n) - n / 2) * grid_spacing] * 2)
+    gap = (x ** 2 + y ** 2) / 0.02
+    domain = np.ones(gap.shape, dtype=bool)
+    with slippy.OverRideCuda():
+        conv_func = c.plan_convolve(gap, im, domain)
+        loads, interference, failed = c.polonsky_keer(conv_func, gap[domain], 10.0, grid_spacing ** 2, 1e-10, 1000)
+        assert not failed
+        npt.assert_approx_equal(np.sum(loads) * grid_spacing ** 2, 10.0)
+        z = interference - gap
+        contact = z > 0
+        bccg_loads, failed = c.bccg(c.plan_convolve(gap, im, contact), z[contact], 1e-10, 1000,
+                                    np.zeros(np.sum(contact)))
+        assert not failed
+    full_loads = np.zeros(gap.shape)
+    full_loads[contact] = bccg_loads
+    npt.assert_allclose(loads.reshape(gap.shape), full_loads, atol=1e-4 * np.max(full_loads))
+
+
+def test_polonsky_keer_saturated():
+    # loads at or above what the domain can carry at the maximum pressure are reported as failed, never as nan
+    n, grid_spacing, max_pressure = 32, 1e-5, 1e9
+    im = c.elastic_influence_matrix('zz', (2 * n, 2 * n), (grid_spacing, grid_spacing), 200e9 / 2.6, 0.3)
+    x, y = np.meshgrid(*[(np.arange(n) - n / 2) * grid_spacing] * 2)
+    gap = (x ** 2 + y ** 2) / 0.02
+    domain = np.ones(gap.shape, dtype=bool)
+    capacity = max_pressure * n ** 2 * grid_spacing ** 2
+    with slippy.OverRideCuda():
+        conv_func = c.plan_convolve(gap, im, domain)
+        loads, interference, failed = c.polonsky_keer(conv_func, gap[domain], 1.5 * capacity, grid_spacing ** 2,
+                                                      1e-10, 1000, max_pressure=max_pressure)
+        assert failed
+        npt.assert_array_equal(loads, max_pressure)
+        assert np.isfinite(interference)
+        # every node in contact reaches the cap before the load is carried
+        loads, interference, failed = c.polonsky_keer(conv_func, gap[domain], 0.99 * capacity, grid_spacing ** 2,
+                                                      1e-10, 1000, max_pressure=max_pressure)
+        assert failed
+        assert np.all(np.isfinite(loads)) and np.isfinite(interference)
+        assert np.max(loads) <= max_pressure
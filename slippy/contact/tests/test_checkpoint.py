@@ -0,0 +1,85 @@
+import numpy as np
+import numpy.testing as npt
+import pytest
+
+import slippy
+import slippy.contact as c
+import slippy.surface as s
+from slippy.abcs import _SubModelABC
+
+
+class Interrupt(_SubModelABC):
+    """Raises part way through a model, as if the process was killed"""
+    kill_at = None
+
+    def __init__(self):
+        super().__init__('interrupt', set(), set())
+
+    def solve(self, current_state: dict) -> dict:
+        if Interrupt.kill_at is not None and current_state['time'] > Interrupt.kill_at:
+            raise KeyboardInterrupt
+        return dict()
+
+
+def make_wear_model():
+    np.random.seed(1)
+    profile = np.cumsum(np.cumsum(np.random.randn(64, 64), axis=0), axis=1) * 2e-9
+    rough_surface = s.Surface(profile=profile, grid_spacing=2e-5)
+    ball = s.RoundSurface((0.01, 0.01, 0.01))
+    rough_surface.material = c.Elastic('Aluminum', {'E': 70e9, 'v': 0.33}, max_load=1.5e8)
+    ball.material = c.Elastic('Steel', {'E': 200e9, 'v': 0.3})
+    model = c.ContactModel('model-1', rough_surface, ball)
+    step = c.QuasiStaticStep('slide', 6, off_set_x=[0.0006, 0.0007], off_set_y=0.00064, normal_load=2.0,
+                             no_update_warning=False)
+    step.add_sub_model(c.sub_models.WearElasticPerfectlyPlastic('wear', 1.0, 0.0))
+    step.add_sub_model(Interrupt())
+    model.add_step(step)
+    model.add_output(c.OutputRequest('wear', ['total_plastic_deformation', 'interference'], 'interval', 1))
+    return model
+
+
+def test_checkpoint_resume(tmp_path):
+    output_dir = slippy.OUTPUT_DIR
+    slippy.OUTPUT_DIR = str(tmp_path)
+    try:
+        with slippy.OverRideCuda():
+            uninterrupted = make_wear_model()
+            with c.Telemetry(level=2) as telemetry:
+                expected = uninterrupted.solve(skip_data_check=True)
+            expected_outputs = c.OutputReader(str(tmp_path / 'model-1'))['interference']
+
+            Interrupt.kill_at = 0.5
+            with pytest.raises(KeyboardInterrupt):
+                make_wear_model().solve(skip_data_check=True, checkpoint_every=2)
+            Interrupt.kill_at = None
+            resumed = make_wear_model()
+            result = resumed.solve(skip_data_check=True, checkpoint_every=2, resume=True)
+            outputs = c.OutputReader(str(tmp_path / 'model-1'))['interference']
+    finally:
+        Interrupt.kill_at = None
+        slippy.OUTPUT_DIR = output_dir
+    # the reference run must itself be right, otherwise two runs failing in the same way would agree
+    assert expected['converged']
+    assert all(np.isfinite(r['total_load']) for r in telemetry.records if r['event'] == 'height_evaluation')
+    npt.assert_allclose(expected['total_normal_load'], 2.0, rtol=0.05)
+    npt.assert_allclose(expected['interference'], 3.75e-7, rtol=0.01)
+    assert result['converged']
+    assert np.any(uninterrupted.surface_1.wear_volumes['wear'])
+    npt.assert_allclose(resumed.surface_1.profile, uninterrupted.surface_1.profile)
+    npt.assert_approx_equal(result['interference'], expected['interference'])
+    assert list(outputs) == list(expected_outputs)
+    npt.assert_allclose(list(outputs.values()), list(expected_outputs.values()))
+
+
+def test_sub_model_state_skips_derived_attributes():
+    slip = c.sub_models.TangentialPartialSlip('slip', 'x', load=1.0)
+    slip._im_total = np.ones((8, 8))
+    slip._pre_solve_checks = True
+    state = slip.get_state()
+    assert state['load'] == 1.0
+    assert not set(slip.derived_attributes) & set(state)
+    # a resumed sub model finds the influence matrices again when it is next solved
+    resumed = c.sub_models.TangentialPartialSlip('slip', 'x', load=2.0)
+    resumed.set_state(state)
+    assert resumed.load == 1.0
+    assert resumed._im_total is None and not resumed._pre_solve_checks
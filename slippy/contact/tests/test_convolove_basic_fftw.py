@@ -113,3 +113,17 @@ def test_dont_raise_equal_shapes_circ():
             except:  # noqa: E722
                 raise AssertionError(f"Plan convolve raised wrong error for mixed "
                                      f"convolution load shape: {l_s}, circ: {circ}")
+
+
+# Test that the buffers in the planned convolution are reused without leaking results between calls
+def test_domain_convolve_repeated_calls():
+    with slippy.OverRideCuda():
+        im = e_im('zz', (128, 128), (0.01, 0.01), 200e9, 0.3)
+        domain = np.random.rand(128, 128) > 0.5
+        conv_func = c.plan_convolve(np.zeros((128, 128)), im, domain)
+        for _ in range(3):
+            loads = 1000 * np.random.rand(128, 128)
+            loads[np.logical_not(domain)] = 0
+            scipy_result = fftconvolve(loads, im, mode='same')
+            npt.assert_allclose(conv_func(loads[domain]), scipy_result[domain])
+            npt.assert_allclose(conv_func(loads[domain], ignore_domain=True), scipy_result)
@@ -0,0 +1,150 @@
+import numpy as np
+import numpy.testing as npt
+
+import slippy.contact as c
+import slippy.contact.influence_matrix_utils as imu
+from slippy.contact.influence_matrix_utils import _plan_scipy_convolve, _bind_domain, _plan_cache, _padded_kernel
+from slippy.contact.materials import combined_influence_matrix
+from scipy.signal import fftconvolve
+
+e_im = c.elastic_influence_matrix
+
+im_shapes = [(128, 128), (129, 128), (127, 128), (128, 127), (127, 127), (129, 129)]
+loads_shapes = [(127, 128), (128, 128), (129, 128), (128, 129), (129, 129), (127, 127)]
+
+shapes_circ = [(127, 127), (128, 128), (129, 127), (128, 129)]
+
+
+# Test if our non circular convolution lines up with scipy's fft convolve
+def test_non_circ_convolve_vs_scipy():
+    for im_s, l_s in zip(im_shapes, loads_shapes):
+        # pick a component which is not symmetric!
+        im = e_im('zx', im_s, (0.01, 0.01), 200e9, 0.3)
+        loads = 1000 * np.random.rand(*l_s)
+        scipy_result = fftconvolve(loads, im, mode='same')
+        conv_func = _bind_domain(_plan_scipy_convolve(loads, im, [False, False]))
+        slippy_result = conv_func(loads)
+        err_msg = f'Non circular convolution did not match scipy output for loads shape: {l_s} and IM shape: {im_s}'
+        npt.assert_allclose(slippy_result, scipy_result, err_msg=err_msg)
+        # flat inputs should give flat outputs
+        npt.assert_allclose(conv_func(loads.flatten()), scipy_result.flatten(), err_msg=err_msg)
+
+
+# Test if our circular convolve gives a maximum in the right place
+def test_circ_convolve_location():
+    for l_s in shapes_circ:
+        im = e_im('zz', l_s, (0.01, 0.01), 200e9, 0.3)
+        loads = np.zeros(l_s)
+        loads[64, 64] = 1000
+        conv_func = _bind_domain(_plan_scipy_convolve(loads, im, [True, True]))
+        slippy_result = conv_func(loads)
+        assert np.argmax(loads) == np.argmax(slippy_result), f'Circular convolution failed for shape: {l_s}'
+
+
+def test_domain_convolve():
+    im = e_im('zz', (128, 128), (0.01, 0.01), 200e9, 0.3)
+    loads = 1000 * np.random.rand(128, 128)
+    domain = np.random.rand(128, 128) > 0.5
+    loads[np.logical_not(domain)] = 0
+    scipy_result = fftconvolve(loads, im, mode='same')
+    conv_func = _bind_domain(_plan_scipy_convolve(loads, im, [False, False]), domain)
+    # call twice to make sure the buffers are reused properly
+    npt.assert_allclose(conv_func(loads[domain]), scipy_result[domain])
+    npt.assert_allclose(conv_func(loads[domain]), scipy_result[domain])
+    npt.assert_allclose(conv_func(loads[domain], ignore_domain=True), scipy_result)
+
+
+# Test that the fft cannot be planned to be circular and different shape inputs
+def test_raises_unequal_shapes_circ():
+    im = e_im('zz', (128, 128), (0.01, 0.01), 200e9, 0.3)
+    for l_s, circ in zip([(128, 129), (129, 128)], [(False, True), (True, False)]):
+        with npt.assert_raises(AssertionError):
+            _ = _plan_scipy_convolve(np.zeros(l_s), im, circ)
+
+
+def test_plan_cache_reused_across_domains():
+    c.clear_plan_cache()
+    im = e_im('zz', (64, 64), (0.01, 0.01), 200e9, 0.3)
+    loads = 1000 * np.random.rand(64, 64)
+    domain_1 = np.random.rand(64, 64) > 0.5
+    domain_2 = np.logical_not(domain_1)
+    conv_1 = c.plan_convolve(loads, im, domain_1)
+    conv_2 = c.plan_convolve(loads, im, domain_2)
+    assert len(_plan_cache) == 1
+    expected_1 = fftconvolve(loads * domain_1, im, mode='same')
+    expected_2 = fftconvolve(loads * domain_2, im, mode='same')
+    # alternate between the domains, each function shares the plan but must only see its own loads
+    npt.assert_allclose(conv_1(loads[domain_1]), expected_1[domain_1])
+    npt.assert_allclose(conv_2(loads[domain_2]), expected_2[domain_2])
+    npt.assert_allclose(conv_1(loads[domain_1]), expected_1[domain_1])
+    full_1 = conv_1(loads[domain_1], ignore_domain=True).copy()
+    full_2 = conv_2(loads[domain_2], ignore_domain=True).copy()
+    npt.assert_allclose(full_1 + full_2, fftconvolve(loads, im, mode='same'))
+
+
+def test_even_kernels_real_spectrum():
+    # even components should be found to be even for odd and even spans, the convolution must still be correct
+    for span, l_s in [((128, 128), (64, 64)), ((127, 129), (64, 65))]:
+        loads = 1000 * np.random.rand(*l_s)
+        for comp, expected in [('zz', True), ('xx', True), ('zx', False)]:
+            im = e_im(comp, span, (0.01, 0.01), 200e9, 0.3)
+            input_shape = tuple(2 * s for s in span)
+            _, even = _padded_kernel(im, input_shape, l_s, [False, False])
+            assert even == expected, f'Evenness of {comp} component with span {span} not detected'
+            full = fftconvolve(loads, im, mode='full')
+            start = [(s - 1) // 2 for s in span]
+            scipy_result = full[start[0]:start[0] + l_s[0], start[1]:start[1] + l_s[1]]
+            conv_func = _bind_domain(_plan_scipy_convolve(loads, im, [False, False]))
+            npt.assert_allclose(conv_func(loads), scipy_result, rtol=1e-10)
+
+
+def test_multi_convolve_vs_scipy():
+    components = {comp: e_im(comp, (127, 129), (0.01, 0.01), 200e9, 0.3) for comp in ['xx', 'xz', 'zx', 'zz', 'yz']}
+    loads = c.Loads(x=1000 * np.random.rand(64, 65), z=1000 * np.random.rand(64, 65))
+    conv_func = c.plan_multi_convolve(loads.z, components)
+    # the second call uses the same buffers
+    for _ in range(2):
+        displacements = conv_func(loads)
+        for disp_dir in 'xyz':
+            expected = np.zeros((64, 65))
+            for load_dir in 'xz':
+                if disp_dir + load_dir in components:
+                    full = fftconvolve(loads.__getattribute__(load_dir), components[disp_dir + load_dir])
+                    expected += full[63:63 + 64, 64:64 + 65]
+            npt.assert_allclose(displacements.__getattribute__(disp_dir), expected, atol=1e-12 * np.max(expected))
+
+
+def test_plan_cache_bounded_by_bytes():
+    c.clear_plan_cache()
+    old_limit = imu.PLAN_CACHE_BYTES
+    loads = np.zeros((64, 64))
+    ims = [e_im('zz', (64, 64), (0.01, 0.01), shear_mod, 0.3) for shear_mod in (200e9, 100e9, 50e9)]
+    try:
+        c.plan_convolve(loads, ims[0])
+        nbytes = next(iter(_plan_cache.values()))[2]
+        imu.PLAN_CACHE_BYTES = 2 * nbytes
+        for im in ims[1:]:
+            c.plan_convolve(loads, im)
+        assert len(_plan_cache) == 2
+        # the newest plan is always kept
+        imu.PLAN_CACHE_BYTES = 0
+        c.plan_convolve(loads, ims[0])
+        assert len(_plan_cache) == 1
+    finally:
+        imu.PLAN_CACHE_BYTES = old_limit
+        c.clear_plan_cache()
+
+
+def test_combined_influence_matrix_reuses_plan():
+    c.clear_plan_cache()
+    steel = c.Elastic('steel', {'E': 200e9, 'v': 0.3})
+    aluminium = c.Elastic('aluminium', {'E': 70e9, 'v': 0.33})
+    total = combined_influence_matrix(steel, aluminium, (64, 64), (0.01, 0.01))
+    npt.assert_allclose(total, steel.influence_matrix((64, 64), (0.01, 0.01), ['zz'])['zz'] +
+                        aluminium.influence_matrix((64, 64), (0.01, 0.01), ['zz'])['zz'])
+    assert combined_influence_matrix(steel, aluminium, (64, 64), (0.01, 0.01)) is total
+    loads = np.zeros((32, 32))
+    c.plan_convolve(loads, combined_influence_matrix(steel, aluminium, (64, 64), (0.01, 0.01)))
+    c.plan_convolve(loads, combined_influence_matrix(steel, aluminium, (64, 64), (0.01, 0.01)))
+    assert len(_plan_cache) == 1
+    c.clear_plan_cache()
@@ -1,6 +1,6 @@
 import numpy as np
 import numpy.testing as npt
-from slippy.contact._lubrication_utils import tdma, cyclic_tdma
+from slippy.contact._lubrication_utils import tdma, cyclic_tdma, _tdma_inplace, _cyclic_tdma_inplace
 
 
 def test_cyclic_matches_base():
@@ -32,3 +32,26 @@ def test_cyclic_inversion():
     c = np.array([*np.diag(matrix, 1), matrix[3, 0]])
     x_cyclic = cyclic_tdma(a, b, c, result)
     npt.assert_allclose(x_cyclic, np.arange(1, 5))
+
+
+def test_compiled_tdma_matches_lapack():
+    # the diagonals are not dominant so rows are interchanged
+    np.random.seed(0)
+    for size in [2, 3, 10, 101]:
+        a, c = np.random.randn(size - 1), np.random.randn(size - 1)
+        b, d = np.random.randn(size), np.random.randn(size)
+        expected = tdma(a, b, c, d)
+        x = d.copy()
+        _tdma_inplace(a.copy(), b.copy(), c.copy(), x)
+        npt.assert_allclose(x, expected)
+
+
+def test_compiled_cyclic_tdma_matches_base():
+    np.random.seed(0)
+    for size in [3, 10, 101]:
+        a, b, c, d = (np.random.rand(size) for _ in range(4))
+        b += 2
+        expected = cyclic_tdma(a, b, c, d)
+        x = d.copy()
+        _cyclic_tdma_inplace(a.copy(), b.copy(), c.copy(), x, *(np.zeros(n) for n in [size - 1, size, size - 1, size]))
+        npt.assert_allclose(x, expected)
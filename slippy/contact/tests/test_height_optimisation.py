@@ -0,0 +1,90 @@
+import numpy as np
+import numpy.testing as npt
+
+import slippy
+import slippy.contact as c
+import slippy.surface as s
+from slippy.contact._model_utils import get_gap_from_model
+from slippy.contact._step_utils import HeightOptimisationFunction, _HeightCache
+
+
+def make_height_optimisation_function(max_load=np.inf):
+    flat_surface = s.FlatSurface(shift=(0, 0))
+    round_surface = s.RoundSurface((1, 1, 1), extent=(0.006, 0.006), shape=(64, 64), generate=True)
+    flat_surface.material = c.Elastic('Aluminum', {'E': 70e9, 'v': 0.33}, max_load=max_load)
+    round_surface.material = c.Elastic('Steel', {'E': 200e9, 'v': 0.3})
+    model = c.ContactModel('model-1', round_surface, flat_surface)
+    just_touching_gap = get_gap_from_model(model)[0]
+    return HeightOptimisationFunction(just_touching_gap, model, 0.0, None, 1000, 1e-6, None, 100.0, 1e-3)
+
+
+def test_warm_start_from_cache():
+    with slippy.OverRideCuda():
+        opt_func = make_height_optimisation_function()
+        npt.assert_array_equal(opt_func.get_loads_from_cache(1e-6), opt_func.cache_surface_loads[0])
+        opt_func(1e-6, dict())
+        opt_func(2e-6, dict())
+        loads_1, loads_2 = opt_func.cache_surface_loads[-2:]
+        npt.assert_allclose(opt_func.get_loads_from_cache(1.25e-6), 0.75 * loads_1 + 0.25 * loads_2)
+        npt.assert_array_equal(opt_func.get_loads_from_cache(3e-6), loads_2)
+
+        # a warm started solve should agree with a cold one and need fewer iterations
+        iterations = opt_func.inner_iterations
+        opt_func(1.5e-6, dict())
+        warm_iterations = opt_func.inner_iterations - iterations
+        warm_loads = opt_func.results['loads'].z
+
+        cold_func = make_height_optimisation_function()
+        cold_func(1.5e-6, dict())
+        npt.assert_allclose(warm_loads, cold_func.results['loads'].z, atol=1e-3 * np.max(warm_loads))
+        assert warm_iterations < cold_func.inner_iterations
+
+
+def test_bounded_cache():
+    with slippy.OverRideCuda():
+        opt_func = make_height_optimisation_function()
+        opt_func._cache = _HeightCache(opt_func.shape, capacity=4, dtype=np.float32)
+        opt_func._cache.add(0.0, 0.0, np.zeros(opt_func.shape), pinned=True)
+        for height in [1e-6, 2e-6, 3e-6, 4e-6]:
+            opt_func(height, dict())
+        # the oldest unpinned entry is removed when the cache is full
+        npt.assert_array_equal(opt_func.cache_heights, [0.0, 2e-6, 3e-6, 4e-6])
+        assert all(loads.dtype == np.float32 for loads in opt_func.cache_surface_loads)
+        # heights are matched to a relative tolerance, cached results are returned without solving
+        iterations = opt_func.inner_iterations
+        npt.assert_approx_equal(opt_func(3e-6 * (1 + 1e-14), dict()), opt_func.cache_total_load[2] - 100.0)
+        assert opt_func.inner_iterations == iterations
+        opt_func.clear_cache()
+        npt.assert_array_equal(opt_func.cache_heights, [0.0])
+
+
+def test_warm_start_skips_saturated_entry():
+    with slippy.OverRideCuda():
+        opt_func = make_height_optimisation_function(max_load=1e8)
+        # the bounding entry at the maximum load has every node at the maximum pressure
+        saturated_height = opt_func.cache_heights[-1]
+        assert np.all(opt_func.cache_surface_loads[-1] == 1e8)
+        npt.assert_array_equal(opt_func.get_loads_from_cache(2 * saturated_height), 0)
+        opt_func(1e-6, dict())
+        guess = opt_func.get_loads_from_cache(0.5 * (1e-6 + saturated_height))
+        npt.assert_array_equal(guess, opt_func.cache_surface_loads[1])
+        assert np.max(guess) < 1e8
+
+        # a height above the last solved one is warm started from it, not from the saturated field
+        for height in [2e-6, 4e-6]:
+            opt_func(height, dict())
+            assert not opt_func.last_call_failed
+            assert np.isfinite(opt_func.results['total_normal_load'])
+            assert np.any(opt_func.results['loads'].z < 1e8)
+        assert np.all(np.isfinite(opt_func.cache_total_load))
+        npt.assert_array_equal(opt_func.cache_heights[:-1], [0.0, 1e-6, 2e-6, 4e-6])
+
+
+def test_evaluations_are_silent(capsys):
+    with slippy.OverRideCuda():
+        opt_func = make_height_optimisation_function()
+        opt_func(1e-6, dict())
+        opt_func(1e-6, dict())
+    assert capsys.readouterr().out == ''
+    summary = opt_func.summary()
+    assert summary.startswith('Solved: interference: 1e-06') and 'Evaluations: 1' in summary
@@ -0,0 +1,72 @@
+import os
+
+import numpy as np
+import numpy.testing as npt
+from scipy.signal import fftconvolve
+
+import slippy
+import slippy.contact as c
+from slippy.contact._im_cache import clear_im_disk_cache
+from slippy.contact.materials import _combined_ims, combined_influence_matrix
+
+
+def test_im_disk_cache(tmp_path):
+    old_settings = slippy.IM_DISK_CACHE, slippy.IM_CACHE_DIR
+    slippy.IM_DISK_CACHE, slippy.IM_CACHE_DIR = True, str(tmp_path)
+    try:
+        c.elastic_influence_matrix.cache.clear()
+        c.clear_plan_cache()
+        im = c.elastic_influence_matrix('zz', (64, 64), (0.01, 0.01), 80e9, 0.3)
+        assert isinstance(im, np.memmap)
+        assert len(os.listdir(tmp_path)) == 1
+        # a new process would only find the disk cache
+        c.elastic_influence_matrix.cache.clear()
+        im_2 = c.elastic_influence_matrix('zz', (64, 64), (0.01, 0.01), 80e9, 0.3)
+        npt.assert_array_equal(im, im_2)
+        assert len(os.listdir(tmp_path)) == 1
+        with slippy.OverRideCuda():
+            loads = np.random.rand(32, 32)
+            result = c.plan_convolve(loads, im_2)(loads)
+            npt.assert_allclose(result, fftconvolve(loads, im_2, mode='same'))
+            # the spectrum is stored next to the influence matrix and reused by the next plan
+            assert len(os.listdir(tmp_path)) == 2
+            c.clear_plan_cache()
+            npt.assert_allclose(c.plan_convolve(loads, im_2)(loads), result)
+        clear_im_disk_cache()
+        assert len(os.listdir(tmp_path)) == 0
+    finally:
+        slippy.IM_DISK_CACHE, slippy.IM_CACHE_DIR = old_settings
+        c.elastic_influence_matrix.cache.clear()
+        c.clear_plan_cache()
+
+
+def test_combined_im_spectrum_cached(tmp_path):
+    old_settings = slippy.IM_DISK_CACHE, slippy.IM_CACHE_DIR
+    slippy.IM_DISK_CACHE, slippy.IM_CACHE_DIR = True, str(tmp_path)
+    steel = c.Elastic('steel', {'E': 200e9, 'v': 0.3})
+    aluminium = c.Elastic('aluminium', {'E': 70e9, 'v': 0.33})
+    try:
+        c.elastic_influence_matrix.cache.clear()
+        c.clear_plan_cache()
+        total = combined_influence_matrix(steel, aluminium, (64, 64), (0.01, 0.01))
+        assert isinstance(total, np.memmap)
+        with slippy.OverRideCuda():
+            loads = np.random.rand(32, 32)
+            result = c.plan_convolve(loads, total)(loads).copy()
+            spectra = [f for f in os.listdir(tmp_path) if f.startswith('combined_') and '_rfft_' in f]
+            assert len(spectra) == 1
+            modified = os.path.getmtime(tmp_path / spectra[0])
+            # a new process would only find the disk cache
+            c.elastic_influence_matrix.cache.clear()
+            c.clear_plan_cache()
+            _combined_ims.clear()
+            total_2 = combined_influence_matrix(steel, aluminium, (64, 64), (0.01, 0.01))
+            assert total_2 is not total
+            npt.assert_allclose(c.plan_convolve(loads, total_2)(loads), result)
+        assert [f for f in os.listdir(tmp_path) if f.startswith('combined_') and '_rfft_' in f] == spectra
+        assert os.path.getmtime(tmp_path / spectra[0]) == modified
+    finally:
+        slippy.IM_DISK_CACHE, slippy.IM_CACHE_DIR = old_settings
+        c.elastic_influence_matrix.cache.clear()
+        c.clear_plan_cache()
+        _combined_ims.clear()
@@ -2,6 +2,7 @@ import numpy as np
 import numpy.testing as npt
 
 import slippy.contact as contact
+from slippy.contact import _material_utils
 
 """
 If you add a material you need to add the properties that it will be tested with to the material_parameters dict,
@@ -56,3 +57,77 @@ def test_materials_basic():
                                                                                          **mat_params[2])
 
             npt.assert_allclose(loads, loads_calc.__getattribute__(direction), atol=max_load * 0.01)
+
+
+def test_elastic_influence_matrix_reference():
+    # direct evaluation of the zz and xz components at each node, for odd and even spans
+    hx, hy, shear_mod, v = 0.01, 0.02, 80e9, 0.3
+    for span in [(6, 7), (7, 6)]:
+        zz = contact.elastic_influence_matrix('zz', span, (hx, hy), shear_mod, v)
+        xz = contact.elastic_influence_matrix('xz', span, (hx, hy), shear_mod, v)
+        for jj in range(span[0]):
+            for ii in range(span[1]):
+                i = ii - span[1] // 2 + (1 - span[1] % 2)
+                j = jj - span[0] // 2 + (1 - span[0] % 2)
+                k, el, m, n = i + 0.5, i - 0.5, j + 0.5, j - 0.5
+                c_zz = (hx * (k * np.log((m + np.hypot(k, m)) / (n + np.hypot(k, n))) +
+                              el * np.log((n + np.hypot(el, n)) / (m + np.hypot(el, m)))) +
+                        hy * (m * np.log((k + np.hypot(k, m)) / (el + np.hypot(el, m))) +
+                              n * np.log((el + np.hypot(el, n)) / (k + np.hypot(k, n)))))
+                c_xz = (hy / 2 * (m * np.log((k ** 2 + m ** 2) / (el ** 2 + m ** 2)) +
+                                  n * np.log((el ** 2 + n ** 2) / (k ** 2 + n ** 2))) +
+                        hx * (k * (np.arctan(m / k) - np.arctan(n / k)) +
+                              el * (np.arctan(n / el) - np.arctan(m / el))))
+                npt.assert_allclose(zz[jj, ii], (1 - v) / (2 * np.pi * shear_mod) * c_zz, rtol=1e-12)
+                npt.assert_allclose(xz[jj, ii], (2 * v - 1) / (4 * np.pi * shear_mod) * c_xz, rtol=1e-12,
+                                    atol=1e-12 * np.max(np.abs(xz)))
+
+
+def test_elastic_influence_matrix_memoized():
+    first = contact.elastic_influence_matrix('zz', [16, 16], [0.01, 0.01], 80e9, 0.3)
+    second = contact.elastic_influence_matrix('zz', (16, 16), (0.01, 0.01), 80e9, 0.3)
+    assert first is second
+    other = contact.elastic_influence_matrix('zz', (16, 16), (0.01, 0.01), 80e9, 0.3, 30e9, 0.33)
+    assert other is not first
+    npt.assert_array_less(first, other)
+    with npt.assert_raises(ValueError):
+        contact.elastic_influence_matrix('zz', (16, 16), (0.01, 0.01), 80e9, 0.3, shear_mod_2=30e9)
+
+
+def test_memoized_cache_bytes():
+    # the least recently used results are dropped when the cache holds more than COMPONENT_CACHE_BYTES
+    old_limit = _material_utils.COMPONENT_CACHE_BYTES
+    contact.elastic_influence_matrix.cache.clear()
+    try:
+        first = contact.elastic_influence_matrix('zz', (16, 16), (0.01, 0.01), 80e9, 0.3)
+        _material_utils.COMPONENT_CACHE_BYTES = 2 * first.nbytes
+        contact.elastic_influence_matrix('zz', (16, 16), (0.01, 0.01), 90e9, 0.3)
+        assert contact.elastic_influence_matrix('zz', (16, 16), (0.01, 0.01), 80e9, 0.3) is first
+        contact.elastic_influence_matrix('zz', (16, 16), (0.01, 0.01), 100e9, 0.3)
+        assert len(contact.elastic_influence_matrix.cache) == 2
+        assert contact.elastic_influence_matrix('zz', (16, 16), (0.01, 0.01), 80e9, 0.3) is first
+        # the newest result is kept even if it is larger than the limit
+        _material_utils.COMPONENT_CACHE_BYTES = 0
+        contact.elastic_influence_matrix('zz', (16, 16), (0.01, 0.01), 110e9, 0.3)
+        assert len(contact.elastic_influence_matrix.cache) == 1
+    finally:
+        _material_utils.COMPONENT_CACHE_BYTES = old_limit
+        contact.elastic_influence_matrix.cache.clear()
+
+
+def test_elastic_loads_from_displacement_sub_domains():
+    # different free points in each direction, the set displacements should be met at all other points
+    steel = contact.Elastic('steel', {'E': 200e9, 'v': 0.3})
+    x, y = np.meshgrid(*[np.linspace(-1, 1, 32)] * 2)
+    disp_z = 1e-6 * (1 - x ** 2 - y ** 2)
+    disp_z[x ** 2 + y ** 2 > 0.6] = np.nan
+    disp_x = 1e-7 * x
+    disp_x[np.abs(x) > 0.5] = np.nan
+    set_displacement = contact.Displacements(x=disp_x, z=disp_z)
+    loads, (displacement,) = steel.loads_from_surface_displacement(set_displacement, grid_spacing=1e-4,
+                                                                   tol=1e-15, max_it=500)
+    for direction in 'xz':
+        set_disp = set_displacement.__getattribute__(direction)
+        domain = np.logical_not(np.isnan(set_disp))
+        npt.assert_allclose(displacement.__getattribute__(direction)[domain], set_disp[domain], rtol=1e-6,
+                            atol=1e-6 * np.nanmax(np.abs(set_disp)))
@@ -72,3 +72,44 @@ def test_example_mixed_lubrication():
     npt.assert_array_almost_equal(np.sum(state['pressure'])*ball.grid_spacing**2/load, 1.0, decimal=3)
 
     assert state['converged']
+
+
+def test_incremental_deformation():
+    """the incremental deformation update converges to the full solution, the surface displacements add to the total"""
+    radius, load, rolling_speed, e, v = 0.01905, 800, 4, 200e9, 0.3
+    rtol_pressure = 1e-4
+    hertz_result = c.solve_hertz_point(r_rel=radius / 2, e1=e, e2=e, v1=v, v2=v, load=load)
+    hertz_a, hertz_pressure = hertz_result.contact_radius, hertz_result.max_pressure
+
+    states = []
+    for incremental in (False, True):
+        ball = s.RoundSurface((radius,) * 3, shape=(65, 65), extent=(hertz_a * 4, hertz_a * 4), generate=True)
+        flat = s.FlatSurface()
+        ball.material = c.Elastic('steel', {'E': e, 'v': v})
+        flat.material = c.Elastic('steel', {'E': e, 'v': v})
+        oil = c.Lubricant('oil')
+        oil.add_sub_model('nd_viscosity', c.lubricant_models.nd_roelands(0.096, 1 / 5.1e-9, hertz_pressure, 0.68))
+        oil.add_sub_model('nd_density', c.lubricant_models.nd_dowson_higginson(hertz_pressure))
+        model = c.ContactModel('lubrication_test', ball, flat, oil)
+        reynolds = c.MultigridReynoldsSolver(time_step=0, grid_spacing=ball.grid_spacing,
+                                             hertzian_pressure=hertz_pressure, radius_in_rolling_direction=radius,
+                                             hertzian_half_width=hertz_a, dimentional_viscosity=0.096,
+                                             dimentional_density=872)
+        x, y = ball.get_points_from_extent()
+        x, y = x - np.mean(x), y - np.mean(y)
+        pressure = hertz_pressure * np.sqrt(np.clip(1 - (x ** 2 + y ** 2) / hertz_a ** 2, 0, None))
+        step = c.IterSemiSystem('main', reynolds, rolling_speed, 1, no_time=True, normal_load=load,
+                                initial_guess=[hertz_result.total_displacement, pressure], relaxation_factor=0.5,
+                                rtol_interference=1e-3, rtol_pressure=rtol_pressure, no_update_warning=False,
+                                incremental_deformation=incremental)
+        model.add_step(step)
+        states.append(model.solve(skip_data_check=True))
+
+    full, incremental = states
+    assert full['converged'] and incremental['converged']
+    # both stop when the change in pressure between iterations is within rtol_pressure, so they agree to within a
+    # small multiple of it
+    pressure_difference = np.sum(np.abs(incremental['pressure'] - full['pressure'])) / np.sum(full['pressure'])
+    assert pressure_difference < 10 * rtol_pressure
+    npt.assert_allclose(incremental['surface_1_displacement'].z + incremental['surface_2_displacement'].z,
+                        incremental['total_displacement'].z)
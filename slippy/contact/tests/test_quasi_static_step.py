@@ -0,0 +1,38 @@
+import numpy as np
+import numpy.testing as npt
+
+import slippy
+import slippy.contact as c
+import slippy.surface as s
+from slippy.contact.quasi_static_step import _shift
+
+
+def test_shift():
+    array = np.arange(16.0).reshape(4, 4)
+    npt.assert_array_equal(_shift(array, (1, -1), True), np.roll(array, (1, -1), axis=(0, 1)))
+    shifted = _shift(array, (1, -1), False)
+    npt.assert_array_equal(shifted[1:, :-1], array[:-1, 1:])
+    assert not np.any(shifted[0]) and not np.any(shifted[:, -1])
+
+
+def solve_sliding(number_of_steps, off_set_x):
+    np.random.seed(1)
+    profile = np.cumsum(np.cumsum(np.random.randn(64, 64), axis=0), axis=1) * 2e-9
+    rough_surface = s.Surface(profile=profile, grid_spacing=2e-5)
+    ball = s.RoundSurface((0.01, 0.01, 0.01))
+    rough_surface.material = c.Elastic('Aluminum', {'E': 70e9, 'v': 0.33})
+    ball.material = c.Elastic('Steel', {'E': 200e9, 'v': 0.3})
+    model = c.ContactModel('model-1', rough_surface, ball)
+    step = c.QuasiStaticStep('slide', number_of_steps, off_set_x=off_set_x, off_set_y=0.00064, normal_load=2.0,
+                             rtol_interference=1e-6, rtol_displacement=1e-8, no_update_warning=False)
+    model.add_step(step)
+    return model.solve(skip_data_check=True)
+
+
+def test_carried_forward_increments():
+    # increments started from the previous increment should give the same answer as a fresh solution
+    with slippy.OverRideCuda():
+        sliding = solve_sliding(5, [0.0006, 0.0007])
+        fresh = solve_sliding(1, 0.0007)
+    npt.assert_approx_equal(sliding['interference'], fresh['interference'], 4)
+    npt.assert_allclose(sliding['loads'].z, fresh['loads'].z, atol=1e-3 * np.max(fresh['loads'].z))
@@ -0,0 +1,55 @@
+import json
+
+import numpy as np
+import numpy.testing as npt
+
+import slippy
+import slippy.contact as c
+import slippy.surface as s
+from slippy.contact import telemetry as telemetry_module
+
+
+def solve_ball_on_flat(**step_options):
+    flat = s.FlatSurface(shift=(0, 0))
+    ball = s.RoundSurface((1, 1, 1), extent=(0.006, 0.006), shape=(256, 256), generate=True)
+    flat.material = c.Elastic('Steel', {'E': 200e9, 'v': 0.3})
+    ball.material = c.Elastic('Steel', {'E': 200e9, 'v': 0.3})
+    model = c.ContactModel('model-1', ball, flat)
+    model.add_step(c.StaticStep('contact', normal_load=100, load_control='polonsky_keer', **step_options))
+    return model.solve(skip_data_check=True)
+
+
+def test_zoom():
+    # solving only around the contact should give the same answer as solving the full grid
+    with slippy.OverRideCuda():
+        full = solve_ball_on_flat()
+        zoomed = solve_ball_on_flat(zoom=4)
+    start_y, stop_y, start_x, stop_x = zoomed['zoom_region']
+    assert (stop_y - start_y) * (stop_x - start_x) < full['loads'].z.size / 2
+    assert not np.any(full['loads'].z[:start_y]) and not np.any(full['loads'].z[:, stop_x:])
+    npt.assert_approx_equal(zoomed['interference'], full['interference'], 3)
+    # the results are on the full grid whether or not zoom is used
+    for key in ('loads', 'total_displacement', 'surface_1_displacement', 'surface_2_displacement'):
+        assert zoomed[key].z.shape == full[key].z.shape
+    assert zoomed['gap'].shape == zoomed['contact_nodes'].shape == full['gap'].shape
+    npt.assert_array_equal(zoomed['surface_1_points'][0], full['surface_1_points'][0])
+    npt.assert_allclose(zoomed['loads'].z, full['loads'].z, atol=1e-2 * np.max(full['loads'].z))
+    npt.assert_allclose(zoomed['total_displacement'].z, full['total_displacement'].z,
+                        atol=1e-2 * np.max(full['total_displacement'].z))
+
+
+def test_telemetry(tmp_path):
+    file_name = str(tmp_path / 'telemetry.jsonl')
+    with slippy.OverRideCuda(), c.Telemetry(file_name, level=2) as telemetry:
+        solve_ball_on_flat()
+    events = [r['event'] for r in telemetry.records]
+    assert events.count('step') == 2
+    assert events.count('polonsky_keer') == 1
+    pk = telemetry.records[events.index('polonsky_keer')]
+    assert pk['step'] == 'contact'
+    assert telemetry.counters['polonsky_keer_iterations'] == pk['iterations']
+    assert telemetry.counters['convolutions'] > 2 * pk['iterations']
+    assert 'polonsky_keer_iteration' not in events
+    with open(file_name) as file:
+        assert [json.loads(line) for line in file] == telemetry.records
+    assert telemetry_module.LEVEL == 0
@@ -0,0 +1,44 @@
+import os
+
+import numpy.testing as npt
+
+import slippy
+import slippy.contact as c
+import slippy.surface as s
+
+
+def make_model(load, youngs_modulus=200e9, fail=False):
+    if fail:
+        raise ValueError('Failed to make model')
+    flat_surface = s.FlatSurface(shift=(0, 0))
+    round_surface = s.RoundSurface((1, 1, 1), extent=(0.006, 0.006), shape=(64, 64), generate=True)
+    flat_surface.material = c.Elastic('Flat', {'E': youngs_modulus, 'v': 0.3})
+    round_surface.material = c.Elastic('Steel', {'E': 200e9, 'v': 0.3})
+    model = c.ContactModel('sweep_model', round_surface, flat_surface)
+    model.add_step(c.StaticStep('contact', normal_load=load, load_control='polonsky_keer'))
+    return model
+
+
+def test_run_sweep(tmp_path):
+    parameters = [{'load': 10.0}, {'load': 20.0, 'youngs_modulus': 70e9}, {'load': 10.0, 'fail': True}]
+    output_dir = slippy.OUTPUT_DIR
+    with slippy.OverRideCuda():
+        rows = c.run_sweep(make_model, parameters, output_dir=str(tmp_path), max_workers=2)
+    assert slippy.OUTPUT_DIR == output_dir
+    assert [row['run'] for row in rows] == [0, 1, 2]
+    for row, params in zip(rows[:2], parameters):
+        assert not row['error']
+        npt.assert_approx_equal(row['total_normal_load'], params['load'], 4)
+        assert os.path.exists(os.path.join(row['output_dir'], 'sweep_model.log'))
+    # a failed run is recorded without stopping the sweep
+    assert 'Failed to make model' in rows[2]['error']
+    assert os.path.exists(tmp_path / 'sweep_summary.csv')
+    # the workers shared the influence matrices and the spectra of the combined matrices through the disk cache
+    cache = tmp_path / 'im_cache'
+    entries = {name: os.path.getmtime(cache / name) for name in os.listdir(cache)}
+    assert any(name.startswith('combined_') and '_rfft_' in name for name in entries)
+    # new workers load every entry rather than finding and writing it again
+    with slippy.OverRideCuda():
+        rows = c.run_sweep(make_model, parameters[:2], output_dir=str(tmp_path), max_workers=2)
+    assert not any(row['error'] for row in rows)
+    assert {name: os.path.getmtime(cache / name) for name in os.listdir(cache)} == entries
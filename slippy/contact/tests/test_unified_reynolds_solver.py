@@ -0,0 +1,98 @@
+import numba
+import numpy as np
+import numpy.testing as npt
+
+import slippy.contact as c
+from slippy.contact.multigrid_reynolds_solver import _Level
+
+
+def make_solver_and_state(periodic: bool, size: int = 32):
+    reynolds = c.UnifiedReynoldsSolver(time_step=0, grid_spacing=1e-5, hertzian_pressure=1e9,
+                                       radius_in_rolling_direction=0.01, hertzian_half_width=2e-4,
+                                       dimentional_viscosity=0.1, dimentional_density=870, periodic=periodic)
+    reynolds.rolling_speed = 1
+    np.random.seed(0)
+    x = np.linspace(0, 2 * np.pi, size, endpoint=False)
+    nd_gap = 1 + 0.5 * np.sin(x)[:, np.newaxis] * np.cos(x)[np.newaxis, :] + 0.01 * np.random.rand(size, size)
+    state = {'nd_gap': nd_gap, 'nd_pressure': 0.5 + 0.1 * np.random.rand(size, size),
+             'nd_density': np.ones((size, size)), 'nd_viscosity': np.ones((size, size))}
+    return reynolds, state
+
+
+def test_periodic_sweep():
+    reynolds, state = make_solver_and_state(True)
+    pressure = reynolds.solve(dict(state), np.inf)['nd_pressure']
+    # the edges are not pinned to 0
+    assert np.all(pressure[0] > 0) and np.all(pressure[:, 0] > 0)
+    # the solution moves with the problem in the line direction
+    shift = 5
+    reynolds, _ = make_solver_and_state(True)
+    shifted_state = {key: np.roll(value, shift, axis=0) for key, value in state.items()}
+    shifted_pressure = reynolds.solve(shifted_state, np.inf)['nd_pressure']
+    npt.assert_allclose(shifted_pressure, np.roll(pressure, shift, axis=0))
+    # non periodic solutions have fixed edges
+    reynolds, state = make_solver_and_state(False)
+    pressure = reynolds.solve(dict(state), np.inf)['nd_pressure']
+    npt.assert_array_equal(pressure[0], state['nd_pressure'][0])
+
+
+def test_multigrid_converges_frozen_equations():
+    for periodic, size in ((False, 33), (True, 32)):
+        reynolds, state = make_solver_and_state(periodic, size)
+        multigrid = c.MultigridReynoldsSolver(time_step=0, grid_spacing=1e-5, hertzian_pressure=1e9,
+                                              radius_in_rolling_direction=0.01, hertzian_half_width=2e-4,
+                                              dimentional_viscosity=0.1, dimentional_density=870, periodic=periodic,
+                                              min_size=5, cycles=5)
+        multigrid.rolling_speed = 1
+
+        def residual(pressure):
+            _, _, epsilon, r, source = reynolds._line_equations(state)
+            level = _Level(epsilon, r, source, pressure.copy(), (reynolds.ak00, reynolds.ak10, reynolds.ak20),
+                           1 / reynolds.nd_grid_spacing, 0.0, reynolds._step, periodic)
+            return np.linalg.norm(level.residual(np.inf))
+
+        initial = residual(state['nd_pressure'])
+        swept = residual(reynolds.solve(dict(state), np.inf)['nd_pressure'])
+        solved = residual(multigrid.solve(dict(state), np.inf)['nd_pressure'])
+        assert solved < 1e-4 * initial
+        assert solved < 1e-3 * swept
+
+
+def test_zebra_sweep_same_solution():
+    for periodic, size in ((False, 17), (True, 16), (True, 17)):
+        solutions = []
+        for zebra in (False, True):
+            reynolds, state = make_solver_and_state(periodic, size)
+            reynolds.zebra = zebra
+            for _ in range(3000):
+                state['nd_pressure'] = reynolds.solve(dict(state), np.inf)['nd_pressure']
+            solutions.append(state['nd_pressure'])
+        difference = solutions[1] - solutions[0]
+        if periodic:
+            # with no fixed pressures and no cavitation the solution is only found to within a constant
+            difference -= np.mean(difference)
+        npt.assert_allclose(difference, 0, atol=1e-9)
+
+
+def test_residual_free_boundary_wraps():
+    # on periodic lines the first node is next to the cavitated last node, so it is taken as converged
+    reynolds, state = make_solver_and_state(True, 16)
+    _, _, epsilon, r, source = reynolds._line_equations(state)
+    pressure = state['nd_pressure'].copy()
+    pressure[-1] = 0
+    level = _Level(epsilon, r, source, pressure, (reynolds.ak00, reynolds.ak10, reynolds.ak20),
+                   1 / reynolds.nd_grid_spacing, 0.0, reynolds._step, True)
+    assert np.all(level.residual(np.inf, bounded=False)[0] != 0)
+    npt.assert_array_equal(level.residual(np.inf)[[0, -2, -1]], 0)
+
+
+def test_zebra_restores_threads():
+    reynolds, state = make_solver_and_state(True, 16)
+    reynolds.zebra = True
+    previous = numba.get_num_threads()
+    numba.set_num_threads(1)
+    try:
+        reynolds.solve(dict(state), np.inf)
+        assert numba.get_num_threads() == 1
+    finally:
+        numba.set_num_threads(previous)
@@ -1,8 +1,11 @@
+import contextlib
 import typing
-from numba import njit
+import numba
+from numba import njit, prange
 import numpy as np
-from ._lubrication_utils import tdma
+from ._lubrication_utils import _tdma_inplace, _cyclic_tdma_inplace
 
+import slippy
 from slippy.abcs import _NonDimensionalReynoldSolverABC
 
 __all__ = ['UnifiedReynoldsSolver']
@@ -35,8 +38,14 @@ class UnifiedReynoldsSolver(_NonDimensionalReynoldSolverABC):
         sweep_direction: str {'forward', 'backward'}, optional ('forward')
             The direction which the reynolds solver moves through the pressure array.
         periodic: bool, optional (False)
-            Controls if the pressure soltuion is periodic or not, if it is, the material deformation solution must also
-            be periodic for proper results, this shoudl be set by the model step. This feature is experimental.
+            Controls if the pressure soltuion is periodic or not, if it is, the solution is periodic in both directions
+            and every line is solved with the cyclic tdma, so no pressures are fixed at the edges. The material
+            deformation solution must also be periodic for proper results, this shoudl be set by the model step
+            (periodic_geometry and periodic_axes). This feature is experimental.
+        zebra: bool, optional (False)
+            If True the lines are relaxed in zebra order, all the even lines then all the odd lines, instead of in turn
+            in the sweep direction. The lines of each colour do not depend on each other so they are solved in parallel
+            on up to slippy.CORES threads. The sweep direction is not used.
 
         Attributes
         ----------
@@ -69,6 +78,11 @@ class UnifiedReynoldsSolver(_NonDimensionalReynoldSolverABC):
 
         Values for rolling speed and non dimentionalising values can be updated by the user or the step
 
+        Each call makes one line relaxation sweep, each line (column of the pressure array) is solved with the latest
+        pressures on the neighbouring lines. With the default ordering the sweep is a line Gauss-Seidel iteration and
+        runs on a single core. Zebra ordering gives the same converged solution, it takes a similar number of
+        iterations of the step and scales with the number of cores.
+
         Examples
         --------
         #TODO
@@ -81,7 +95,6 @@ class UnifiedReynoldsSolver(_NonDimensionalReynoldSolverABC):
         """
     requires = {'nd_gap', 'nd_pressure', 'nd_viscosity', 'nd_density'}
     provides = {'nd_pressure', 'previous_nd_gap', 'previous_nd_density'}
-    _row_order = None  # order the rows will be solved in, controlled by the sweep direction
 
     _hertzian_pressure: float = None
     _hertzian_half_width: float = None
@@ -90,6 +103,7 @@ class UnifiedReynoldsSolver(_NonDimensionalReynoldSolverABC):
     _rolling_speed: typing.Optional[float] = None
     _lambda_bar: typing.Optional[float] = None
     _radius: float = None
+    _zebra_work: typing.Optional[tuple] = None
 
     def __init__(self, time_step: float,
                  grid_spacing: float,
@@ -99,11 +113,13 @@ class UnifiedReynoldsSolver(_NonDimensionalReynoldSolverABC):
                  dimentional_viscosity: float,
                  dimentional_density: float,
                  sweep_direction: str = 'backward',
-                 periodic: bool = False):
+                 periodic: bool = False,
+                 zebra: bool = False):
         # these automatically calculate the non dimentional versions
         self.grid_spacing = grid_spacing
         self.time_step = time_step
         self.periodic = periodic
+        self.zebra = zebra
         # find lambda bar (all of these are properties apart from dimentional_density)
         self.radius = radius_in_rolling_direction
         self.hertzian_pressure = hertzian_pressure
@@ -212,9 +228,31 @@ class UnifiedReynoldsSolver(_NonDimensionalReynoldSolverABC):
         return previous_state
 
     def solve(self, previous_state: dict, max_pressure: float) -> dict:
+        current_state, pressure, epsilon, recip_dx_squared_rho, source = self._line_equations(previous_state)
+        width, length = pressure.shape
+
+        # solve line by line, the whole sweep is compiled
+        if self.zebra:
+            # the work arrays are kept between calls, they only change if the grid does
+            if self._zebra_work is None or self._zebra_work[0].shape != ((length + 1) // 2, width):
+                self._zebra_work = _zebra_work(pressure.shape)
+            with _sweep_threads():
+                _zebra_sweep(epsilon, pressure, recip_dx_squared_rho, source, self.ak00, self.ak10, self.ak20,
+                             1 / self.nd_grid_spacing, self._recip_dt, float(max_pressure), self.periodic,
+                             *self._zebra_work)
+        else:
+            start, stop = _row_range(length, self._step, self.periodic)
+            _sweep(epsilon, pressure, recip_dx_squared_rho, source, self.ak00, self.ak10, self.ak20,
+                   1 / self.nd_grid_spacing, self._recip_dt, start, stop, self._step, float(max_pressure),
+                   self.periodic, *_work_vectors(width))
+
+        current_state['nd_pressure'] = pressure
+
+        return current_state
+
+    def _line_equations(self, previous_state: dict):
+        """The current state, a copy of the pressure and the frozen coefficients of the line equations"""
         # rumble
-        nd_gap = previous_state['nd_gap']
-        width, length = nd_gap.shape
         pressure = previous_state['nd_pressure'].copy()
         current_state = dict()
 
@@ -228,61 +266,26 @@ class UnifiedReynoldsSolver(_NonDimensionalReynoldSolverABC):
 
         # pre calculate some values to save time
         recip_dx_squared_rho = 1 / (self.nd_grid_spacing ** 2 * previous_state['nd_density'])
-        recip_dx = 1 / self.nd_grid_spacing
-        recip_dt = 1 / self.nd_time_step if self.nd_time_step else 0.0
-
         epsilon = self._get_epsilon(previous_state)
+        source = self._source(previous_state, pressure)
+        return current_state, pressure, epsilon, recip_dx_squared_rho, source
 
-        # sort out the row order
-        if not self._row_order:
-            if self._step == 1:
-                self._row_order = [1, length - 1]
-            elif self._step == -1:
-                self._row_order = [length - 2, 0]
-            else:
-                raise ValueError("Row step must be -1 or 1")
-            if self.periodic:
-                self._row_order[0] = self._row_order[0] - self._step
-                self._row_order[1] = self._row_order[1] + self._step
-
-        ak00 = self.ak00
-        ak10 = self.ak10
-        ak20 = self.ak20
-
-        nd_density = previous_state['nd_density']
-        previous_nd_density = previous_state['previous_nd_density']
-        previous_nd_gap = previous_state['previous_nd_gap']
-
-        #  if self.periodic:
-        # a_all, c_all = np.zeros_like(epsilon[:, 0]), np.zeros_like(epsilon[:, 0])
-        # b_all, f_all = np.ones_like(epsilon[:, 0]), np.zeros_like(epsilon[:, 0])
-        # for row in range(self._row_order[0]-self._step, self._row_order[1]+self._step, self._step):
-        #     a_all, b_all, c_all, f_all = _solve_row_cyclic(epsilon, row, pressure, recip_dx_squared_rho, recip_dx,
-        #                                                    recip_dt, a_all, b_all, c_all, f_all, ak00, ak10, ak20,
-        #                                                    nd_gap, nd_density, previous_nd_density, previous_nd_gap)
-        #
-        #     p1d = cyclic_tdma(a_all, b_all, c_all, f_all)
-        #     #p1d = np.clip(raw_pressure, 0, max_pressure)
-        #
-        #     pressure[:, row] = p1d[:]
-        #
-        # solve line by line
-
-        a_all, c_all = np.zeros_like(epsilon[:-1, 0]), np.zeros_like(epsilon[:-1, 0])
-        b_all, f_all = np.ones_like(epsilon[:, 0]), np.zeros_like(epsilon[:, 0])
-
-        for row in range(self._row_order[0], self._row_order[1], self._step):
-            a_all, b_all, c_all, f_all = _solve_row(epsilon, row, pressure, recip_dx_squared_rho, recip_dx,
-                                                    recip_dt, a_all, b_all, c_all, f_all, ak00, ak10, ak20, nd_gap,
-                                                    nd_density, previous_nd_density, previous_nd_gap)
-
-            p1d = np.clip(tdma(a_all, b_all, c_all, f_all), 0, max_pressure)
-
-            pressure[1:-1, row] = p1d[1:-1]
+    @property
+    def _recip_dt(self):
+        return 1 / self.nd_time_step if self.nd_time_step else 0.0
 
-        current_state['nd_pressure'] = pressure
+    def _source(self, previous_state: dict, pressure: np.ndarray) -> np.ndarray:
+        """The wedge and squeeze terms of the line equations which do not change during a sweep
 
-        return current_state
+        The local deflection due to the current pressure (q1 and q2) is taken out of the gap, the line solves add back
+        the deflection due to the new pressure, so each line solve includes the elastic response of that line.
+        Entries at the ends of lines are not used for non periodic solutions.
+        """
+        source = np.zeros_like(pressure)
+        _fill_source(pressure, previous_state['nd_gap'], previous_state['nd_density'],
+                     previous_state['previous_nd_density'], previous_state['previous_nd_gap'], self.ak00, self.ak10,
+                     self.ak20, 1 / self.nd_grid_spacing, self._recip_dt, source)
+        return source
 
     def _get_epsilon(self, previous_state: dict) -> np.ndarray:
         nd_gap = previous_state['nd_gap']
@@ -316,87 +319,201 @@ class UnifiedReynoldsSolver(_NonDimensionalReynoldSolverABC):
         return nd_length * self.hertzian_half_width
 
 
+def _row_range(length: int, step: int, periodic: bool) -> typing.Tuple[int, int]:
+    """The start and stop of the lines solved in a sweep, the first and last lines are fixed unless periodic"""
+    if step == 1:
+        start, stop = 1, length - 1
+    elif step == -1:
+        start, stop = length - 2, 0
+    else:
+        raise ValueError("Row step must be -1 or 1")
+    if periodic:
+        start, stop = start - step, stop + step
+    return start, stop
+
+
+@contextlib.contextmanager
+def _sweep_threads():
+    """Use up to slippy.CORES threads for the parallel sweeps, the previous number of threads is restored on exit"""
+    previous = numba.get_num_threads()
+    numba.set_num_threads(max(1, min(slippy.CORES, numba.config.NUMBA_NUM_THREADS)))
+    try:
+        yield
+    finally:
+        numba.set_num_threads(previous)
+
+
+def _work_vectors(width: int):
+    """The work vectors needed by _sweep and _residual for lines of this length"""
+    return tuple(np.zeros(n) for n in [width] * 4 + [width - 1, width, width - 1, width])
+
+
+def _zebra_work(shape: tuple):
+    """The work arrays needed by _zebra_sweep for a pressure array of this shape, one row for each line of a colour"""
+    width, length = shape
+    lines = (length + 1) // 2
+    return tuple(np.zeros((lines, n)) for n in [width] * 4 + [width - 1, width, width - 1, width])
+
+
 @njit
-def _solve_row(epsilon, row, pressure, recip_dx_squared_rho, recip_dx, recip_dt, a_all, b_all, c_all, f_all,
-               ak00, ak10, ak20, nd_gap, nd_density, previous_nd_density, previous_nd_gap):
-    row_plus_1 = row + 1 if (row + 1) < len(epsilon[0, :]) else 0
-    d1 = 0.5 * (epsilon[1:-1, row] + epsilon[0:-2, row])
-    d2 = 0.5 * (epsilon[1:-1, row] + epsilon[2:, row])
-    d4 = 0.5 * (epsilon[1:-1, row] + epsilon[1:-1, row - 1])
-    d5 = 0.5 * (epsilon[1:-1, row] + epsilon[1:-1, row_plus_1])
-    d3 = d1 + d2 + d4 + d5
-
-    q1 = ak10 * pressure[0:-2, row] + ak00 * pressure[1:-1, row] + ak10 * pressure[2:, row]
-    q2 = ak00 * pressure[0:-2, row] + ak10 * pressure[1:-1, row] + ak20 * pressure[2:, row]
-
-    # Pressure flow terms
-    a_p = d1 * recip_dx_squared_rho[1:-1, row]
-    b_p = -d3 * recip_dx_squared_rho[1:-1, row]
-    c_p = d2 * recip_dx_squared_rho[1:-1, row]
-    f_p = -(d5 * pressure[1:-1, row_plus_1] + d4 * pressure[1:-1, row - 1]) * recip_dx_squared_rho[1:-1, row]
-
-    # Wedge flow terms
+def _fill_source(pressure, nd_gap, nd_density, previous_nd_density, previous_nd_gap, ak00, ak10, ak20, recip_dx,
+                 recip_dt, out):
+    """Find the wedge and squeeze terms for UnifiedReynoldsSolver._source, lines wrap round"""
+    width, length = pressure.shape
+    for row in range(length):
+        for i in range(width):
+            i_minus_1 = i - 1 if i > 0 else width - 1
+            i_plus_1 = i + 1 if (i + 1) < width else 0
+            q1 = ak10 * pressure[i_minus_1, row] + ak00 * pressure[i, row] + ak10 * pressure[i_plus_1, row]
+            q2 = ak00 * pressure[i_minus_1, row] + ak10 * pressure[i, row] + ak20 * pressure[i_plus_1, row]
+            gap = nd_gap[i, row]
+            # Wedge flow terms
+            f_w = (((gap - q1) - (nd_gap[i_minus_1, row] - q2)) * recip_dx +
+                   gap * (1 - (nd_density[i_minus_1, row] / nd_density[i, row])) * recip_dx)
+            # squeeze flow terms
+            f_s = ((gap - q1) - (previous_nd_density[i, row] / nd_density[i, row]) * previous_nd_gap[i, row]) * recip_dt
+            out[i, row] = f_w + f_s
+
+
+@njit
+def _line_system(epsilon, pressure, recip_dx_squared_rho, source, row, a_w, b_w, c_w, a_s, b_s, c_s, periodic,
+                 sub, main, sup, rhs):
+    """Fill the tri-diagonal system for one line
+
+    sub[i] and sup[i] are the coefficients of pressure[i-1] and pressure[i+1] in equation i, for non periodic lines the
+    first and last equations fix the end pressures to 0.
+    """
+    width, length = pressure.shape
+    row_plus_1 = row + 1 if (row + 1) < length else 0
+    row_minus_1 = row - 1 if row > 0 else length - 1
+    if periodic:
+        first, last = 0, width
+    else:
+        # boundary conditions (a[-1] = c[0] = f[0 and -1] = 0, b[0 and -1] = 1)
+        first, last = 1, width - 1
+        main[0] = main[width - 1] = 1.0
+        rhs[0] = rhs[width - 1] = 0.0
+        sub[0] = sup[0] = sub[width - 1] = sup[width - 1] = 0.0
+
+    for i in range(first, last):
+        i_minus_1 = i - 1 if i > 0 else width - 1
+        i_plus_1 = i + 1 if (i + 1) < width else 0
+        eps = epsilon[i, row]
+        d1 = 0.5 * (eps + epsilon[i_minus_1, row])
+        d2 = 0.5 * (eps + epsilon[i_plus_1, row])
+        d4 = 0.5 * (eps + epsilon[i, row_minus_1])
+        d5 = 0.5 * (eps + epsilon[i, row_plus_1])
+        d3 = d1 + d2 + d4 + d5
+        # Pressure flow terms
+        r = recip_dx_squared_rho[i, row]
+        sub[i] = d1 * r + a_s + a_w
+        main[i] = -d3 * r + b_s + b_w
+        sup[i] = d2 * r + c_s + c_w
+        rhs[i] = source[i, row] - (d5 * pressure[i, row_plus_1] + d4 * pressure[i, row_minus_1]) * r
+
+
+@njit
+def _sweep(epsilon, pressure, recip_dx_squared_rho, source, ak00, ak10, ak20, recip_dx, recip_dt, start, stop, step,
+           max_pressure, periodic, sub, main, sup, rhs, work_lower, work_main, work_upper, work_z):
+    """One line relaxation sweep of the pressure array, pressure is updated in place
+
+    Each line (column of the arrays) from start to stop (exclusive) is solved in turn using the latest values of the
+    neighbouring lines. Periodic lines wrap round and are solved by the cyclic tdma. The remaining arguments are work
+    vectors which are overwritten, see _work_vectors.
+    """
+    # Wedge and squeeze flow terms are the same for every node
     a_w = (ak00 - ak10) * recip_dx
     b_w = (ak10 - ak00) * recip_dx
     c_w = (ak20 - ak10) * recip_dx
-    f_w = (((nd_gap[1:-1, row] - q1) - (nd_gap[0:-2, row] - q2)) * recip_dx +
-           nd_gap[1:-1, row] * (1 - (nd_density[0:-2, row] / nd_density[1:-1, row])) * recip_dx)  # +
-    # recip_dx * (nd_gap[1:-1, row] - nd_gap[0:-2, row]))  # these two gaps were roughness in fortran code
-
-    # squeeze flow terms
     a_s = -1 * ak10 * recip_dt
     b_s = -1 * ak00 * recip_dt
     c_s = -1 * ak10 * recip_dt
-    f_s = ((nd_gap[1:-1, row] - q1) - (previous_nd_density[1: -1, row] / nd_density[1:-1, row]) *
-           previous_nd_gap[1: -1, row]) * recip_dt
 
-    # add and apply boundary conditions here (a[-1] = c[0] = f[0 and -1] = 0, b[0 and -1] = 1)
-    a_all[:-1] = a_p + a_s + a_w
-    b_all[1:-1] = b_p + b_s + b_w
-    c_all[1:] = c_p + c_s + c_w
-    f_all[1:-1] = f_p + f_s + f_w
-
-    return a_all, b_all, c_all, f_all
+    for row in range(start, stop, step):
+        _line_system(epsilon, pressure, recip_dx_squared_rho, source, row, a_w, b_w, c_w, a_s, b_s, c_s, periodic,
+                     sub, main, sup, rhs)
+        _solve_line(pressure, row, max_pressure, periodic, sub, main, sup, rhs, work_lower, work_main, work_upper,
+                    work_z)
 
 
 @njit
-def _solve_row_cyclic(epsilon, row, pressure, recip_dx_squared_rho, recip_dx, recip_dt, a_all, b_all, c_all, f_all,
-                      ak00, ak10, ak20, nd_gap, nd_density, previous_nd_density, previous_nd_gap):
-    row_plus_1 = row + 1 if (row + 1) <= len(epsilon[0, :]) else 0
-    d1 = 0.5 * (epsilon[:, row] + np.roll(epsilon[:, row], 1))
-    d2 = 0.5 * (epsilon[:, row] + np.roll(epsilon[:, row], -1))
-    d4 = 0.5 * (epsilon[:, row] + epsilon[:, row - 1])
-    d5 = 0.5 * (epsilon[:, row] + epsilon[:, row_plus_1])
-    d3 = d1 + d2 + d4 + d5
-
-    q1 = ak10 * np.roll(pressure[:, row], 1) + ak00 * pressure[:, row] + ak10 * np.roll(pressure[:, row], -1)
-    q2 = ak00 * np.roll(pressure[:, row], 1) + ak10 * pressure[:, row] + ak20 * np.roll(pressure[:, row], -1)
-
-    # Pressure flow terms
-    a_p = d1 * recip_dx_squared_rho[:, row]
-    b_p = -d3 * recip_dx_squared_rho[:, row]
-    c_p = d2 * recip_dx_squared_rho[:, row]
-    f_p = -(d5 * pressure[:, row_plus_1] + d4 * pressure[:, row - 1]) * recip_dx_squared_rho[:, row]
-
-    # Wedge flow terms
+def _solve_line(pressure, row, max_pressure, periodic, sub, main, sup, rhs, work_lower, work_main, work_upper, work_z):
+    """Solve the system filled by _line_system and write the clipped solution into the line of the pressure array"""
+    width = pressure.shape[0]
+    if periodic:
+        _cyclic_tdma_inplace(sub, main, sup, rhs, work_lower, work_main, work_upper, work_z)
+        first, last = 0, width
+    else:
+        _tdma_inplace(sub[1:], main, sup[:-1], rhs)
+        first, last = 1, width - 1
+    for i in range(first, last):
+        pressure[i, row] = min(max(rhs[i], 0.0), max_pressure)
+
+
+@njit(parallel=True)
+def _zebra_sweep(epsilon, pressure, recip_dx_squared_rho, source, ak00, ak10, ak20, recip_dx, recip_dt, max_pressure,
+                 periodic, sub, main, sup, rhs, work_lower, work_main, work_upper, work_z):
+    """One zebra line relaxation sweep of the pressure array, pressure is updated in place
+
+    The even lines are solved then the odd lines, each line only depends on lines of the other colour so the lines of
+    each colour are solved in parallel. Periodic arrays with an odd number of lines have two even lines next to each
+    other, the last line is solved on its own after the others. The remaining arguments are work arrays which are
+    overwritten, each line uses its own row, see _zebra_work.
+    """
+    width, length = pressure.shape
     a_w = (ak00 - ak10) * recip_dx
     b_w = (ak10 - ak00) * recip_dx
     c_w = (ak20 - ak10) * recip_dx
-    f_w = (((nd_gap[:, row] - q1) - (np.roll(nd_gap[:, row], 1) - q2)) * recip_dx +
-           nd_gap[:, row] * (1 - (np.roll(nd_density[:, row], 1) / nd_density[:, row])) * recip_dx)  # +
-    # recip_dx * (nd_gap[1:-1, row] - nd_gap[0:-2, row]))  # these two gaps were roughness in fortran code
-
-    # squeeze flow terms
     a_s = -1 * ak10 * recip_dt
     b_s = -1 * ak00 * recip_dt
     c_s = -1 * ak10 * recip_dt
-    f_s = ((nd_gap[:, row] - q1) - (previous_nd_density[:, row] / nd_density[:, row]) *
-           previous_nd_gap[:, row]) * recip_dt
+    first, last = (0, length) if periodic else (1, length - 1)
+    odd_periodic = periodic and length % 2 == 1
+
+    for colour in range(3):
+        if colour == 2:
+            if not odd_periodic:
+                break
+            start, stop = length - 1, length
+        else:
+            start = first + colour
+            stop = length - 1 if odd_periodic and colour == 0 else last
+        for k in prange((stop - start + 1) // 2):
+            row = start + 2 * k
+            _line_system(epsilon, pressure, recip_dx_squared_rho, source, row, a_w, b_w, c_w, a_s, b_s, c_s, periodic,
+                         sub[k], main[k], sup[k], rhs[k])
+            _solve_line(pressure, row, max_pressure, periodic, sub[k], main[k], sup[k], rhs[k], work_lower[k],
+                        work_main[k], work_upper[k], work_z[k])
+
 
-    # add and apply boundary conditions here (a[-1] = c[0] = f[0 and -1] = 0, b[0 and -1] = 1)
-    a_all[:] = a_p + a_s + a_w
-    b_all[:] = b_p + b_s + b_w
-    c_all[:] = c_p + c_s + c_w
-    f_all[:] = f_p + f_s + f_w
+@njit
+def _residual(epsilon, pressure, recip_dx_squared_rho, source, ak00, ak10, ak20, recip_dx, recip_dt, start, stop,
+              step, max_pressure, periodic, bounded, out, sub, main, sup, rhs):
+    """The residual of the line equations solved by _sweep, written into out
 
-    return a_all, b_all, c_all, f_all
+    Nodes which are not solved by _sweep have 0 residual. If bounded, nodes held at a pressure bound by a residual which
+    would move them past it also have 0 residual.
+    """
+    width = pressure.shape[0]
+    a_w = (ak00 - ak10) * recip_dx
+    b_w = (ak10 - ak00) * recip_dx
+    c_w = (ak20 - ak10) * recip_dx
+    a_s = -1 * ak10 * recip_dt
+    b_s = -1 * ak00 * recip_dt
+    c_s = -1 * ak10 * recip_dt
+    out[:] = 0.0
+    for row in range(start, stop, step):
+        _line_system(epsilon, pressure, recip_dx_squared_rho, source, row, a_w, b_w, c_w, a_s, b_s, c_s, periodic,
+                     sub, main, sup, rhs)
+        first, last = (0, width) if periodic else (1, width - 1)
+        for i in range(first, last):
+            # the ends of non periodic lines are taken as 0 by the line solves
+            p_minus = pressure[i - 1, row] if periodic or i > 1 else 0.0
+            p_plus = pressure[i + 1 if i + 1 < width else 0, row] if periodic or i < width - 2 else 0.0
+            residual = rhs[i] - (sub[i] * p_minus + main[i] * pressure[i, row] + sup[i] * p_plus)
+            # line solves are clipped after solving, at the edge of a cavitated region this leaves a residual which
+            # the sweeps do not remove, so the nodes either side of the free boundary are also taken as converged
+            if bounded and (pressure[i, row] <= 0 or p_minus <= 0 and (periodic or i > 1) or
+                            p_plus <= 0 and (periodic or i < width - 2) or pressure[i, row] >= max_pressure):
+                residual = 0.0
+            out[i, row] = residual